@@ -137,7 +137,7 @@ class DownloadItemDelegate(CoverQueryDelegateBase):
         return task_info.Download.status in [DownloadStatus.FAILED, DownloadStatus.FFMPEG_FAILED]
     
     def isTaskPaused(self, task_info: TaskInfo):
-        return task_info.Download.status == DownloadStatus.PAUSED
+        return task_info.Download.status in [DownloadStatus.PAUSED, DownloadStatus.WAITING_FOR_SPACE]
 
 class UIRect:
     def __init__(self):
@@ -223,6 +223,9 @@ class UIData(QObject):
             
             case DownloadStatus.PAUSED:
                 return Translator.TIP_MESSAGES("PAUSED")
+
+            case DownloadStatus.WAITING_FOR_SPACE:
+                return Translator.TIP_MESSAGES("WAITING_FOR_SPACE")
             
             case DownloadStatus.FFMPEG_QUEUED:
                 return Translator.TIP_MESSAGES("FFMPEG_QUEUED")
@@ -246,7 +249,12 @@ class UIData(QObject):
                 return Translator.ERROR_MESSAGES("FFMPEG_PROCESSING_FAILED")
             
     def getSpeedText(self, task_info: TaskInfo):
-        return Units.format_speed(task_info.Download.speed)
+        speed_text = Units.format_speed(task_info.Download.speed)
+
+        if speed_text and task_info.Download.eta >= 0:
+            return f"{speed_text} - {Units.format_duration(task_info.Download.eta)}"
+
+        return speed_text
     
     def getSizeText(self, task_info: TaskInfo):
         if task_info.Download.total_size > 0:
@@ -264,7 +272,7 @@ class UIData(QObject):
             case DownloadStatus.COMPLETED:
                 return FluentIcon.FOLDER
             
-            case DownloadStatus.QUEUED | DownloadStatus.PAUSED | DownloadStatus.FFMPEG_QUEUED:
+            case DownloadStatus.QUEUED | DownloadStatus.PAUSED | DownloadStatus.WAITING_FOR_SPACE | DownloadStatus.FFMPEG_QUEUED:
                 return FluentIcon.PLAY
             
             case DownloadStatus.FAILED | DownloadStatus.FFMPEG_FAILED:
@@ -51,7 +51,7 @@ class DownloadListView(ListView):
             case DownloadStatus.COMPLETED:
                 menu.addAction(self._create_action(FluentIcon.SEARCH, self.tr("Re-parse"), lambda: self.onReparseTask(task_info)))
 
-            case DownloadStatus.QUEUED | DownloadStatus.PAUSED:
+            case DownloadStatus.QUEUED | DownloadStatus.PAUSED | DownloadStatus.WAITING_FOR_SPACE:
                 menu.addAction(self._create_action(FluentIcon.PLAY, self.tr("Resume"), lambda: self.onTogglePauseResumeTask(index, task_info)))
 
             case DownloadStatus.DOWNLOADING:
@@ -185,7 +185,7 @@ class DownloadListView(ListView):
         index.model().redownload(task_info)
 
     def onReparseTask(self, task_info: TaskInfo):
-        signal_bus.parse.parse_url.emit(task_info.Episode.url)
+        signal_bus.parse.reparse_url.emit(task_info.Episode.url)
 
     def onEditDownloadOptions(self, index: QModelIndex, task_info: TaskInfo):
         pass
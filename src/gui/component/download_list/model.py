@@ -115,8 +115,8 @@ class DownloadListModel(CoverQueryModelBase):
 
                 self.manageConcurrentDownloads()
 
-            case DownloadStatus.PAUSED:
-                # 继续下载
+            case DownloadStatus.PAUSED | DownloadStatus.WAITING_FOR_SPACE:
+                # 继续下载，空间不足的任务会重新检查磁盘空间
                 downloader.resume()
 
             case DownloadStatus.FFMPEG_QUEUED:
@@ -148,7 +148,7 @@ class DownloadListModel(CoverQueryModelBase):
 
     def batchStart(self):
         for task in self._task_list:
-            if task.Download.status in [DownloadStatus.PAUSED, DownloadStatus.FFMPEG_FAILED, DownloadStatus.FAILED]:
+            if task.Download.status in [DownloadStatus.PAUSED, DownloadStatus.WAITING_FOR_SPACE, DownloadStatus.FFMPEG_FAILED, DownloadStatus.FAILED]:
                 # 从暂停状态变为等待状态，由 manage_concurrent_downloads 统一调度
                 task.Download.status = DownloadStatus.QUEUED
 
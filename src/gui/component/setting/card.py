@@ -372,12 +372,20 @@ class DownloadConcurrencySettingCard(ExpandGroupSettingCard):
         super().__init__(ExtendedFluentIcon.FAST_DOWNLOAD, self.tr("Download Concurrency"), self.tr("Adjust per-task threads, concurrent downloads, and speed limits"), parent)
 
         self.download_thread_slider = SettingSlider(config.download_thread, self)
+        self.download_thread_auto_switch = SettingSwitchButton(config.download_thread_auto, parent = self)
         self.download_parallel_slider = SettingSlider(config.download_parallel, self)
+        self.max_connections_slider = SettingSlider(config.max_connections, self)
+        self.max_host_connections_slider = SettingSlider(config.max_host_connections, self)
+        self.download_engine_choice = SettingComboBox(config.download_engine, [self.tr("Multi-threaded"), self.tr("Asynchronous")], parent = self)
 
         self.download_speed_limit_btn = PushButton(self.tr("Configure…"), self)
 
         self.addGroup("", self.tr("Number of Threads"), self.tr("Adjust the number of threads used per task (default: 4)"), self.download_thread_slider)
+        self.addGroup("", self.tr("Auto-tune Connections"), self.tr("Adjust the number of connections per server based on measured speed and errors, starting from the number of threads above"), self.download_thread_auto_switch)
         self.addGroup("", self.tr("Number of Parallel Downloads"), self.tr("Adjust the number of tasks downloaded simultaneously (default: 1)"), self.download_parallel_slider)
+        self.addGroup("", self.tr("Total Connections"), self.tr("Limit the number of connections shared by all downloading tasks (default: 16)"), self.max_connections_slider)
+        self.addGroup("", self.tr("Connections per Server"), self.tr("Limit the number of connections to a single server to avoid rate limiting (default: 8)"), self.max_host_connections_slider)
+        self.addGroup("", self.tr("Download Engine"), self.tr("Asynchronous mode drives all tasks from a single thread, using fewer resources for large queues"), self.download_engine_choice)
         self.addGroup("", self.tr("Speed Limit Settings"), self.tr("Configure speed limit settings for downloads"), self.download_speed_limit_btn)
 
 class CheckUpdateSettingCard(ExpandGroupSettingCard):
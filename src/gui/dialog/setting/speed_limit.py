@@ -1,8 +1,9 @@
-from qfluentwidgets import SubtitleLabel, DoubleSpinBox, SwitchButton, BodyLabel
+from qfluentwidgets import SubtitleLabel, DoubleSpinBox, SwitchButton, BodyLabel, LineEdit
 
 from gui.component.dialog import DialogBase
 
 from util.common import config
+from util.download.downloader.rate_limiter import rate_limiter
 
 class SpeedLimitSettingDialog(DialogBase):
     def __init__(self, parent = None):
@@ -22,11 +23,21 @@ class SpeedLimitSettingDialog(DialogBase):
 
         rate_lab = BodyLabel(self.tr("Speed limit (MB/s, 0 = unlimited)"), self)
 
-        self.rate_spin = DoubleSpinBox(self)
-        self.rate_spin.setRange(0.0, 1000.0)  # 0.1 MB/s to 1000MB/s
-        self.rate_spin.setSingleStep(1.0)
-        self.rate_spin.setDecimals(1)
-        self.rate_spin.setValue(self.speed_limit_rate)
+        self.rate_spin = self.create_rate_spin(self.speed_limit_rate)
+
+        task_rate_lab = BodyLabel(self.tr("Speed limit per task (MB/s, 0 = unlimited)"), self)
+
+        self.task_rate_spin = self.create_rate_spin(config.get(config.speed_limit_task_rate))
+
+        host_rate_lab = BodyLabel(self.tr("Speed limit per server (MB/s, 0 = unlimited)"), self)
+
+        self.host_rate_spin = self.create_rate_spin(config.get(config.speed_limit_host_rate))
+
+        schedule_lab = BodyLabel(self.tr("Time windows, overriding the speed limit above"), self)
+
+        self.schedule_box = LineEdit(self)
+        self.schedule_box.setPlaceholderText("09:00-18:00=5, 23:00-07:00=0")
+        self.schedule_box.setText(config.get(config.speed_limit_schedule))
 
         self.viewLayout.addWidget(self.caption_lab)
         self.viewLayout.addSpacing(10)
@@ -35,11 +46,35 @@ class SpeedLimitSettingDialog(DialogBase):
         self.viewLayout.addSpacing(5)
         self.viewLayout.addWidget(rate_lab)
         self.viewLayout.addWidget(self.rate_spin)
+        self.viewLayout.addSpacing(5)
+        self.viewLayout.addWidget(task_rate_lab)
+        self.viewLayout.addWidget(self.task_rate_spin)
+        self.viewLayout.addSpacing(5)
+        self.viewLayout.addWidget(host_rate_lab)
+        self.viewLayout.addWidget(self.host_rate_spin)
+        self.viewLayout.addSpacing(5)
+        self.viewLayout.addWidget(schedule_lab)
+        self.viewLayout.addWidget(self.schedule_box)
 
         self.widget.setMinimumWidth(350)
 
+    def create_rate_spin(self, value: float):
+        rate_spin = DoubleSpinBox(self)
+        rate_spin.setRange(0.0, 1000.0)  # 0.1 MB/s to 1000MB/s
+        rate_spin.setSingleStep(1.0)
+        rate_spin.setDecimals(1)
+        rate_spin.setValue(value)
+
+        return rate_spin
+
     def accept(self):
         config.set(config.speed_limit_enabled, self.enable_switch.isChecked())
         config.set(config.speed_limit_rate, self.rate_spin.value())
+        config.set(config.speed_limit_task_rate, self.task_rate_spin.value())
+        config.set(config.speed_limit_host_rate, self.host_rate_spin.value())
+        config.set(config.speed_limit_schedule, self.schedule_box.text().strip())
+
+        # 正在进行的下载立即按新设置限速
+        rate_limiter.reconfigure()
 
-        return super().accept()
\ No newline at end of file
+        return super().accept()
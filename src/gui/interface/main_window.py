@@ -17,6 +17,9 @@ from gui.dialog import LoginDialog, UpdateDialog
 from util.common import signal_bus, config, Directory, ExtendedFluentIcon
 from util.common.enum import ToastNotificationCategory, WhenClose
 from util.auth import user_manager
+from util.download.downloader.engine import download_engine
+from util.download.downloader.host_tuner import host_tuner
+from util.network import async_request_engine
 from util.thread import AsyncTask
 from util.misc import Updater
 
@@ -110,6 +113,7 @@ class MainWindow(MSFluentWindow):
         signal_bus.interface.mica_effect_changed.connect(self.setMicaEffectEnabled)
 
         signal_bus.parse.parse_url.connect(self.on_reparse_task)
+        signal_bus.parse.reparse_url.connect(lambda url: self.on_reparse_task(url, bypass_cache = True))
 
         self.parse_btn.clicked.connect(lambda: self.update_route_key("ParseInterface"))
         self.download_btn.clicked.connect(lambda: self.update_route_key("DownloadInterface"))
@@ -146,6 +150,11 @@ class MainWindow(MSFluentWindow):
         self.hide()
         
         AsyncTask.safe_quit()
+        download_engine.stop()
+        async_request_engine.stop()
+
+        # 写入尚未保存的主机连接数
+        host_tuner.save(force = True)
 
         if self.theme_listener.isRunning():
             self.theme_listener.quit()
@@ -220,11 +229,11 @@ class MainWindow(MSFluentWindow):
 
         self.avatar_widget.setAvatar(pixmap)
 
-    def on_reparse_task(self, url: str):
+    def on_reparse_task(self, url: str, bypass_cache: bool = False):
         if self.navigationInterface.currentItem().objectName() != "ParseInterface":
             self.navigationInterface.buttons()[0].click()  # 切换到解析界面
 
-        self.parse_interface.reparse(url)
+        self.parse_interface.reparse(url, bypass_cache)
 
     def show_toast_notification(self, category: ToastNotificationCategory, title: str, content: str):
         match category:
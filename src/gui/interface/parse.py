@@ -207,10 +207,10 @@ class ParseInterface(ParseBase):
 
         self.on_parse()
 
-    def on_parse(self, page: int = 1):
+    def on_parse(self, page: int = 1, bypass_cache: bool = False):
         self.parse_btn.setIndeterminateState(True)
 
-        worker = ParseWorker(self.url_box.text(), page)
+        worker = ParseWorker(self.url_box.text(), page, bypass_cache)
         worker.success.connect(self.on_parse_success)
         worker.error.connect(self.on_parse_error)
 
@@ -364,10 +364,10 @@ class ParseInterface(ParseBase):
         else:
             return super().keyPressEvent(event)
 
-    def reparse(self, url: str):
+    def reparse(self, url: str, bypass_cache: bool = False):
         self.url_box.setText(url)
         
-        self.on_parse()
+        self.on_parse(bypass_cache = bypass_cache)
 
     def _create_action(self, icon, text, slot):
         action = Action(icon = icon, text = text, parent = self)
@@ -4,17 +4,17 @@
 <context>
     <name>ADDITIONAL_FILES_QUALIFIER</name>
     <message>
-        <location filename="../../util/common/translator.py" line="271"/>
+        <location filename="../../util/common/translator.py" line="273"/>
         <source>Danmaku</source>
         <translation>弹幕</translation>
     </message>
     <message>
-        <location filename="../../util/common/translator.py" line="272"/>
+        <location filename="../../util/common/translator.py" line="274"/>
         <source>Subtitles</source>
         <translation>字幕</translation>
     </message>
     <message>
-        <location filename="../../util/common/translator.py" line="273"/>
+        <location filename="../../util/common/translator.py" line="275"/>
         <source>Metadata</source>
         <translation>元数据</translation>
     </message>
@@ -398,27 +398,27 @@
 <context>
     <name>CheckUpdateSettingCard</name>
     <message>
-        <location filename="../../gui/component/setting/card.py" line="385"/>
+        <location filename="../../gui/component/setting/card.py" line="393"/>
         <source>Check for Updates</source>
         <translation>检查更新</translation>
     </message>
     <message>
-        <location filename="../../gui/component/setting/card.py" line="385"/>
+        <location filename="../../gui/component/setting/card.py" line="393"/>
         <source>Check if a new version is available</source>
         <translation>检查是否有新版本可用</translation>
     </message>
     <message>
-        <location filename="../../gui/component/setting/card.py" line="387"/>
+        <location filename="../../gui/component/setting/card.py" line="395"/>
         <source>Check Now</source>
         <translation>立即检查</translation>
     </message>
     <message>
-        <location filename="../../gui/component/setting/card.py" line="392"/>
+        <location filename="../../gui/component/setting/card.py" line="400"/>
         <source>Include Prerelease Versions</source>
         <translation>包含预发布版本</translation>
     </message>
     <message>
-        <location filename="../../gui/component/setting/card.py" line="392"/>
+        <location filename="../../gui/component/setting/card.py" line="400"/>
         <source>Include prerelease versions in update checks (may be unstable)</source>
         <translation>在更新检查中包含预发布版本（可能不稳定）</translation>
     </message>
@@ -685,37 +685,87 @@
         <translation>调整每任务线程数、并发下载数和速度限制</translation>
     </message>
     <message>
-        <location filename="../../gui/component/setting/card.py" line="377"/>
+        <location filename="../../gui/component/setting/card.py" line="379"/>
+        <source>Multi-threaded</source>
+        <translation>多线程</translation>
+    </message>
+    <message>
+        <location filename="../../gui/component/setting/card.py" line="379"/>
+        <source>Asynchronous</source>
+        <translation>异步</translation>
+    </message>
+    <message>
+        <location filename="../../gui/component/setting/card.py" line="381"/>
         <source>Configure…</source>
         <translation>设置…</translation>
     </message>
     <message>
-        <location filename="../../gui/component/setting/card.py" line="379"/>
+        <location filename="../../gui/component/setting/card.py" line="383"/>
         <source>Number of Threads</source>
         <translation>多线程数</translation>
     </message>
     <message>
-        <location filename="../../gui/component/setting/card.py" line="380"/>
+        <location filename="../../gui/component/setting/card.py" line="384"/>
+        <source>Auto-tune Connections</source>
+        <translation>自动调整连接数</translation>
+    </message>
+    <message>
+        <location filename="../../gui/component/setting/card.py" line="384"/>
+        <source>Adjust the number of connections per server based on measured speed and errors, starting from the number of threads above</source>
+        <translation>以上方的线程数为起点，根据实测速度与错误情况自动调整每个服务器的连接数</translation>
+    </message>
+    <message>
+        <location filename="../../gui/component/setting/card.py" line="385"/>
         <source>Number of Parallel Downloads</source>
         <translation>并行下载数</translation>
     </message>
     <message>
-        <location filename="../../gui/component/setting/card.py" line="381"/>
+        <location filename="../../gui/component/setting/card.py" line="386"/>
+        <source>Total Connections</source>
+        <translation>总连接数</translation>
+    </message>
+    <message>
+        <location filename="../../gui/component/setting/card.py" line="386"/>
+        <source>Limit the number of connections shared by all downloading tasks (default: 16)</source>
+        <translation>限制所有下载任务共用的连接数，默认为 16</translation>
+    </message>
+    <message>
+        <location filename="../../gui/component/setting/card.py" line="387"/>
+        <source>Connections per Server</source>
+        <translation>单服务器连接数</translation>
+    </message>
+    <message>
+        <location filename="../../gui/component/setting/card.py" line="387"/>
+        <source>Limit the number of connections to a single server to avoid rate limiting (default: 8)</source>
+        <translation>限制单个服务器的连接数，避免触发限流，默认为 8</translation>
+    </message>
+    <message>
+        <location filename="../../gui/component/setting/card.py" line="388"/>
+        <source>Download Engine</source>
+        <translation>下载引擎</translation>
+    </message>
+    <message>
+        <location filename="../../gui/component/setting/card.py" line="388"/>
+        <source>Asynchronous mode drives all tasks from a single thread, using fewer resources for large queues</source>
+        <translation>异步模式在单个线程中驱动所有任务，下载队列较长时占用的资源更少</translation>
+    </message>
+    <message>
+        <location filename="../../gui/component/setting/card.py" line="389"/>
         <source>Speed Limit Settings</source>
         <translation>速度限制设置</translation>
     </message>
     <message>
-        <location filename="../../gui/component/setting/card.py" line="379"/>
+        <location filename="../../gui/component/setting/card.py" line="383"/>
         <source>Adjust the number of threads used per task (default: 4)</source>
         <translation>调整单个任务使用的线程数，默认为 4</translation>
     </message>
     <message>
-        <location filename="../../gui/component/setting/card.py" line="380"/>
+        <location filename="../../gui/component/setting/card.py" line="385"/>
         <source>Adjust the number of tasks downloaded simultaneously (default: 1)</source>
         <translation>调整同时下载的任务数，默认为 1</translation>
     </message>
     <message>
-        <location filename="../../gui/component/setting/card.py" line="381"/>
+        <location filename="../../gui/component/setting/card.py" line="389"/>
         <source>Configure speed limit settings for downloads</source>
         <translation>配置下载的速度限制设置</translation>
     </message>
@@ -944,7 +994,7 @@
 <context>
     <name>Downloader</name>
     <message>
-        <location filename="../../util/download/downloader/downloader.py" line="387"/>
+        <location filename="../../util/download/downloader/downloader.py" line="641"/>
         <source>Audio</source>
         <translation>音频</translation>
     </message>
@@ -1552,7 +1602,7 @@ File name: {filename}</source>
 <context>
     <name>MEDIA_INFO_GUIDE</name>
     <message>
-        <location filename="../../util/common/translator.py" line="278"/>
+        <location filename="../../util/common/translator.py" line="280"/>
         <source>The media info shown here defaults to the first video in the parsed results. If multiple videos are available,
 this information may not exactly match the one you download—use it for reference only.
 
@@ -1572,57 +1622,57 @@ Note: Videos protected by DRM can only be downloaded up to 1080P; higher qualiti
 <context>
     <name>MainWindow</name>
     <message>
-        <location filename="../../gui/interface/main_window.py" line="48"/>
+        <location filename="../../gui/interface/main_window.py" line="51"/>
         <source>Parser</source>
         <translation>解析</translation>
     </message>
     <message>
-        <location filename="../../gui/interface/main_window.py" line="50"/>
+        <location filename="../../gui/interface/main_window.py" line="53"/>
         <source>Downloads</source>
         <translation>下载</translation>
     </message>
     <message>
-        <location filename="../../gui/interface/main_window.py" line="58"/>
+        <location filename="../../gui/interface/main_window.py" line="61"/>
         <source>Favorites</source>
         <translation>收藏</translation>
     </message>
     <message>
-        <location filename="../../gui/interface/main_window.py" line="67"/>
+        <location filename="../../gui/interface/main_window.py" line="70"/>
         <source>About</source>
         <translation>关于</translation>
     </message>
     <message>
-        <location filename="../../gui/interface/main_window.py" line="82"/>
+        <location filename="../../gui/interface/main_window.py" line="85"/>
         <source>Settings</source>
         <translation>设置</translation>
     </message>
     <message>
-        <location filename="../../gui/interface/main_window.py" line="317"/>
+        <location filename="../../gui/interface/main_window.py" line="333"/>
         <source>Download Directory Invalid</source>
         <translation>下载目录无效</translation>
     </message>
     <message>
-        <location filename="../../gui/interface/main_window.py" line="318"/>
+        <location filename="../../gui/interface/main_window.py" line="334"/>
         <source>The current download directory is inaccessible or lacks write permissions. Please reset it.</source>
         <translation>当前下载目录无法访问或没有写入权限，请重新设置。</translation>
     </message>
     <message>
-        <location filename="../../gui/interface/main_window.py" line="324"/>
+        <location filename="../../gui/interface/main_window.py" line="340"/>
         <source>FFmpeg Not Found</source>
         <translation>未找到 FFmpeg</translation>
     </message>
     <message>
-        <location filename="../../gui/interface/main_window.py" line="325"/>
+        <location filename="../../gui/interface/main_window.py" line="341"/>
         <source>No FFmpeg executable found. Please ensure FFmpeg is installed and configured correctly.</source>
         <translation>未找到 FFmpeg 可执行文件。请确保已正确安装并配置 FFmpeg。</translation>
     </message>
     <message>
-        <location filename="../../gui/interface/main_window.py" line="331"/>
+        <location filename="../../gui/interface/main_window.py" line="347"/>
         <source>Login Required</source>
         <translation>需要登录</translation>
     </message>
     <message>
-        <location filename="../../gui/interface/main_window.py" line="332"/>
+        <location filename="../../gui/interface/main_window.py" line="348"/>
         <source>Please log in to your account first.</source>
         <translation>请先登录账号</translation>
     </message>
@@ -1852,7 +1902,7 @@ To get a single complete video file, please enable &quot;Merge video and audio&q
 <context>
     <name>NAMING_RULE_GUIDE</name>
     <message>
-        <location filename="../../util/common/translator.py" line="288"/>
+        <location filename="../../util/common/translator.py" line="290"/>
         <source>Customize the file name and folder structure using variables.
 
 Rules:
@@ -2048,32 +2098,32 @@ For advanced usage, see the help documentation.</source>
         <translation>解析失败</translation>
     </message>
     <message>
-        <location filename="../../gui/interface/parse.py" line="263"/>
+        <location filename="../../gui/interface/parse.py" line="268"/>
         <source>Added to download queue</source>
         <translation>已加入到下载队列</translation>
     </message>
     <message>
-        <location filename="../../gui/interface/parse.py" line="279"/>
+        <location filename="../../gui/interface/parse.py" line="283"/>
         <source>Search</source>
         <translation>搜索</translation>
     </message>
     <message>
-        <location filename="../../gui/interface/parse.py" line="280"/>
+        <location filename="../../gui/interface/parse.py" line="284"/>
         <source>Batch select</source>
         <translation>批量选择</translation>
     </message>
     <message>
-        <location filename="../../gui/interface/parse.py" line="281"/>
+        <location filename="../../gui/interface/parse.py" line="285"/>
         <source>Parsing history</source>
         <translation>解析记录</translation>
     </message>
     <message>
-        <location filename="../../gui/interface/parse.py" line="306"/>
+        <location filename="../../gui/interface/parse.py" line="310"/>
         <source>{category_name} ({selected_count} selected, {total_count} total)</source>
         <translation>{category_name}（已选择 {selected_count} 项，共 {total_count} 项）</translation>
     </message>
     <message>
-        <location filename="../../gui/interface/parse.py" line="312"/>
+        <location filename="../../gui/interface/parse.py" line="316"/>
         <source>{category_name} ({total_count} total)</source>
         <translation>{category_name}（共 {total_count} 项）</translation>
     </message>
@@ -2154,7 +2204,7 @@ For advanced usage, see the help documentation.</source>
         <translation>已加入到下载队列</translation>
     </message>
     <message>
-        <location filename="../../gui/component/parse_list/tree_view.py" line="231"/>
+        <location filename="../../gui/component/parse_list/tree_view.py" line="230"/>
         <source>Updating media info...</source>
         <translation>正在更新媒体信息...</translation>
     </message>
@@ -2162,7 +2212,7 @@ For advanced usage, see the help documentation.</source>
 <context>
     <name>ParseWorker</name>
     <message>
-        <location filename="../../util/parse/worker.py" line="72"/>
+        <location filename="../../util/parse/worker.py" line="76"/>
         <source>Invalid link format</source>
         <translation>无效的链接</translation>
     </message>
@@ -2793,20 +2843,35 @@ ISP：{isp}</translation>
 <context>
     <name>SpeedLimitSettingDialog</name>
     <message>
-        <location filename="../../gui/dialog/setting/speed_limit.py" line="16"/>
+        <location filename="../../gui/dialog/setting/speed_limit.py" line="17"/>
         <source>Speed Limit Settings</source>
         <translation>速度限制设置</translation>
     </message>
     <message>
-        <location filename="../../gui/dialog/setting/speed_limit.py" line="18"/>
+        <location filename="../../gui/dialog/setting/speed_limit.py" line="19"/>
         <source>Enable Speed Limit</source>
         <translation>启用限速</translation>
     </message>
     <message>
-        <location filename="../../gui/dialog/setting/speed_limit.py" line="23"/>
+        <location filename="../../gui/dialog/setting/speed_limit.py" line="24"/>
         <source>Speed limit (MB/s, 0 = unlimited)</source>
         <translation>速度限制（MB/s，0 表示无限制）</translation>
     </message>
+    <message>
+        <location filename="../../gui/dialog/setting/speed_limit.py" line="28"/>
+        <source>Speed limit per task (MB/s, 0 = unlimited)</source>
+        <translation>单任务速度限制（MB/s，0 表示无限制）</translation>
+    </message>
+    <message>
+        <location filename="../../gui/dialog/setting/speed_limit.py" line="32"/>
+        <source>Speed limit per server (MB/s, 0 = unlimited)</source>
+        <translation>单服务器速度限制（MB/s，0 表示无限制）</translation>
+    </message>
+    <message>
+        <location filename="../../gui/dialog/setting/speed_limit.py" line="36"/>
+        <source>Time windows, overriding the speed limit above</source>
+        <translation>时间段限速，生效时代替上方的速度限制</translation>
+    </message>
 </context>
 <context>
     <name>StartingNumberDialog</name>
@@ -2909,7 +2974,7 @@ ISP：{isp}</translation>
 <context>
     <name>TERMS_OF_USE</name>
     <message>
-        <location filename="../../util/common/translator.py" line="305"/>
+        <location filename="../../util/common/translator.py" line="307"/>
         <source>&lt;html&gt;This software is intended solely for personal learning and research purposes. Any content downloaded through this project &lt;b&gt;is strictly limited to personal, non-commercial use and must not be used for any commercial purpose, public distribution, sharing, resale, or unlawful profit.&lt;/b&gt;
 &lt;br&gt;&lt;br&gt;
 This software operates exclusively based on the user&apos;s own legitimate account access rights and &lt;b&gt;does not bypass any paywalls, membership restrictions, or technical protection measures.&lt;/b&gt; You may only download content that you are authorized to access through your normal login on the target platform. If your account does not have permission to access certain content, this software must not be used to obtain it.
@@ -2959,46 +3024,56 @@ Under no circumstances shall the developer be liable for any direct, indirect, i
     </message>
     <message>
         <location filename="../../util/common/translator.py" line="256"/>
+        <source>Waiting for disk space</source>
+        <translation>等待磁盘空间</translation>
+    </message>
+    <message>
+        <location filename="../../util/common/translator.py" line="257"/>
+        <source>{required} of free space is required, but only {available} is available. Free up some space and resume the task.</source>
+        <translation>需要 {required} 的可用空间，但当前仅剩 {available}。请释放部分空间后继续任务。</translation>
+    </message>
+    <message>
+        <location filename="../../util/common/translator.py" line="258"/>
         <source>You are already using the latest version</source>
         <translation>当前已是最新版本</translation>
     </message>
     <message>
-        <location filename="../../util/common/translator.py" line="257"/>
+        <location filename="../../util/common/translator.py" line="259"/>
         <source>Download completed</source>
         <translation>下载完成</translation>
     </message>
     <message>
-        <location filename="../../util/common/translator.py" line="258"/>
+        <location filename="../../util/common/translator.py" line="260"/>
         <source>All download tasks have been completed.</source>
         <translation>所有下载任务已完成</translation>
     </message>
     <message>
-        <location filename="../../util/common/translator.py" line="259"/>
+        <location filename="../../util/common/translator.py" line="261"/>
         <source>Expired</source>
         <translation>已失效</translation>
     </message>
     <message>
-        <location filename="../../util/common/translator.py" line="260"/>
+        <location filename="../../util/common/translator.py" line="262"/>
         <source>Additional Files</source>
         <translation>附加文件</translation>
     </message>
     <message>
-        <location filename="../../util/common/translator.py" line="261"/>
+        <location filename="../../util/common/translator.py" line="263"/>
         <source>Downloading Danmaku...</source>
         <translation>下载弹幕中...</translation>
     </message>
     <message>
-        <location filename="../../util/common/translator.py" line="262"/>
+        <location filename="../../util/common/translator.py" line="264"/>
         <source>Downloading Subtitles...</source>
         <translation>下载字幕中...</translation>
     </message>
     <message>
-        <location filename="../../util/common/translator.py" line="263"/>
+        <location filename="../../util/common/translator.py" line="265"/>
         <source>Downloading Cover...</source>
         <translation>下载封面中...</translation>
     </message>
     <message>
-        <location filename="../../util/common/translator.py" line="264"/>
+        <location filename="../../util/common/translator.py" line="266"/>
         <source>Scraping Metadata...</source>
         <translation>刮削元数据中...</translation>
     </message>
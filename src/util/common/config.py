@@ -9,7 +9,7 @@ from qfluentwidgets import (
 from .serializer import LanguageSerializer, ScalingSerializer
 from .enum import (
     Language, WhenClose, DanmakuType, SubtitleType, CoverType, MetadataType, ProxyType, FFmpegSource, NumberingType,
-    Scaling, FileConflictResolution, VideoContainer
+    Scaling, FileConflictResolution, VideoContainer, DownloadEngine
 )
 
 from pathlib import Path
@@ -232,9 +232,16 @@ class APPConfig(QConfig):
     # Download
     download_path = ConfigItem("Download", "download_path", QStandardPaths.writableLocation(QStandardPaths.StandardLocation.DownloadLocation))
     download_thread = RangeConfigItem("Download", "download_thread", 4, RangeValidator(1, 10))
+    download_thread_auto = ConfigItem("Download", "download_thread_auto", False, BoolValidator())
     download_parallel = RangeConfigItem("Download", "download_parallel", 1, RangeValidator(1, 10))
+    max_connections = RangeConfigItem("Download", "max_connections", 16, RangeValidator(1, 64))
+    max_host_connections = RangeConfigItem("Download", "max_host_connections", 8, RangeValidator(1, 32))
+    download_engine = OptionsConfigItem("Download", "download_engine", DownloadEngine.THREAD, OptionsValidator(DownloadEngine), EnumSerializer(DownloadEngine))
     speed_limit_enabled = ConfigItem("Download", "speed_limit_enabled", False, BoolValidator())
     speed_limit_rate = ConfigItem("Download", "speed_limit_rate", 10.0)
+    speed_limit_task_rate = ConfigItem("Download", "speed_limit_task_rate", 0.0)
+    speed_limit_host_rate = ConfigItem("Download", "speed_limit_host_rate", 0.0)
+    speed_limit_schedule = ConfigItem("Download", "speed_limit_schedule", "")
 
     show_notification = ConfigItem("Download", "show_notification", False, BoolValidator())
 
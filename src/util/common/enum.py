@@ -107,6 +107,8 @@ class DownloadStatus(IntEnum):
 
     ADDITIONAL_PROCESSING = 8       # 额外处理（如提取封面、生成字幕等）
 
+    WAITING_FOR_SPACE = 9           # 磁盘空间不足，等待释放空间后继续
+
     FAILED = 100                    # 下载失败
     FFMPEG_FAILED = 101             # FFmpeg 处理失败
 
@@ -123,3 +125,15 @@ class DownloadType(IntFlag):
 class VideoContainer(Enum):
     MP4 = "mp4"
     MKV = "mkv"
+
+class DownloadEngine(Enum):
+    THREAD = "thread"
+    ASYNC = "async"
+
+class RetryErrorType(Enum):
+    TIMEOUT = "timeout"             # 连接或读取超时
+    RESET = "reset"                 # 连接失败、被重置或意外断开
+    RISK_CONTROL = "risk_control"   # 412 风控或 429 请求过于频繁
+    CLIENT_ERROR = "client_error"   # 其他 4xx
+    SERVER_ERROR = "server_error"   # 5xx
+    OTHER = "other"
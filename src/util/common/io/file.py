@@ -4,6 +4,8 @@ from util.common import config
 
 from threading import Lock
 import logging
+import errno
+import os
 
 logger = logging.getLogger(__name__)
 
@@ -63,6 +65,25 @@ def __resolve_conflict(original_path: Path, new_path: Path) -> Path:
 class File:
     @staticmethod
     def preallocate_file(path: str, size: int):
-        with open(path, "wb") as f:
-            f.seek(size - 1)
-            f.write(b"\0")
+        # 实际占用磁盘空间，空间不足时立即抛出 OSError(ENOSPC)，而不是下载数小时后在合并时才失败。
+        # 返回是否已实际占用空间：macOS 没有 posix_fallocate，ftruncate 在 APFS 等文件系统上只创建稀疏文件；
+        # Windows 上 NTFS 扩展文件时会分配空间
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0))
+
+        try:
+            if hasattr(os, "posix_fallocate"):
+                try:
+                    os.posix_fallocate(fd, 0, size)
+                    return True
+
+                except OSError as e:
+                    # 部分文件系统（如 FAT32、网络存储）不支持 fallocate，退回 ftruncate
+                    if e.errno not in [errno.EOPNOTSUPP, errno.ENOSYS, errno.EINVAL]:
+                        raise
+
+            os.ftruncate(fd, size)
+
+            return os.name == "nt"
+
+        finally:
+            os.close(fd)
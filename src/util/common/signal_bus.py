@@ -26,6 +26,7 @@ class SignalBus:
         update_preview_info = Signal()
 
         parse_url = Signal(str)
+        reparse_url = Signal(str)       # 下载列表中的“重新解析”，跳过本地缓存
 
         search_keyword = Signal(str)
 
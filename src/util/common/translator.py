@@ -253,6 +253,8 @@ class Translator:
             "MERGING": translate("TIP_MESSAGES", "Merging..."),
             "COMPLETED": translate("TIP_MESSAGES", "Completed"),
             "CONVERTING": translate("TIP_MESSAGES", "Converting..."),
+            "WAITING_FOR_SPACE": translate("TIP_MESSAGES", "Waiting for disk space"),
+            "WAITING_FOR_SPACE_DETAIL": translate("TIP_MESSAGES", "{required} of free space is required, but only {available} is available. Free up some space and resume the task."),
             "ALREADY_LATEST_VERSION": translate("TIP_MESSAGES", "You are already using the latest version"),
             "DOWNLOAD_COMPLETED": translate("TIP_MESSAGES", "Download completed"),
             "DOWNLOAD_COMPLETED_DETAIL": translate("TIP_MESSAGES", "All download tasks have been completed."),
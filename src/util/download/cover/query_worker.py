@@ -1,11 +1,10 @@
 from PySide6.QtCore import QRunnable, Qt, QBuffer, QMetaObject, Q_ARG, QSize
 from PySide6.QtGui import QImage
 
-from util.network import SyncNetWorkRequest, ResponseType
+from util.network import SyncNetWorkRequest, ResponseType, api_retry_policy
 
 from urllib.parse import urlencode
 import base64
-import httpx
 
 class CoverQueryWorker(QRunnable):
     def __init__(self, model, query_id: str, cover_id: str, cover_url: str, cover_size: QSize, query_param: dict = None):
@@ -38,16 +37,8 @@ class CoverQueryWorker(QRunnable):
             image.loadFromData(base64.b64decode(result))
 
         else:
-            for i in range(3):
-                try:
-                    image, base64_data = self.download_cover()
-                    break
-                except httpx.HTTPError:
-                    if i == 2:
-                        raise
-            else:
-                return
-            
+            image, base64_data = api_retry_policy.call("cover_query", self.download_cover)
+
             cover_manager.create(self.cover_id, base64_data)
 
         self.return_to_model(image)
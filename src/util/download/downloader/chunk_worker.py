@@ -0,0 +1,624 @@
+from PySide6.QtCore import QRunnable, QMetaObject, Qt, Q_ARG
+
+from util.network import RetryState, download_retry_policy
+
+from ..task.info import TaskInfo
+from .file_set import FileSet, DownloadFile
+from .segment import Segment
+from .mirror import Mirror
+from .scheduler import connection_scheduler
+from .host_tuner import host_tuner
+from .writer import buffer_pool
+from .rate_limiter import rate_limiter
+from .stats import SpeedMeter
+
+from threading import Event
+import asyncio
+import httpx
+import time
+import re
+
+# 服务端不接受大范围请求时，退回按 4MB 逐块请求
+FALLBACK_RANGE_SIZE = 4 * 1024 * 1024
+
+# 下载链接过期或失效时 CDN 返回的状态码
+EXPIRED_STATUS_CODES = (403, 404, 410)
+
+class ChunkWorkerBase:
+    """线程与异步两种下载引擎共用的区间领取、写入与进度统计逻辑"""
+    def __init__(self, file_set: FileSet, referer: str, task_info: TaskInfo, stop_event: Event, parent = None, on_chunk_start = None, on_chunk_end = None, on_url_expired = None, initial_file: DownloadFile = None, initial_segment: Segment = None, avoid_mirror: Mirror = None):
+        """
+        :param file_set: 任务中所有待下载的文件，连接可领取其中任一文件的区间
+        :param initial_segment: 对冲连接需要先下载的区间，属于 initial_file
+        :param avoid_mirror: 下载 initial_segment 时尽量避开的镜像
+        :param on_url_expired: 链接过期时的回调，由下载器限制刷新频率，可在任意线程调用
+        """
+        self.file_set = file_set
+        self.referer = referer
+        self.task_info = task_info
+        self.stop_event = stop_event
+        self.parent = parent
+        self.on_chunk_start = on_chunk_start
+        self.on_chunk_end = on_chunk_end
+        self.on_url_expired = on_url_expired
+        self.initial_file = initial_file
+        self.initial_segment = initial_segment
+        self.avoid_mirror = avoid_mirror
+
+        # 对冲连接只下载指定的区间，完成或取消后即退出；exited 供下载器统计尚未结束（含排队中）的对冲连接
+        self.is_hedge = initial_segment is not None
+        self.exited = False
+
+        # 当前正在下载的文件与区间
+        self.file: DownloadFile = None
+        self.segment: Segment = None
+
+        # 速度持续低于任务中位数的采样次数，由下载器的看门狗维护
+        self.stall_ticks = 0
+
+        self.sample_size = 0
+        self.sample_time = 0
+
+        # 本连接累计接收的字节数，只由当前连接累加，由下载器的速度采样定时器汇总，无需加锁
+        self.downloaded_size = 0
+        self.file_downloaded_size: dict[str, int] = {}
+        self.speed_meter = SpeedMeter()
+        self.mirror: Mirror = None
+
+        # 连接调度器重新分配份额后，超出份额的连接会在下一次汇报吞吐量时让出
+        self.slot = None
+        self.yield_requested = False
+
+        # 接收到的数据先拼接到缓冲区中，攒满后整块交给写入线程
+        self.buffer: bytearray = None
+        self.buffer_view: memoryview = None
+        self.buffer_offset = 0
+        self.buffer_length = 0
+
+        # 本次请求覆盖的区间末尾，以及服务端忽略 Range 时需要丢弃的开头字节数
+        self.request_end = 0
+        self.skip_size = 0
+
+    def get_request_end(self, segment: Segment, mirror: Mirror):
+        # 一个请求下载区间的全部剩余部分，镜像限制了单次请求的范围时按块请求
+        if mirror.range_limit:
+            return min(segment.end, segment.pos + mirror.range_limit)
+
+        return segment.end
+
+    def get_headers(self, segment: Segment):
+        # 从上次写入的位置继续请求，重试和断点续传都不会重复下载已写入的字节
+        # 会话由多个任务共用，Referer 需要逐个请求附带
+        return {
+            "Range": f"bytes={segment.pos}-{self.request_end - 1}",
+            "Referer": self.referer
+        }
+
+    def check_range(self, segment: Segment, mirror: Mirror, response: httpx.Response):
+        # 核对服务端实际返回的范围，发现其不支持大范围请求时降级
+        self.skip_size = 0
+
+        if response.status_code == 200:
+            # 服务端忽略了 Range，返回的是整个文件
+            if segment.pos == 0:
+                return
+
+            # 以本次请求的范围判断，其他连接可能已在本次请求发出后降级为按块请求
+            if not mirror.range_limit or self.request_end - segment.pos > min(mirror.range_limit, FALLBACK_RANGE_SIZE):
+                # 先尝试按块请求，部分服务端只忽略过大的范围
+                self.file.mirror_pool.limit_range(mirror, FALLBACK_RANGE_SIZE)
+
+                raise ConnectionError("Range ignored by server, falling back to chunked requests.")
+
+            # 按块请求仍被忽略，只能丢弃区间之前的字节
+            self.file.mirror_pool.disable_range(mirror)
+            self.skip_size = segment.pos
+            return
+
+        if not (match := re.match(r"bytes (\d+)-(\d+)/(\d+|\*)", response.headers.get("Content-Range", ""))):
+            return
+
+        start, end, total = int(match[1]), int(match[2]) + 1, match[3]
+
+        if start != segment.pos:
+            raise ConnectionError(f"Content-Range mismatch (Expected start: {segment.pos}, Got: {start}), triggering retry.")
+
+        # 返回的范围比请求的短且未到文件末尾，说明服务端限制了单次请求的大小，之后按该大小逐块请求
+        if end < self.request_end and (total == "*" or end < int(total)):
+            self.file.mirror_pool.limit_range(mirror, end - start)
+            self.request_end = end
+
+    def clip_chunk(self, segment: Segment, chunk: bytes):
+        if self.skip_size:
+            size = min(self.skip_size, len(chunk))
+
+            chunk = chunk[size:]
+            self.skip_size -= size
+
+        # 区间的后半段可能已被其他连接窃取，end 会随之缩短
+        return chunk[:min(segment.end, self.request_end) - segment.pos]
+
+    def write_chunk(self, segment: Segment, mirror: Mirror, chunk: bytes):
+        # 返回已填满、需要交给写入线程的缓冲区
+        chunk_len = len(chunk)
+        full_buffers = []
+
+        if self.buffer is None:
+            self.new_buffer(segment)
+
+        view = memoryview(chunk)
+
+        while view:
+            size = min(len(view), len(self.buffer) - self.buffer_length)
+
+            self.buffer_view[self.buffer_length:self.buffer_length + size] = view[:size]
+            self.buffer_length += size
+            view = view[size:]
+
+            if self.buffer_length == len(self.buffer):
+                full_buffers.append(self.take_buffer())
+                self.new_buffer(segment, self.buffer_offset + len(full_buffers[-1][1]))
+
+        segment.pos += chunk_len
+
+        # 对冲中的区间由两个连接重复下载，只累加超出对方进度的部分，已落败的一方不再计入
+        if group := segment.group:
+            gained = group.advance(segment.pos, chunk_len)
+        else:
+            gained = 0 if segment.cancelled else chunk_len
+
+        self.downloaded_size += gained
+        self.file_downloaded_size[self.file.file_key] = self.file_downloaded_size.get(self.file.file_key, 0) + gained
+
+        # 每下载 1MB 向镜像池汇报一次吞吐量
+        self.sample_size += chunk_len
+        if self.sample_size >= 1024 * 1024:
+            self.flush_sample(mirror)
+
+        return full_buffers
+
+    def new_buffer(self, segment: Segment, offset: int = None):
+        self.buffer = buffer_pool.get()
+        self.buffer_view = memoryview(self.buffer)
+        self.buffer_offset = segment.pos if offset is None else offset
+        self.buffer_length = 0
+
+    def take_buffer(self):
+        # 取出当前缓冲区，返回 (偏移量, 缓冲区, 长度)
+        item = (self.buffer_offset, self.buffer, self.buffer_length)
+
+        self.buffer_view.release()
+        self.buffer = None
+        self.buffer_view = None
+        self.buffer_length = 0
+
+        return item
+
+    def take_remaining_buffer(self):
+        # 请求结束时取出未填满的缓冲区，没有数据时直接归还
+        if self.buffer is None:
+            return None
+
+        if self.buffer_length == 0:
+            buffer = self.take_buffer()[1]
+            buffer_pool.put(buffer)
+
+            return None
+
+        return self.take_buffer()
+
+    def discard_buffer(self, segment: Segment, item: tuple = None):
+        # 写入失败后丢弃尚未落盘的数据，区间回退到已落盘的位置，之后从这里重新下载
+        if item is None:
+            item = self.take_remaining_buffer()
+
+        if item is not None:
+            buffer_pool.put(item[1])
+
+        # 普通区间接收时已全部计入进度，丢弃的部分之后重新下载会再次计入，先扣除；
+        # 对冲中或已落败的区间按两者的最远位置计数，重新下载时不会重复计入
+        if segment.group is None and not segment.cancelled:
+            self.uncount(segment.pos - segment.written)
+
+        segment.pos = segment.written
+
+    def uncount(self, size: int):
+        # 从本连接的下载进度与吞吐量采样中扣除未能落盘的字节
+        if size <= 0:
+            return
+
+        self.downloaded_size -= size
+        self.file_downloaded_size[self.file.file_key] = self.file_downloaded_size.get(self.file.file_key, 0) - size
+        self.sample_size = max(self.sample_size - size, 0)
+
+    def flush_buffer(self, segment: Segment, finished: bool = False):
+        # 取出未填满的缓冲区，返回提交给写入线程的参数。区间完成时即使没有剩余数据也要提交一次，
+        # 写入线程按顺序处理，完成回调触发时该区间之前的数据都已落盘
+        item = self.take_remaining_buffer()
+
+        if item is None:
+            if not finished:
+                return None
+
+            item = (segment.pos, buffer_pool.get(), 0)
+
+        offset, buffer, length = item
+
+        return offset, buffer, length, self.get_write_callback(segment, offset, length, finished)
+
+    def get_write_callback(self, segment: Segment, offset: int, length: int, finished: bool = False):
+        # 写入线程落盘后更新区间进度，区间的最后一块写完后才算完成。回调执行时连接可能已在下载其他文件
+        file = self.file
+
+        def callback():
+            segment.commit(offset + length)
+
+            if finished:
+                self.on_segment_finished(file, segment)
+
+        return callback
+
+    def start_sample(self):
+        self.sample_size = 0
+        self.sample_time = time.monotonic()
+        self.yield_requested = False
+
+    def flush_sample(self, mirror: Mirror):
+        now = time.monotonic()
+
+        if self.sample_size:
+            self.file.mirror_pool.record(mirror, self.sample_size, now - self.sample_time)
+            host_tuner.record(mirror.host, self.sample_size)
+
+        self.sample_size = 0
+        self.sample_time = now
+
+        # 已被要求让出的连接不再重复申请，以免占用其他连接的让出名额
+        if not self.yield_requested:
+            self.yield_requested = connection_scheduler.over_share(self.slot, mirror.host)
+
+    def acquire_mirror(self):
+        # 每次请求重新挑选镜像，新的区间和重试会避开慢速、失败或连接数已满的节点
+        self.mirror = self.file.mirror_pool.acquire(connection_scheduler.is_host_available, exclude = self.avoid_mirror)
+
+        return self.mirror
+
+    def release_connection(self, mirror: Mirror):
+        self.file.mirror_pool.release(mirror)
+
+        connection_scheduler.release(self.slot, mirror.host, yielded = self.yield_requested)
+        self.slot = None
+        self.mirror = None
+        self.yield_requested = False
+
+    def next_segment(self):
+        # 对冲连接下载完指定的区间后退出，不占用线程池与连接份额领取普通区间
+        if self.initial_segment:
+            file, segment = self.initial_file, self.initial_segment
+            self.initial_file = self.initial_segment = None
+        elif self.is_hedge:
+            file, segment = None, None
+        else:
+            self.avoid_mirror = None
+            file, segment = self.file_set.acquire()
+
+        self.file = file
+        self.segment = segment
+        self.stall_ticks = 0
+
+        return segment
+
+    def stats(self):
+        # 供诊断接口使用的单个连接状态，连接线程可能随时清空当前的文件与镜像，先取出再读取
+        file, mirror = self.file, self.mirror
+
+        return {
+            "file_key": file.file_key if file else None,
+            "host": mirror.host if mirror else None,
+            "speed": int(self.speed_meter.value),
+            "downloaded_size": self.downloaded_size,
+            "hedge": self.is_hedge
+        }
+
+    @property
+    def task_id(self):
+        return self.task_info.Basic.task_id
+
+    def check_segment(self, segment: Segment, downloaded: int, expected_size: int):
+        # 写到了区间末尾
+        if segment.pos >= segment.end:
+            return True
+
+        # 按块请求时本块已完成，由调用方继续请求下一块
+        if segment.pos >= self.request_end:
+            return False
+
+        # 下载到了服务端承诺的大小
+        if downloaded >= expected_size:
+            return True
+
+        # 提前结束但没有报错，说明连接意外断开，触发重试
+        raise ConnectionError(f"Segment mismatch (Expected: {expected_size}, Got: {downloaded}), triggering retry.")
+
+    def get_expected_size(self, segment: Segment, response: httpx.Response):
+        # 获取服务端实际承诺下发的体量。若是最后一个区间且 CDN 数据缩水，它将以实际值为准
+        return int(response.headers.get("Content-Length", segment.remaining))
+
+    def on_request_error(self, mirror: Mirror, error: Exception, retry: RetryState, downloaded: int):
+        # 返回重试前的等待时长，为 None 时放弃该区间
+        self.file.mirror_pool.record_error(mirror)
+        host_tuner.record_error(mirror.host, error)
+
+        # 本次请求收到过数据说明连接是通的，退避从头计算
+        if downloaded:
+            retry.reset()
+
+        # 链接过期时重试原链接没有意义，通知下载器重新解析，新链接会在下次挑选镜像时生效
+        if isinstance(error, httpx.HTTPStatusError) and error.response.status_code in EXPIRED_STATUS_CODES and self.on_url_expired:
+            self.on_url_expired()
+
+        return retry.next_delay(error)
+
+    def release_segment(self, segment: Segment):
+        # 对冲请求失败时，超出原连接进度的字节会由原连接重新下载，先从本连接的计数中扣除
+        self.uncount(self.file.segment_table.release(segment))
+
+    def on_write_error(self, file: DownloadFile):
+        # 由下载器决定挂起还是结束任务，多个连接重复通知时只处理一次
+        QMetaObject.invokeMethod(
+            self.parent, "on_write_error",
+            Qt.ConnectionType.QueuedConnection,
+            Q_ARG(str, file.file_key)
+        )
+
+    def on_segment_finished(self, file: DownloadFile, segment: Segment):
+        # 对冲的另一方已先完成时不再重复通知
+        if not file.segment_table.finish(segment):
+            return
+
+        QMetaObject.invokeMethod(
+            self.parent, "on_chunk_finished",
+            Qt.ConnectionType.QueuedConnection,
+            Q_ARG(str, file.file_key),
+            Q_ARG(int, segment.start)
+        )
+
+class ChunkWorker(ChunkWorkerBase, QRunnable):
+    def __init__(self, session: httpx.Client, **kwargs):
+        QRunnable.__init__(self)
+        ChunkWorkerBase.__init__(self, **kwargs)
+
+        self.session = session
+
+    def run(self):
+        if self.stop_event.is_set():
+            self.exited = True
+            return
+
+        if self.on_chunk_start:
+            self.on_chunk_start()
+
+        # 当前区间完成后继续领取或窃取新的区间，直到整个文件没有可分配的区间
+        while not self.stop_event.is_set():
+            segment = self.next_segment()
+
+            if segment is None:
+                break
+
+            # 下载完成的区间由写入线程落盘后标记完成
+            if not self.download_segment(segment):
+                self.release_segment(segment)
+
+                # 写入失败后不再领取区间，避免反复下载无法落盘的数据
+                if self.file.file_writer.error:
+                    self.on_write_error(self.file)
+                    break
+
+        self.exited = True
+
+        if self.on_chunk_end:
+            self.on_chunk_end()
+
+    def download_segment(self, segment: Segment):
+        retry = download_retry_policy.begin("download")
+
+        while not self.stop_event.is_set() and not segment.cancelled:
+            downloaded = 0
+
+            mirror = self.acquire_mirror()
+            self.request_end = self.get_request_end(segment, mirror)
+
+            # 等待连接调度器分配连接，全局与单主机的连接数都不会超出上限
+            self.slot = connection_scheduler.acquire(self.task_id, mirror.host, self.stop_event)
+
+            if self.slot is None:
+                self.file.mirror_pool.release(mirror)
+                self.mirror = None
+                break
+
+            try:
+                with self.session.stream("GET", mirror.url, headers = self.get_headers(segment), follow_redirects = True, timeout = 10) as response:
+                    response.raise_for_status()
+
+                    self.check_range(segment, mirror, response)
+                    expected_size = self.get_expected_size(segment, response)
+                    self.start_sample()
+
+                    for chunk in response.iter_bytes(chunk_size = 8192):
+                        if self.stop_event.is_set() or segment.cancelled:
+                            break
+
+                        if chunk := self.clip_chunk(segment, chunk):
+                            rate_limiter.consume(len(chunk), self.task_id, mirror.host, self.stop_event)
+
+                            for offset, buffer, length in self.write_chunk(segment, mirror, chunk):
+                                self.file.file_writer.submit(offset, buffer, length, self.get_write_callback(segment, offset, length))
+
+                            downloaded += len(chunk)
+
+                        if segment.pos >= min(segment.end, self.request_end) or self.yield_requested:
+                            break
+
+                    self.flush_sample(mirror)
+
+                # 如果中途被停止，跳出循环退出
+                if self.stop_event.is_set() or segment.cancelled:
+                    break
+
+                # 让出连接后重新排队，区间从已写入的位置继续
+                if self.yield_requested and segment.pos < segment.end:
+                    continue
+
+                if self.check_segment(segment, downloaded, expected_size):
+                    self.file.file_writer.submit(*self.flush_buffer(segment, finished = True))
+
+                    return True
+
+            except Exception as e:
+                # 写入失败（如磁盘已满）时重试没有意义，直接结束
+                if self.stop_event.is_set() or segment.cancelled or self.file.file_writer.error:
+                    break
+
+                # 发生异常（断网、超时、链接过期等），已接收的字节保留，按重试策略退避后从断开处重试
+                if (delay := self.on_request_error(mirror, e, retry, downloaded)) is None:
+                    break
+
+                self.stop_event.wait(delay)
+
+            finally:
+                self.release_connection(mirror)
+
+                # 提交本次请求中未填满的缓冲区，写入已失败时丢弃
+                self.submit_remaining(segment)
+
+        return False
+
+    def submit_remaining(self, segment: Segment):
+        if self.file.file_writer.error:
+            self.discard_buffer(segment)
+            return
+
+        if item := self.flush_buffer(segment):
+            try:
+                self.file.file_writer.submit(*item)
+
+            except Exception:
+                self.discard_buffer(segment, item)
+
+class AsyncChunkWorker(ChunkWorkerBase):
+    """运行在共享事件循环中的下载协程，与 ChunkWorker 保持相同的回调约定"""
+    def __init__(self, client: httpx.AsyncClient, **kwargs):
+        super().__init__(**kwargs)
+
+        self.client = client
+
+    async def run(self):
+        if self.stop_event.is_set():
+            self.exited = True
+            return
+
+        if self.on_chunk_start:
+            self.on_chunk_start()
+
+        try:
+            while not self.stop_event.is_set():
+                segment = self.next_segment()
+
+                if segment is None:
+                    break
+
+                if not await self.download_segment(segment):
+                    self.release_segment(segment)
+
+                    if self.file.file_writer.error:
+                        self.on_write_error(self.file)
+                        break
+
+        finally:
+            self.exited = True
+
+            if self.on_chunk_end:
+                self.on_chunk_end()
+
+    async def download_segment(self, segment: Segment):
+        retry = download_retry_policy.begin("download")
+
+        while not self.stop_event.is_set() and not segment.cancelled:
+            downloaded = 0
+
+            mirror = self.acquire_mirror()
+            self.request_end = self.get_request_end(segment, mirror)
+
+            self.slot = await connection_scheduler.acquire_async(self.task_id, mirror.host, self.stop_event)
+
+            if self.slot is None:
+                self.file.mirror_pool.release(mirror)
+                self.mirror = None
+                break
+
+            try:
+                async with self.client.stream("GET", mirror.url, headers = self.get_headers(segment), follow_redirects = True, timeout = 10) as response:
+                    response.raise_for_status()
+
+                    self.check_range(segment, mirror, response)
+                    expected_size = self.get_expected_size(segment, response)
+                    self.start_sample()
+
+                    async for chunk in response.aiter_bytes(chunk_size = 8192):
+                        if self.stop_event.is_set() or segment.cancelled:
+                            break
+
+                        if chunk := self.clip_chunk(segment, chunk):
+                            await rate_limiter.consume_async(len(chunk), self.task_id, mirror.host, self.stop_event)
+
+                            for offset, buffer, length in self.write_chunk(segment, mirror, chunk):
+                                await self.file.file_writer.submit_async(offset, buffer, length, self.get_write_callback(segment, offset, length))
+
+                            downloaded += len(chunk)
+
+                        if segment.pos >= min(segment.end, self.request_end) or self.yield_requested:
+                            break
+
+                    self.flush_sample(mirror)
+
+                if self.stop_event.is_set() or segment.cancelled:
+                    break
+
+                if self.yield_requested and segment.pos < segment.end:
+                    continue
+
+                if self.check_segment(segment, downloaded, expected_size):
+                    await self.file.file_writer.submit_async(*self.flush_buffer(segment, finished = True))
+
+                    return True
+
+            except asyncio.CancelledError:
+                raise
+
+            except Exception as e:
+                if self.stop_event.is_set() or segment.cancelled or self.file.file_writer.error:
+                    break
+
+                if (delay := self.on_request_error(mirror, e, retry, downloaded)) is None:
+                    break
+
+                await asyncio.sleep(delay)
+
+            finally:
+                self.release_connection(mirror)
+
+                await self.submit_remaining(segment)
+
+        return False
+
+    async def submit_remaining(self, segment: Segment):
+        if self.file.file_writer.error:
+            self.discard_buffer(segment)
+            return
+
+        if item := self.flush_buffer(segment):
+            try:
+                await self.file.file_writer.submit_async(*item)
+
+            except Exception:
+                self.discard_buffer(segment, item)
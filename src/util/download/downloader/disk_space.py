@@ -0,0 +1,56 @@
+from threading import Lock
+from pathlib import Path
+import shutil
+import os
+
+class DiskSpaceReserver:
+    """记录各任务尚需占用的磁盘空间，同一磁盘上的任务开始下载前需确保剩余空间足够容纳所有已预留的部分"""
+    def __init__(self):
+        self.lock = Lock()
+
+        # task_id -> (设备号, 预留字节数)
+        self.reservations: dict[str, tuple[int, int]] = {}
+
+        # 额外保留的余量，避免把磁盘写满影响系统与其他程序
+        self.margin = 64 * 1024 * 1024
+
+    def reserve(self, task_id: str, directory: Path, size: int):
+        # 空间足够时登记预留并返回 True
+        with self.lock:
+            self.reservations.pop(task_id, None)
+
+            device = os.stat(directory).st_dev
+
+            # 剩余空间需同时容纳本任务与同一磁盘上所有其他任务尚未占用的预留
+            if shutil.disk_usage(directory).free - self.get_reserved_size(device) < size + self.margin:
+                return False
+
+            self.reservations[task_id] = (device, size)
+
+            return True
+
+    def consume(self, task_id: str, size: int):
+        # 文件预分配后已实际占用磁盘空间，从预留中扣除
+        with self.lock:
+            if reservation := self.reservations.get(task_id):
+                device, reserved = reservation
+
+                self.reservations[task_id] = (device, max(reserved - size, 0))
+
+    def release(self, task_id: str):
+        with self.lock:
+            self.reservations.pop(task_id, None)
+
+    def get_available_size(self, directory: Path, device: int = None):
+        # 剩余空间减去同一磁盘上其他任务已预留的部分
+        if device is None:
+            device = os.stat(directory).st_dev
+
+        with self.lock:
+            return shutil.disk_usage(directory).free - self.get_reserved_size(device)
+
+    def get_reserved_size(self, device: int):
+        # 需在持有 lock 时调用
+        return sum(size for reserved_device, size in self.reservations.values() if reserved_device == device)
+
+disk_space_reserver = DiskSpaceReserver()
@@ -1,180 +1,94 @@
-from PySide6.QtCore import QRunnable, QThreadPool, QObject, QTimer, Slot, QMetaObject, Q_ARG
-from PySide6.QtCore import Qt
+from PySide6.QtCore import QThreadPool, QObject, QTimer, Slot, QMetaObject, Qt, Q_ARG
 
-from util.common.enum import DownloadStatus, DownloadType, MediaType
+from util.common.enum import DownloadStatus, DownloadType, MediaType, DownloadEngine
 from util.parse.additional.worker import AdditionalParseWorker
 from util.common import signal_bus, config, Translator, File
 from util.thread import GlobalThreadPoolTask, AsyncTask
 from util.common.data import reversed_video_quality_map
-from util.network import get_cookies
+from util.format import Units
 
 from ..task.info import TaskInfo
 from ..task.manager import task_manager
-from .parse_worker import ParseWorker
+from .chunk_worker import ChunkWorkerBase, ChunkWorker, AsyncChunkWorker
+from .scheduler import connection_scheduler
+from .host_tuner import host_tuner
+from .engine import download_engine
+from .rate_limiter import rate_limiter
+from .segment import SegmentTable
+from .writer import FileWriter
+from .disk_space import disk_space_reserver
+from .mirror import MirrorPool
+from .file_set import FileSet, DownloadFile
+from .stats import SpeedMeter
+from .parse_worker import ParseWorker, UrlRefreshWorker
+from .part_concat import PartConcat
+from .stream_index import StreamIndex, stream_index
+from .session_pool import session_pool
 from .merger import Merger
 
 from threading import Event, Lock
 from pathlib import Path
-import httpx
+import errno
+import statistics
+import logging
 import json
 import time
 
-class TokenBucket:
-    """线程安全的令牌桶，用于平滑限制下载速度"""
-    def __init__(self, rate: float):
-        """
-        :param rate: 令牌产生速率（字节/秒），若为0则不限速
-        """
-        self.rate = rate
-        self.tokens = rate
-        self.last_update = time.monotonic()
-        self.lock = Lock()
-
-    def consume(self, amount: int, stop_event: Event = None):
-        if self.rate <= 0:
-            return
-
-        sleep_time = 0
-        with self.lock:
-            now = time.monotonic()
-            elapsed = now - self.last_update
-            self.last_update = now
-
-            self.tokens += elapsed * self.rate
-            if self.tokens > self.rate:
-                self.tokens = self.rate
-            
-            self.tokens -= amount
-            if self.tokens < 0:
-                sleep_time = -self.tokens / self.rate
-
-        if sleep_time > 0:
-            # 分段休眠，防止阻塞暂停信号
-            while sleep_time > 0:
-                if stop_event and stop_event.is_set():
-                    break
-                s = min(0.1, sleep_time)
-                time.sleep(s)
-                sleep_time -= s
-
-    def set_rate(self, rate: float):
-        with self.lock:
-            self.rate = rate
-            self.tokens = rate
-            self.last_update = time.monotonic()
-
-class ChunkWorker(QRunnable):
-    def __init__(self, session: httpx.Client, file_key: str, chunk_index: int, chunk_range: tuple[int, int], file_path: Path, url: str, referer: str, task_info: TaskInfo, stop_event: Event, lock: Lock, token_bucket: TokenBucket, parent=None, on_chunk_start=None, on_chunk_end=None):
-        super().__init__()
-        self.session = session
-        self.file_key = file_key
-        self.chunk_index = chunk_index
-        self.chunk_range = chunk_range
-        self.chunk_size = chunk_range[1] - chunk_range[0]
-        self.file_path = file_path
-        self.url = url
-        self.referer = referer
-        self.task_info = task_info
-        self.stop_event = stop_event
-        self.lock = lock
-        self.token_bucket = token_bucket
-        self.parent = parent
-        self.on_chunk_start = on_chunk_start
-        self.on_chunk_end = on_chunk_end
-
-    def run(self):
-        if self.stop_event.is_set():
-            return
-        
-        if self.on_chunk_start:
-            self.on_chunk_start()
-            
-        headers = {
-            "Range": f"bytes={self.chunk_range[0]}-{self.chunk_range[1] - 1}"
-        }
-
-        while not self.stop_event.is_set():
-            downloaded = 0
-            try:
-                with open(self.file_path, "r+b") as f:
-                    f.seek(self.chunk_range[0])
-
-                    with self.session.stream("GET", self.url, headers = headers, follow_redirects = True, timeout = 10) as response:
-                        response.raise_for_status()
-
-                        # 获取服务端实际承诺下发的体量。若是最后一个切片且 CDN 数据缩水，它将以实际值为准
-                        expected_size = int(response.headers.get("Content-Length", self.chunk_size))
-                        
-                        for chunk in response.iter_bytes(chunk_size = 8192):
-                            if self.stop_event.is_set():
-                                break
-                            
-                            if chunk:
-                                chunk_len = len(chunk)
-                                if self.token_bucket:
-                                    self.token_bucket.consume(chunk_len, self.stop_event)
-
-                                f.write(chunk)
-                                downloaded += chunk_len
-                                
-                                with self.lock:
-                                    self.task_info.Download.downloaded_size += chunk_len
-                                    
-                # 如果中途被停止，跳出循环退出
-                if self.stop_event.is_set():
-                    break
-                    
-                # 检查区块是否真下载到了服务端承诺的大小（原为严格检测 self.chunk_size）
-                if downloaded >= expected_size:
-                    QMetaObject.invokeMethod(
-                        self.parent, "on_chunk_finished",
-                        Qt.ConnectionType.QueuedConnection,
-                        Q_ARG(str, self.file_key),
-                        Q_ARG(int, self.chunk_index)
-                    )
-                    break
-                else:
-                    # 提前结束但没有报错，说明连接意外断开，触发重试
-                    raise StopIteration(f"Chunk mismatch (Expected: {expected_size}, Got: {downloaded}), triggering retry.")
-
-            except Exception:
-                if self.stop_event.is_set():
-                    break
-                
-                # 发生异常（断网、超时等），清空本轮的下载计数并等待后重试（区块从头下）
-                with self.lock:
-                    self.task_info.Download.downloaded_size -= downloaded
-
-                time.sleep(1)
-
-        if self.on_chunk_end:
-            self.on_chunk_end()
+logger = logging.getLogger(__name__)
 
 class Downloader(QObject):
     def __init__(self, task_info: TaskInfo):
         super().__init__()
         self.task_info = task_info
-        self.init_session()
-        self.thread_pool = QThreadPool()
-        self.thread_pool.setMaxThreadCount(config.get(config.download_thread))
+        self.session = None
+        self.thread_pool = None
 
-        # 实例化令牌桶（0 为不限速，单位：字节/秒）。此处从已有配置文件中取值或直接扩展
-        if config.get(config.speed_limit_enabled):
-            rate = config.get(config.speed_limit_rate) * 1024 * 1024
-        else:
-            rate = 0
-        
-        self.token_bucket = TokenBucket(rate = rate)
+        # 看门狗：连接速度连续 stall_ticks 次低于任务中位数的 stall_ratio 倍时，为其剩余部分发起对冲请求
+        self.stall_ratio = 0.2
+        self.stall_ticks = 3
+        self.max_hedges = 2
+        self.min_hedge_size = 512 * 1024
+
+        # 下载链接过期后重新解析，两次刷新至少间隔 url_refresh_interval 秒
+        self.url_refresh_interval = 60
+        self.last_url_refresh = 0
+        self.url_refreshing = False
+        self.refresh_lock = Lock()
+
+        # 异步引擎模式下由共享的事件循环驱动所有任务，无需为每个任务创建线程池
+        self.engine = config.get(config.download_engine)
+
+        if self.engine == DownloadEngine.THREAD:
+            self.thread_pool = QThreadPool()
+            self.thread_pool.setMaxThreadCount(self.get_max_workers() + self.max_hedges)
 
-        self.chunk_size = 4 * 1024 * 1024
+        # 剩余不足 2 倍该值的区间不再被窃取切分，避免产生大量细碎请求
+        self.min_split_size = 1 * 1024 * 1024
         self.download_list = {}
+        self.file_set = FileSet()
+
+        # 旧版分段视频边下载边合并
+        self.part_concat: PartConcat = None
+
+        # 等待其他任务下载完成的流，键为流索引的 key，值为 file_key
+        self.waiting_streams: dict[str, str] = {}
+
+        # 已落盘的字节数加上各连接自行累加的计数即为当前的下载量
+        self.workers: list[ChunkWorkerBase] = []
+        self.base_downloaded_size = 0
+
+        # 已退出并移出 workers 的连接按文件累计的字节数，用于计算各文件的速度
+        self.base_file_downloaded_size: dict[str, int] = {}
+
+        # 任务与各文件的平滑速度，各连接的速度由连接自身的 speed_meter 记录
+        self.speed_meter = SpeedMeter()
+        self.file_speed_meters: dict[str, SpeedMeter] = {}
 
         self._stop_event = Event()
-        self.update_lock = Lock()
         self.count_lock = Lock()
 
         self.active_workers = 0
-        self.last_sampled_size = 0
+        self.worker_count = 0
         self.wait_flag = False
         self.wait_callback = None
         
@@ -184,6 +98,9 @@ class Downloader(QObject):
         self.speed_timer.setInterval(1000)
         self.speed_timer.timeout.connect(self._calculate_speed)
 
+        stream_index.stream_completed.connect(self.on_stream_completed)
+        stream_index.stream_released.connect(self.on_stream_released)
+
     def start(self):
         self._completion_triggered = False
 
@@ -221,11 +138,87 @@ class Downloader(QObject):
             self.task_info.Download.queue = download_info["download_queue"]
 
         self.update_info(download_info)
+
+        if not self.reserve_disk_space():
+            return
+
         self.start_worker()
-        self.start_timer()
+
+        # 磁盘空间不足被挂起时不再启动速度采样
+        if not self._stop_event.is_set():
+            self.start_timer()
+
+    def reserve_disk_space(self):
+        # 开始下载前一次性检查整个下载队列所需的空间：尚未预分配的文件，以及 FFmpeg 合并输出的文件
+        directory = Path(self.task_info.File.download_path, self.task_info.File.folder)
+        directory.mkdir(parents = True, exist_ok = True)
+
+        required_size = self.task_info.Download.total_size
+
+        for file_key in self.task_info.Download.queue:
+            info = self.download_list.get(file_key, {})
+
+            if not Path(directory, info.get("file_name", "")).exists():
+                required_size += info.get("file_size", 0)
+
+        if disk_space_reserver.reserve(self.task_info.Basic.task_id, directory, required_size):
+            return True
+
+        self.hold_for_disk_space(required_size, disk_space_reserver.get_available_size(directory))
+
+        return False
+
+    def hold_for_disk_space(self, required_size: int, available_size: int):
+        # 空间不足时挂起任务，释放空间后由用户继续，而不是下载完成后才在合并时失败
+        self.task_info.Download.status = DownloadStatus.WAITING_FOR_SPACE
+        self._stop_event.set()
+        self.speed_timer.stop()
+        self.save_segments()
+        self.close_writers()
+
+        connection_scheduler.unregister(self.task_info.Basic.task_id)
+        disk_space_reserver.release(self.task_info.Basic.task_id)
+
+        self.update_item(self.task_info)
+        signal_bus.download.auto_manage_concurrent_downloads.emit()
+        signal_bus.toast.show_long_message.emit(
+            Translator.ERROR_MESSAGES("INSUFFICIENT_SPACE"),
+            Translator.TIP_MESSAGES("WAITING_FOR_SPACE_DETAIL").format(required = Units.format_file_size(required_size), available = Units.format_file_size(max(available_size, 0)))
+        )
+
+    @Slot(str)
+    def on_write_error(self, file_key: str):
+        # 写入线程出错后各连接已停止领取区间，磁盘已满时挂起任务等待空间，其他错误直接结束任务
+        if self.task_info is None or self._stop_event.is_set() or (file := self.file_set.get(file_key)) is None:
+            return
+
+        error = file.file_writer.error
+
+        if isinstance(error, OSError) and error.errno == errno.ENOSPC:
+            required_size = sum(file.segment_table.remaining_size for file in self.file_set.values())
+
+            self.hold_for_disk_space(required_size, disk_space_reserver.get_available_size(file.file_writer.path.parent))
+            return
+
+        logger.error("写入文件失败：%s", file.file_writer.path, exc_info = error)
+
+        self._stop_event.set()
+        self.speed_timer.stop()
+        self.save_segments()
+        self.close_writers()
+        self.stop_part_concat()
+        self.release_streams()
+        self.release_session()
+
+        connection_scheduler.unregister(self.task_info.Basic.task_id)
+        rate_limiter.remove_task(self.task_info.Basic.task_id)
+
+        self.on_parse_error(str(error))
 
     @Slot(str)
     def on_parse_error(self, error_message: str):
+        disk_space_reserver.release(self.task_info.Basic.task_id)
+
         self.task_info.Download.status = DownloadStatus.FAILED
         self.update_item(self.task_info)
         signal_bus.download.auto_manage_concurrent_downloads.emit()
@@ -235,10 +228,168 @@ class Downloader(QObject):
         )
 
     def start_worker(self):
-        if not self.task_info.Download.queue:
+        # 队列中的所有文件同时下载，各连接从全部文件中领取区间，共用同一份连接预算
+        self.file_set = FileSet()
+        self.waiting_streams = {}
+        self.worker_count = 0
+
+        for file_key in list(self.task_info.Download.queue):
+            # 本地已有或其他任务正在下载的流不再重复下载
+            if self.reuse_stream(file_key):
+                continue
+
+            if not self.prepare_file(file_key):
+                return
+
+        self.calc_downloaded_size()
+        self.start_part_concat()
+
+        for file_key in list(self.task_info.Download.queue):
+            if (file := self.file_set.get(file_key)) and file.segment_table.is_finished:
+                # 所有区间已在上次运行中完成，仅差出队
+                self.on_chunk_finished(file_key, 0)
+
+        self.start_workers(self.get_worker_count())
+
+        task_manager.update(self.task_info)
+
+    def start_workers(self, count: int):
+        if not self.file_set.values():
             return
-            
-        file_key = self.task_info.Download.queue[0]
+
+        self.worker_count = self.worker_count or self.get_worker_count()
+
+        # 向连接调度器登记需求，实际可用的连接数由调度器在所有任务间公平分配，对冲请求也占用该任务的份额
+        connection_scheduler.register(self.task_info.Basic.task_id, demand = self.worker_count + self.max_hedges)
+
+        if self.engine == DownloadEngine.ASYNC:
+            download_engine.start()
+
+        self.acquire_session()
+
+        for _ in range(count):
+            self.start_chunk_worker()
+
+    def reuse_stream(self, file_key: str):
+        # 返回 True 表示该文件改为从本地副本获取，或等待其他任务下载完成后共享
+        key = StreamIndex.make_key(self.task_info, file_key)
+        info = self.download_list.get(file_key, {})
+        path = Path(self.task_info.File.download_path, self.task_info.File.folder, info.get("file_name", ""))
+
+        # 已开始下载的文件继续断点续传
+        if self.task_info.Download.files[file_key].get("segments") is not None or path.exists():
+            stream_index.claim(key, self.task_info.Basic.task_id)
+            return False
+
+        if source := stream_index.lookup(key, info.get("file_size", 0)):
+            self.copy_stream(file_key, source, path)
+            return True
+
+        if not stream_index.claim(key, self.task_info.Basic.task_id):
+            self.waiting_streams[key] = file_key
+            return True
+
+        return False
+
+    def copy_stream(self, file_key: str, source: Path, target: Path):
+        key = StreamIndex.make_key(self.task_info, file_key)
+
+        def worker():
+            # 内容与记录不一致时同样改为重新下载
+            if success := stream_index.verify(key, source):
+                try:
+                    StreamIndex.link_or_copy(source, target)
+
+                except OSError:
+                    logger.warning("复制已下载的流失败，改为重新下载：%s", source, exc_info = True)
+                    success = False
+
+            QMetaObject.invokeMethod(self, "on_stream_reused", Qt.ConnectionType.QueuedConnection, Q_ARG(str, file_key), Q_ARG(bool, success))
+
+        self.download_list[file_key]["file_path"] = target
+
+        GlobalThreadPoolTask.run_func(worker)
+
+    @Slot(str, bool)
+    def on_stream_reused(self, file_key: str, success: bool):
+        if self.task_info is None or file_key not in self.task_info.Download.queue:
+            return
+
+        if not success:
+            self.add_download_file(file_key)
+            return
+
+        file_info = self.task_info.Download.files[file_key]
+        file_info["segments"] = SegmentTable.encode([])
+
+        self.base_downloaded_size += file_info.get("file_size", 0)
+
+        # 副本同样登记到索引中，原文件被删除后仍可复用
+        stream_index.register(StreamIndex.make_key(self.task_info, file_key), self.download_list[file_key]["file_path"])
+
+        self.on_file_completed(file_key)
+
+    @Slot(str)
+    def on_stream_completed(self, key: str):
+        # 其他任务下载完成了本任务等待的流
+        if self.task_info is None or (file_key := self.waiting_streams.pop(key, None)) is None:
+            return
+
+        info = self.download_list.get(file_key, {})
+
+        if source := stream_index.lookup(key, info.get("file_size", 0)):
+            self.copy_stream(file_key, source, Path(self.task_info.File.download_path, self.task_info.File.folder, info.get("file_name", "")))
+        else:
+            self.add_download_file(file_key)
+
+    @Slot(str)
+    def on_stream_released(self, key: str):
+        # 负责下载的任务被暂停或删除，由本任务接手
+        if self.task_info is None or (file_key := self.waiting_streams.pop(key, None)) is None:
+            return
+
+        if stream_index.claim(key, self.task_info.Basic.task_id):
+            self.add_download_file(file_key)
+        else:
+            self.waiting_streams[key] = file_key
+
+    def release_streams(self):
+        # 放弃本任务负责下载的流，等待这些流的任务会接手
+        self.waiting_streams = {}
+
+        stream_index.release(self.task_info.Basic.task_id)
+
+    def add_download_file(self, file_key: str):
+        # 下载开始后再加入的文件，连接不足时补充
+        if self._stop_event.is_set() or not self.prepare_file(file_key):
+            return
+
+        # 开始时所有文件都在等待其他任务，尚未确定连接数
+        self.worker_count = self.worker_count or self.get_worker_count()
+
+        self.start_workers(max(self.worker_count - self.active_workers, 0))
+
+    def start_part_concat(self):
+        self.stop_part_concat()
+
+        if not PartConcat.is_supported(self.task_info):
+            return
+
+        self.part_concat = PartConcat(self.task_info, self)
+        self.part_concat.start()
+
+        # 上次运行中已完成的分段不在队列中，直接送入
+        for index in range(self.task_info.Download.video_parts_count):
+            if f"video_part_{index}" not in self.task_info.Download.queue:
+                self.part_concat.add_part(index)
+
+    def stop_part_concat(self):
+        if self.part_concat:
+            self.part_concat.abort()
+            self.part_concat = None
+
+    def prepare_file(self, file_key: str):
+        # 预分配文件并创建区间表、镜像池与写入线程，磁盘空间不足时挂起任务并返回 False
         info = self.download_list.get(file_key, {})
 
         path = Path(self.task_info.File.download_path, self.task_info.File.folder, info.get("file_name", ""))
@@ -246,43 +397,114 @@ class Downloader(QObject):
 
         file_size = info.get("file_size", 0)
         if not path.exists() and file_size > 0:
-            File.preallocate_file(path, file_size)
+            try:
+                allocated = File.preallocate_file(path, file_size)
+
+            except OSError as e:
+                if e.errno != errno.ENOSPC:
+                    raise
+
+                # 预留后磁盘空间仍被其他程序占用，删除未分配完成的文件后挂起
+                path.unlink(missing_ok = True)
+                self.hold_for_disk_space(file_size, disk_space_reserver.get_available_size(path.parent))
+                return False
+
+            # 只创建了稀疏文件时空间在写入过程中才被占用，保留预留直到任务结束，避免其他任务按剩余空间超额开始
+            if allocated:
+                disk_space_reserver.consume(self.task_info.Basic.task_id, file_size)
 
         info["file_path"] = path
-        chunk_list = self.calc_chunk_list(file_key, file_size, self.chunk_size)
-        self.calc_downloaded_size()
 
-        for chunk_index in chunk_list:
-            chunk_range = self.calc_chunk_range(chunk_index, self.chunk_size, file_size)
-            worker = ChunkWorker(
-                session = self.session,
-                file_key = file_key,
-                chunk_index = chunk_index,
-                chunk_range = chunk_range,
-                file_path = path,
-                url = info.get("url", ""),
-                referer = self.task_info.Episode.url,
-                task_info = self.task_info,
-                stop_event = self._stop_event,
-                lock = self.update_lock,
-                token_bucket = self.token_bucket,
-                parent = self,
-                on_chunk_start = self.on_chunk_start,
-                on_chunk_end = self.on_chunk_end
-            )
-            self.thread_pool.start(worker)
+        self.file_set.add(DownloadFile(
+            file_key = file_key,
+            segment_table = self.get_segment_table(file_key, file_size),
+            # 每个文件只由一个写入线程持有文件描述符，各连接提交缓冲区后即可继续接收数据
+            file_writer = FileWriter(path),
+            # 兼容解析结果中只有单个链接的情况
+            mirror_pool = MirrorPool(info.get("url_list") or [info.get("url", "")])
+        ))
+
+        return True
+
+    def start_chunk_worker(self, **kwargs):
+        worker_kwargs = {
+            "file_set": self.file_set,
+            "referer": self.task_info.Episode.url,
+            "task_info": self.task_info,
+            "stop_event": self._stop_event,
+            "parent": self,
+            "on_chunk_start": self.on_chunk_start,
+            "on_chunk_end": self.on_chunk_end,
+            "on_url_expired": self.request_url_refresh
+        }
 
-        task_manager.update(self.task_info)
+        match self.engine:
+            case DownloadEngine.THREAD:
+                worker = ChunkWorker(session = self.session, **worker_kwargs, **kwargs)
+                self.workers.append(worker)
+                self.thread_pool.start(worker)
+
+            case DownloadEngine.ASYNC:
+                worker = AsyncChunkWorker(client = self.session, **worker_kwargs, **kwargs)
+                self.workers.append(worker)
+                download_engine.submit(worker.run())
+
+    def get_max_workers(self):
+        # 自动调整时连接数可增长到全局上限
+        if host_tuner.enabled:
+            return config.get(config.max_connections)
+
+        return config.get(config.download_thread)
+
+    def get_worker_count(self):
+        # 自动调整时按各镜像主机学到的连接数之和启动连接
+        if host_tuner.enabled and self.file_set:
+            hosts = {mirror.host for file in self.file_set.values() for mirror in file.mirror_pool.mirrors}
+
+            return max(1, min(sum(host_tuner.get_limit(host) for host in hosts), self.get_max_workers()))
+
+        return config.get(config.download_thread)
+
+    def tune_workers(self):
+        # 主机连接数上限调高后补充连接，调低时多出的连接由调度器让出并排队等待
+        worker_count = self.get_worker_count()
+
+        if worker_count == self.worker_count:
+            return
+
+        connection_scheduler.register(self.task_info.Basic.task_id, demand = worker_count + self.max_hedges)
+
+        # 调低后排队中的连接仍在运行，只补足缺少的部分
+        for _ in range(worker_count - self.active_workers):
+            self.start_chunk_worker()
+
+        self.worker_count = worker_count
 
     def start_merge(self):
         self.task_info.Download.status = DownloadStatus.MERGING
-        merge_worker = Merger(self.task_info, parent=self)
+        merge_worker = Merger(self.task_info, parent=self, part_concat=self.part_concat)
         merge_worker.start()
 
+        # 重试合并时按列表重新合并
+        self.part_concat = None
+
     def pause(self):
         self.task_info.Download.status = DownloadStatus.PAUSED
+        self.task_info.Download.eta = -1
+        self.task_info.Download.file_stats = {}
         self._stop_event.set()
         self.speed_timer.stop()
+        self.save_segments()
+        self.close_writers()
+        self.stop_part_concat()
+        self.release_streams()
+        self.release_session()
+
+        connection_scheduler.unregister(self.task_info.Basic.task_id)
+        disk_space_reserver.release(self.task_info.Basic.task_id)
+        rate_limiter.remove_task(self.task_info.Basic.task_id)
+
+        task_manager.update(self.task_info)
 
     def resume(self):
         self.task_info.Download.status = DownloadStatus.DOWNLOADING
@@ -296,64 +518,98 @@ class Downloader(QObject):
             case DownloadStatus.FFMPEG_FAILED:
                 self.start_merge()
 
-    def calc_chunk_list(self, file_key: str, total_size: int, chunk_size: int) -> list:
+    def get_segment_table(self, file_key: str, file_size: int):
         file_info = self.task_info.Download.files[file_key]
-        if chunk_list := file_info.get("chunks_list"):
-            return chunk_list
-        
-        total_chunks = (total_size + chunk_size - 1) // chunk_size if total_size > 0 else 0
-        if total_chunks == 0:
-            total_chunks = 1
-            
-        chunk_list = list(range(total_chunks))
-        file_info["total_chunks"] = total_chunks
-        file_info["chunks_list"] = chunk_list.copy()
-        return chunk_list
-
-    def calc_chunk_range(self, chunk_index: int, chunk_size: int, total_size: int):
-        start = chunk_index * chunk_size
-        end = min(start + chunk_size, total_size) if total_size > 0 else 0
-        return start, end
+
+        segment_table = SegmentTable(
+            file_size = file_size,
+            segments = SegmentTable.load(file_info),
+            parts = config.get(config.download_thread),
+            min_split_size = self.min_split_size
+        )
+
+        file_info["segments"] = segment_table.dump()
+
+        return segment_table
+
+    def save_segments(self):
+        # 将各文件当前的切分点写回 task_info，以便暂停或重启后断点续传
+        for file in self.file_set.values():
+            if file_info := self.task_info.Download.files.get(file.file_key):
+                file_info["segments"] = file.segment_table.dump()
+
+    def close_writers(self):
+        # 关闭写入线程，队列中剩余的数据仍会写完
+        for file in self.file_set.values():
+            file.file_writer.close()
     
     def calc_downloaded_size(self):
         downloaded_size = 0
         
-        for file_info in self.task_info.Download.files.values():
-            total_chunks = file_info.get("total_chunks", 0)
+        for file_key, file_info in self.task_info.Download.files.items():
             file_size = file_info.get("file_size", 0)
-            chunks_list = file_info.get("chunks_list", [])
-
-            if total_chunks > 0:
-                # 只累加确实已经完全下载完成的区块的实际大小
-                for i in range(total_chunks):
-                    if i not in chunks_list:
-                        start = i * self.chunk_size
-                        end = min(start + self.chunk_size, file_size) if file_size > 0 else 0
-                        downloaded_size += (end - start)
-
-        with self.update_lock:
-            self.task_info.Download.downloaded_size = downloaded_size
+            segments = SegmentTable.load(file_info)
+
+            if file_key not in self.task_info.Download.queue:
+                downloaded_size += file_size
+
+            elif segments is not None:
+                # 只累加不在未完成区间内的字节
+                downloaded_size += file_size - SegmentTable.pending_size(segments)
+
+        # 重新计算后，之前的连接接收的字节已包含在内，不再参与汇总
+        self.base_downloaded_size = downloaded_size
+        self.base_file_downloaded_size = {}
+        self.workers = []
+        self.file_speed_meters = {}
+
+        self.task_info.Download.downloaded_size = downloaded_size
+
+    def get_downloaded_size(self):
+        # 各连接的计数由连接自身修改，读取时不加锁，最多少算正在写入的一块
+        return self.base_downloaded_size + sum(worker.downloaded_size for worker in self.workers)
+
+    def prune_workers(self):
+        # 已退出的连接不会再修改计数，并入基数后移除，workers 不会随重试、对冲与扩容不断增长
+        workers = []
+
+        for worker in self.workers:
+            if not worker.exited:
+                workers.append(worker)
+                continue
+
+            self.base_downloaded_size += worker.downloaded_size
+
+            for file_key, size in worker.file_downloaded_size.items():
+                self.base_file_downloaded_size[file_key] = self.base_file_downloaded_size.get(file_key, 0) + size
+
+        self.workers = workers
     
     @Slot(str, int)
-    def on_chunk_finished(self, file_key: str, chunk_index: int):
-        with self.update_lock:
-            file_info = self.task_info.Download.files.get(file_key, {})
-            if chunk_index in file_info.get("chunks_list", []):
-                file_info["finished_chunks"] += 1
-                file_info["chunks_list"].remove(chunk_index)
+    def on_chunk_finished(self, file_key: str, start: int):
+        self.save_segments()
 
-            total = file_info.get("total_chunks", 1)
-            current_progress = int((file_info.get("finished_chunks", 0) / total) * 100) if total > 0 else 100
+        file = self.file_set.get(file_key)
 
-        task_manager.update(self.task_info)
+        # 各文件独立完成，其余文件的连接不受影响
+        if file is not None and file.segment_table.is_finished:
+            self.file_set.remove(file_key)
+            file.file_writer.close()
 
-        if current_progress >= 100:
-            if file_key in self.task_info.Download.queue:
-                self.task_info.Download.queue.remove(file_key)
+            stream_index.register(StreamIndex.make_key(self.task_info, file_key), self.download_list[file_key]["file_path"])
 
-            if self.task_info.Download.queue and not self._stop_event.is_set():
-                self.start_worker()
-                return
+            self.on_file_completed(file_key)
+        else:
+            task_manager.update(self.task_info)
+
+    def on_file_completed(self, file_key: str):
+        if file_key in self.task_info.Download.queue:
+            self.task_info.Download.queue.remove(file_key)
+
+        if self.part_concat and file_key.startswith("video_part_"):
+            self.part_concat.add_part(int(file_key.rsplit("_", 1)[1]))
+
+        task_manager.update(self.task_info)
 
         # 若队列全空，且任务没被暂停/取消，意味着所有文件下载完成
         if not self.task_info.Download.queue and self.task_info.Download.status == DownloadStatus.DOWNLOADING:
@@ -363,9 +619,7 @@ class Downloader(QObject):
         if not self.task_info.Download.files:
             self.task_info.Download.files = {
                 file_key: {
-                    "chunks_list": [],
-                    "total_chunks": 0,
-                    "finished_chunks": 0,
+                    "segments": None,
                     "file_size": download_info["download_list"][file_key].get("file_size", 0)
                 } for file_key in download_info["download_queue"]
             }
@@ -388,25 +642,17 @@ class Downloader(QObject):
 
             task_manager._update_media_info(self.task_info)
 
-    def init_session(self):
-        limits = httpx.Limits(max_keepalive_connections = config.get(config.download_thread), max_connections = config.get(config.download_thread))
-        transport = httpx.HTTPTransport(retries = 5)
-
-        headers = {
-            "Referer": self.task_info.Episode.url,
-            "User-Agent": config.get(config.user_agent)
-        }
-
-        self.session = httpx.Client(
-            limits = limits,
-            transport = transport,
-            headers = headers
-        )
+    def acquire_session(self):
+        # 会话从共享的会话池中借用，保持的连接可在任务之间复用
+        if self.session is None:
+            self.session = session_pool.acquire(is_async = self.engine == DownloadEngine.ASYNC)
 
-        cookies = get_cookies()
+    def release_session(self):
+        # 归还会话而不关闭，其连接留给之后的任务；Cookie 或代理变化后由会话池关闭旧会话
+        if self.session is not None:
+            session_pool.release(self.session)
 
-        for key, value in cookies.items():
-            self.session.cookies.set(name = key, value = value, domain = ".bilibili.com", path = "/")
+            self.session = None
 
     def on_download_completed(self):
         # 防抖设定，避免队列完成以及进度到 100 时重复触发
@@ -438,12 +684,55 @@ class Downloader(QObject):
         self.task_info.Download.status = DownloadStatus.FFMPEG_QUEUED
 
         self._stop_event.set()
-        self.session.close()
         self.speed_timer.stop()
 
+        connection_scheduler.unregister(self.task_info.Basic.task_id)
+        rate_limiter.remove_task(self.task_info.Basic.task_id)
+        self.close_writers()
+        self.release_streams()
+        self.release_session()
+
         task_manager.update(self.task_info)
         signal_bus.download.auto_manage_concurrent_downloads.emit()
 
+    def request_url_refresh(self):
+        # 由各连接在链接过期时调用，同一时间只进行一次刷新，且限制刷新频率
+        with self.refresh_lock:
+            now = time.monotonic()
+
+            if self.url_refreshing or now - self.last_url_refresh < self.url_refresh_interval or self._stop_event.is_set():
+                return
+
+            self.url_refreshing = True
+            self.last_url_refresh = now
+
+        GlobalThreadPoolTask.run(UrlRefreshWorker(self.task_info, self))
+
+    @Slot(str)
+    def on_urls_refreshed(self, download_info_json: str):
+        with self.refresh_lock:
+            self.url_refreshing = False
+
+        if not download_info_json or self._stop_event.is_set() or self.file_set is None:
+            return
+
+        download_list = json.loads(download_info_json)["download_list"]
+
+        for file in self.file_set.values():
+            entry = download_list.get(file.file_key)
+            info = self.download_list.get(file.file_key, {})
+
+            # 大小不一致说明解析到了不同的流，继续下载会拼接出错误的文件
+            if not entry or entry.get("file_size") != info.get("file_size"):
+                logger.warning("刷新下载链接后文件大小不一致，保留原链接：%s", file.file_key)
+                continue
+
+            info["url"] = entry.get("url")
+            info["url_list"] = entry.get("url_list")
+
+            # 已完成和正在下载的区间不受影响，各连接下次请求时即使用新链接
+            file.mirror_pool.update_urls(info["url_list"] or [info["url"]])
+
     def on_chunk_start(self):
         with self.count_lock:
             self.active_workers += 1
@@ -464,30 +753,118 @@ class Downloader(QObject):
             on_end()
 
     def start_timer(self):
-        self.last_sampled_size = self.task_info.Download.downloaded_size
+        self.speed_meter.reset(self.task_info.Download.downloaded_size)
         self.speed_timer.start()
 
     def _calculate_speed(self):
-        with self.update_lock:
-            current_size = self.task_info.Download.downloaded_size
+        now = time.monotonic()
+
+        self.prune_workers()
+        current_size = self.get_downloaded_size()
 
-        speed = current_size - self.last_sampled_size
-        self.task_info.Download.speed = speed if speed > 0 else 0
+        speed = self.speed_meter.update(current_size, now)
         total = getattr(self.task_info.Download, "total_size", 0)
+
+        self.task_info.Download.downloaded_size = current_size
+        self.task_info.Download.speed = int(speed)
         self.task_info.Download.progress = int(current_size / total * 100) if total > 0 else 100
-        self.last_sampled_size = current_size
+        self.task_info.Download.eta = SpeedMeter.eta(total - current_size, speed)
 
+        self.update_file_stats(now)
+        self.check_stalls()
+
+        if host_tuner.enabled:
+            self.tune_workers()
+
+        self.save_segments()
         self.update_item(self.task_info)
 
         # timer 的定期检查：如果队列为空且处于 DOWNLOADING 状态可以尝试转移到合并步骤
         if not self.task_info.Download.queue and self.task_info.Download.status == DownloadStatus.DOWNLOADING:
             self.on_download_completed()
 
+    def update_file_stats(self, now: float):
+        # 按文件汇总各连接的字节数，分别计算速度与剩余时间
+        for worker in self.workers:
+            worker.speed_meter.update(worker.downloaded_size, now)
+
+        file_stats = {}
+
+        for file in self.file_set.values():
+            file_key, segment_table = file.file_key, file.segment_table
+
+            file_size = self.base_file_downloaded_size.get(file_key, 0) + sum(worker.file_downloaded_size.get(file_key, 0) for worker in self.workers)
+            speed = self.file_speed_meters.setdefault(file_key, SpeedMeter()).update(file_size, now)
+            remaining_size = segment_table.remaining_size
+
+            file_stats[file_key] = {
+                "speed": int(speed),
+                "eta": SpeedMeter.eta(remaining_size, speed),
+                "remaining": remaining_size,
+                "hedges": dict(segment_table.hedge_stats)
+            }
+
+        self.task_info.Download.file_stats = file_stats
+
+    def check_stalls(self):
+        # 找出速度远低于任务中位数的连接，在另一个镜像上重复请求其剩余部分，先完成的一方生效，另一方随即取消
+        if self._stop_event.is_set():
+            return
+
+        downloading = [worker for worker in self.workers if worker.file is not None and worker.segment is not None and worker.mirror is not None]
+
+        if len(downloading) < 2:
+            return
+
+        median_speed = statistics.median(worker.speed_meter.value for worker in downloading)
+
+        # 线程池中排队尚未运行的对冲连接同样计入
+        hedges = sum(1 for worker in self.workers if worker.is_hedge and not worker.exited)
+
+        for worker in downloading:
+            file, segment = worker.file, worker.segment
+
+            if segment.group is not None or segment.remaining < self.min_hedge_size or worker.speed_meter.value >= median_speed * self.stall_ratio:
+                worker.stall_ticks = 0
+                continue
+
+            worker.stall_ticks += 1
+
+            if worker.stall_ticks < self.stall_ticks or hedges >= self.max_hedges:
+                continue
+
+            if hedge := file.segment_table.hedge(segment):
+                self.start_chunk_worker(initial_file = file, initial_segment = hedge, avoid_mirror = worker.mirror)
+
+                hedges += 1
+
+    def get_diagnostics(self):
+        # 任务当前的速度、各文件、各连接与镜像的状态，用于排查下载缓慢等问题
+        return {
+            "task_id": self.task_info.Basic.task_id,
+            "status": self.task_info.Download.status,
+            "speed": self.task_info.Download.speed,
+            "eta": self.task_info.Download.eta,
+            "downloaded_size": self.task_info.Download.downloaded_size,
+            "total_size": self.task_info.Download.total_size,
+            "files": self.task_info.Download.file_stats,
+            "connections": [worker.stats() for worker in self.workers],
+            "mirrors": {file.file_key: file.mirror_pool.stats() for file in self.file_set.values()}
+        }
+
     def on_delete(self):
-        self.session = None
+        connection_scheduler.unregister(self.task_info.Basic.task_id)
+        disk_space_reserver.release(self.task_info.Basic.task_id)
+        rate_limiter.remove_task(self.task_info.Basic.task_id)
+        self.close_writers()
+        self.stop_part_concat()
+        self.release_streams()
+        self.release_session()
+
         self.thread_pool = None
         self.task_info = None
         self.download_list = None
+        self.file_set = None
         self.deleteLater()
     
     def update_item(self, task_info: TaskInfo):
@@ -0,0 +1,30 @@
+from util.thread import EventLoopThread
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+class AsyncDownloadEngine(EventLoopThread):
+    """所有任务共用的异步下载引擎，在单独的线程中运行一个事件循环，以协程驱动各任务的下载区间；
+    各任务的 AsyncClient 从会话池借用，代理与 Cookie 变化后自动换用新的会话"""
+    def __init__(self):
+        super().__init__()
+
+        self.active_coroutines = 0
+
+    def submit(self, coroutine):
+        return self.run_coroutine(self._track(coroutine))
+
+    async def _track(self, coroutine):
+        self.active_coroutines += 1
+
+        try:
+            return await coroutine
+
+        except Exception:
+            logger.exception("异步下载协程异常退出")
+
+        finally:
+            self.active_coroutines -= 1
+
+download_engine = AsyncDownloadEngine()
@@ -0,0 +1,50 @@
+from .segment import SegmentTable
+from .mirror import MirrorPool
+from .writer import FileWriter
+
+from dataclasses import dataclass
+from threading import Lock
+
+@dataclass(eq = False)
+class DownloadFile:
+    file_key: str
+    segment_table: SegmentTable
+    file_writer: FileWriter
+    mirror_pool: MirrorPool
+
+class FileSet:
+    """任务中所有待下载的文件，各连接从全部文件中领取区间，共用同一份连接预算"""
+    def __init__(self):
+        self.files: dict[str, DownloadFile] = {}
+        self.lock = Lock()
+
+    def add(self, file: DownloadFile):
+        with self.lock:
+            self.files[file.file_key] = file
+
+    def remove(self, file_key: str):
+        with self.lock:
+            return self.files.pop(file_key, None)
+
+    def get(self, file_key: str):
+        with self.lock:
+            return self.files.get(file_key)
+
+    def values(self):
+        with self.lock:
+            return list(self.files.values())
+
+    def acquire(self):
+        # 优先领取无人负责的区间，按 剩余字节 ÷ (已分配连接数 + 1) 挑选文件，使各文件同时开始下载且大文件分得更多连接；
+        # 都已分配时再从剩余最多的文件中窃取
+        files = self.values()
+
+        for file in sorted(files, key = lambda file: file.segment_table.remaining_size / (file.segment_table.owned_count + 1), reverse = True):
+            if segment := file.segment_table.acquire(steal = False):
+                return file, segment
+
+        for file in sorted(files, key = lambda file: file.segment_table.remaining_size, reverse = True):
+            if segment := file.segment_table.acquire():
+                return file, segment
+
+        return None, None
@@ -0,0 +1,201 @@
+from util.common.enum import RetryErrorType
+from util.network import RetryPolicy
+from util.common import config, appdata_path, get_timestamp
+
+from dataclasses import dataclass
+from threading import Lock
+from pathlib import Path
+import logging
+import json
+import time
+
+logger = logging.getLogger(__name__)
+
+# 只有超时、断开、风控和服务端错误说明连接过多，链接过期等错误不参与调整
+CONGESTION_ERROR_TYPES = (RetryErrorType.TIMEOUT, RetryErrorType.RESET, RetryErrorType.RISK_CONTROL, RetryErrorType.SERVER_ERROR)
+
+@dataclass
+class HostState:
+    limit: int
+    window_start: float
+
+    # 当前观察窗口内的统计
+    size: int = 0
+    samples: int = 0
+    errors: int = 0
+    peak_active: int = 0
+
+    last_goodput: float = None      # 上一个窗口的有效吞吐量（字节/秒）
+    hold: int = 0                   # 暂停增加连接的剩余窗口数
+
+class HostTuner:
+    """按主机自动调整连接数：吞吐量随连接数增加而提升时逐个增加，出现限流或错误时减半，学到的连接数保存在应用数据目录中"""
+    def __init__(self, window: float = 5.0, gain_ratio: float = 0.05, error_ratio: float = 0.2, probe_windows: int = 6, save_interval: float = 30.0, max_saved_hosts: int = 200, saved_ttl: int = 30 * 24 * 3600):
+        """
+        :param window: 观察窗口时长（秒），每个窗口结束时调整一次
+        :param gain_ratio: 增加连接后吞吐量提升不足该比例时，撤回本次增加
+        :param error_ratio: 窗口内错误占比超过该值时连接数减半
+        :param probe_windows: 撤回或减半后，等待该数量的窗口再重新尝试增加
+        :param save_interval: 两次写入文件的最短间隔（秒），期间的调整合并为一次写入
+        :param max_saved_hosts: 最多保存的主机数量，CDN 节点的主机名经常变化，超出时丢弃最久未调整的记录
+        :param saved_ttl: 超过该时长（秒）未调整的记录不再保存
+        """
+        self.window = window
+        self.gain_ratio = gain_ratio
+        self.error_ratio = error_ratio
+        self.probe_windows = probe_windows
+        self.save_interval = save_interval
+        self.max_saved_hosts = max_saved_hosts
+        self.saved_ttl = saved_ttl
+
+        self.path = Path(appdata_path) / "Bili23 Downloader" / "host_limits.json"
+        self.lock = Lock()
+        self.save_lock = Lock()
+
+        self.hosts: dict[str, HostState] = {}
+
+        # {主机: {"limit": 连接数, "time": 最近调整的时间戳}}
+        self.saved_limits = self.load()
+        self.dirty = False
+        self.last_save = 0
+
+    @property
+    def enabled(self):
+        return config.get(config.download_thread_auto)
+
+    @property
+    def max_limit(self):
+        return config.get(config.max_host_connections)
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding = "utf-8") as f:
+                data = json.load(f)
+
+            # 旧版只记录连接数
+            return {host: {"limit": int(value), "time": get_timestamp()} if not isinstance(value, dict) else {"limit": int(value["limit"]), "time": int(value.get("time", 0))} for host, value in data.items()}
+
+        except (OSError, ValueError, AttributeError, KeyError, TypeError):
+            return {}
+
+    def save(self, force: bool = False):
+        # 在锁外写入文件，记录吞吐量的连接线程不会因磁盘读写而阻塞；正在写入时跳过，未保存的调整留到下次
+        if not self.dirty or not self.save_lock.acquire(blocking = False):
+            return
+
+        try:
+            with self.lock:
+                if not force and time.monotonic() - self.last_save < self.save_interval:
+                    return
+
+                self.prune_saved_limits()
+
+                snapshot = dict(self.saved_limits)
+                self.dirty = False
+                self.last_save = time.monotonic()
+
+            with open(self.path, "w", encoding = "utf-8") as f:
+                json.dump(snapshot, f, ensure_ascii = False, indent = 4)
+
+        except OSError:
+            logger.warning("保存主机连接数失败", exc_info = True)
+
+        finally:
+            self.save_lock.release()
+
+    def prune_saved_limits(self):
+        # 丢弃过期的记录，仍超出数量上限时保留最近调整的主机
+        expire_time = get_timestamp() - self.saved_ttl
+        hosts = sorted((host for host, entry in self.saved_limits.items() if entry["time"] >= expire_time), key = lambda host: self.saved_limits[host]["time"], reverse = True)
+
+        self.saved_limits = {host: self.saved_limits[host] for host in hosts[:self.max_saved_hosts]}
+
+    def get_state(self, host: str):
+        if (state := self.hosts.get(host)) is None:
+            # 新主机从上次学到的连接数开始，没有记录时以用户设置的线程数为起点
+            limit = self.saved_limits.get(host, {}).get("limit", config.get(config.download_thread))
+
+            state = self.hosts[host] = HostState(limit = limit, window_start = time.monotonic())
+
+        return state
+
+    def get_limit(self, host: str):
+        with self.lock:
+            return max(1, min(self.get_state(host).limit, self.max_limit))
+
+    def update_active(self, host: str, active: int):
+        # 由连接调度器在分配连接后调用，连接数未用满时不据此增加
+        with self.lock:
+            state = self.get_state(host)
+            state.peak_active = max(state.peak_active, active)
+
+    def record(self, host: str, size: int):
+        if not self.enabled:
+            return
+
+        with self.lock:
+            state = self.get_state(host)
+            state.size += size
+            state.samples += 1
+
+            self.adjust(host, state)
+
+        self.save()
+
+    def record_error(self, host: str, error: Exception):
+        if not self.enabled or RetryPolicy.classify(error) not in CONGESTION_ERROR_TYPES:
+            return
+
+        with self.lock:
+            state = self.get_state(host)
+            state.errors += 1
+
+            self.adjust(host, state)
+
+        self.save()
+
+    def adjust(self, host: str, state: HostState):
+        now = time.monotonic()
+        elapsed = now - state.window_start
+
+        if elapsed < self.window:
+            return
+
+        goodput = state.size / elapsed
+        limit = state.limit
+
+        if state.errors and state.errors / (state.errors + state.samples) > self.error_ratio:
+            # 乘性减少：服务端开始限流或出错
+            limit = max(1, limit // 2)
+            state.hold = self.probe_windows
+
+        elif state.peak_active < limit:
+            # 连接数未用满，吞吐量不能反映该上限的效果
+            pass
+
+        elif state.hold:
+            state.hold -= 1
+
+        elif state.last_goodput is None or goodput > state.last_goodput * (1 + self.gain_ratio):
+            # 加性增加：上次增加连接后吞吐量仍有提升
+            limit = min(limit + 1, self.max_limit)
+
+        else:
+            # 增加连接没有带来提升，撤回并保持一段时间
+            limit = max(1, limit - 1)
+            state.hold = self.probe_windows
+
+        state.last_goodput = goodput if state.peak_active >= state.limit else state.last_goodput
+        state.window_start = now
+        state.size = state.samples = state.errors = state.peak_active = 0
+
+        if limit != state.limit:
+            state.limit = limit
+            self.saved_limits[host] = {"limit": limit, "time": get_timestamp()}
+            self.dirty = True
+
+    def stats(self):
+        with self.lock:
+            return {host: {"limit": state.limit, "goodput": int(state.last_goodput or 0), "hold": state.hold} for host, state in self.hosts.items()}
+
+host_tuner = HostTuner()
@@ -1,9 +1,11 @@
 from util.common.enum import ToastNotificationCategory
 from util.common import signal_bus, Translator
+from util.network import retry_metrics, single_flight, response_cache
 
 from ..task.info import TaskInfo
 
 from .downloader import Downloader
+from .scheduler import connection_scheduler
 
 class DownloaderManager:
     def __init__(self):
@@ -51,6 +53,16 @@ class DownloaderManager:
         if downloader:
             downloader.wait(callback)
 
+    def get_diagnostics(self):
+        # 所有下载任务、连接调度器的运行状态，各处的重试次数以及接口请求的合并与缓存情况
+        return {
+            "scheduler": connection_scheduler.stats(),
+            "retries": retry_metrics.stats(),
+            "single_flight": single_flight.stats(),
+            "response_cache": response_cache.stats(),
+            "tasks": [downloader.get_diagnostics() for downloader in self.downloaders.values() if downloader.task_info]
+        }
+
     def show_notification(self):
         # 如果没有正在下载的任务了，发射下载完成的通知信号
 
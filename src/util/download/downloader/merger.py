@@ -6,6 +6,9 @@ from util.ffmpeg import FFmpegCommand, FFmpegRunner
 
 from ..task.manager import task_manager
 from ..task.info import TaskInfo
+from .disk_space import disk_space_reserver
+from .part_concat import PartConcat
+from .stream_index import stream_index
 
 from pathlib import Path
 import logging
@@ -13,10 +16,11 @@ import logging
 logger = logging.getLogger(__name__)
 
 class Merger(QObject):
-    def __init__(self, task_info: TaskInfo, parent = None):
+    def __init__(self, task_info: TaskInfo, parent = None, part_concat: PartConcat = None):
         super().__init__(parent)
 
         self.task_info = task_info
+        self.part_concat = part_concat
         self._has_error = False
         self._ffmpeg_runner = None
 
@@ -69,6 +73,25 @@ class Merger(QObject):
             )
 
     def merge_video_parts(self):
+        # 下载期间已开始边下载边合并时，等待其结束，失败再按列表重新合并
+        if self.part_concat:
+            if self.part_concat.success is None:
+                self.part_concat.finished.connect(self.on_part_concat_finished)
+                return
+
+            if self.part_concat.success:
+                self.on_merge_completed(0, "", "")
+                return
+
+        self.concat_video_parts()
+
+    def on_part_concat_finished(self, success: bool):
+        if success:
+            self.on_merge_completed(0, "", "")
+        else:
+            self.concat_video_parts()
+
+    def concat_video_parts(self):
         cwd = self.get_cwd()
 
         lists_path = self.create_lists_file(self.task_info.Download.video_parts_count)
@@ -105,7 +128,8 @@ class Merger(QObject):
                 self.add_file(self.final_video_file_name, self.final_audio_file_name, clear = True)
 
             elif has_video and not has_audio:
-                safe_rename(cwd, self.temp_video_file_name, self.final_mp4_video_file_name)
+                video_path = safe_rename(cwd, self.temp_video_file_name, self.final_mp4_video_file_name)
+                stream_index.move(Path(cwd, self.temp_video_file_name), video_path)
                 self.add_file(self.final_mp4_video_file_name, clear = True)
 
             elif has_audio and not has_video:
@@ -127,6 +151,7 @@ class Merger(QObject):
             safe_rename(cwd, self.temp_output_file_name, self.final_output_file_name)
 
             if not self.task_info.Download.keep_original_files:
+                self.retain_streams(*self.task_info.File.relative_files)
                 safe_remove(cwd, *self.task_info.File.relative_files)
             else:
                 self.keep_original_files()
@@ -143,7 +168,10 @@ class Merger(QObject):
             return
 
         try:
-            safe_remove(self.get_cwd(), getattr(self, "_temp_m4a_audio_name", self.temp_audio_file_name))
+            temp_audio_file_name = getattr(self, "_temp_m4a_audio_name", self.temp_audio_file_name)
+
+            self.retain_streams(temp_audio_file_name)
+            safe_remove(self.get_cwd(), temp_audio_file_name)
             self.rename_output_file()
 
         except Exception as e:
@@ -156,6 +184,8 @@ class Merger(QObject):
         self.task_info.Download.status = DownloadStatus.COMPLETED
         self.task_info.Basic.completed_time = get_timestamp()
 
+        disk_space_reserver.release(self.task_info.Basic.task_id)
+
         task_manager.mark_as_completed(self.task_info)
 
         signal_bus.download.auto_manage_concurrent_downloads.emit()
@@ -165,11 +195,20 @@ class Merger(QObject):
     def keep_original_files(self):
         try:
             cwd = self.get_cwd()
-            safe_rename(cwd, self.temp_video_file_name, self.final_video_file_name)
-            safe_rename(cwd, self.temp_audio_file_name, self.final_audio_file_name)
+            video_path = safe_rename(cwd, self.temp_video_file_name, self.final_video_file_name)
+            audio_path = safe_rename(cwd, self.temp_audio_file_name, self.final_audio_file_name)
+
+            # 保留的原始文件仍可供之后相同的流复用
+            stream_index.move(Path(cwd, self.temp_video_file_name), video_path)
+            stream_index.move(Path(cwd, self.temp_audio_file_name), audio_path)
         except Exception as e:
             self.set_error_message(Translator.ERROR_MESSAGES("RENAME_FAILED"), str(e))
 
+    def retain_streams(self, *file_names: str):
+        # 下载的原始流在删除前移交给流索引保留，之后相同的流无需重新下载
+        for file_name in file_names:
+            stream_index.retain(Path(self.get_cwd(), file_name))
+
     def on_merge_error(self, error: Exception, stdout: str, stderr: str):
         error_map = {
             "No space left on device": "INSUFFICIENT_SPACE",
@@ -201,6 +240,8 @@ class Merger(QObject):
         self._has_error = True
         self.task_info.Download.status = DownloadStatus.FFMPEG_FAILED
 
+        disk_space_reserver.release(self.task_info.Basic.task_id)
+
         signal_bus.download.update_downloading_item.emit(self.task_info)
         signal_bus.toast.show_long_message.emit(short_message, description)
 
@@ -0,0 +1,134 @@
+from .stats import ewma
+
+from dataclasses import dataclass
+from urllib.parse import urlparse
+from threading import Lock
+import time
+
+@dataclass(eq = False)
+class Mirror:
+    url: str
+    host: str
+
+    speed: float = None             # 单连接吞吐量的指数滑动平均（字节/秒），None 表示尚未测量
+    error_rate: float = 0.0         # 请求失败率的指数滑动平均
+    active: int = 0                 # 正在使用该镜像的连接数
+    failures: int = 0               # 连续失败次数
+    disabled_until: float = 0.0
+
+    range_limit: int = 0            # 单次请求允许的最大范围，0 表示不限，服务端拒绝大范围请求时降级为按块请求
+    range_supported: bool = True    # 服务端忽略 Range 请求头时为 False
+
+class MirrorPool:
+    """同一文件的多个镜像，按实测吞吐量和失败率为新区间挑选镜像"""
+    def __init__(self, url_list: list[str], alpha: float = 0.3, max_failures: int = 3, cooldown: float = 30.0):
+        """
+        :param alpha: 滑动平均的权重，越大越偏向最近的测量值
+        :param max_failures: 连续失败达到该次数后暂停使用该镜像
+        :param cooldown: 暂停使用的时长（秒）
+        """
+        self.mirrors = [Mirror(url, urlparse(url).netloc) for url in dict.fromkeys(url_list) if url]
+        self.alpha = alpha
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+
+        self.lock = Lock()
+
+    def acquire(self, is_host_available = None, exclude: Mirror = None):
+        """
+        :param is_host_available: 可选的主机过滤函数，用于避开连接数已满的主机
+        :param exclude: 尽量避开的镜像，如对冲请求需避开原连接所用的慢速镜像
+        """
+        with self.lock:
+            now = time.monotonic()
+
+            # 全部镜像都处于冷却中时，仍然从中挑选，保证下载不会停止
+            available = [mirror for mirror in self.mirrors if mirror.disabled_until <= now] or self.mirrors
+
+            # 忽略 Range 的镜像只能从头下载，有其他镜像时不再使用
+            available = [mirror for mirror in available if mirror.range_supported] or available
+
+            if is_host_available:
+                available = [mirror for mirror in available if is_host_available(mirror.host)] or available
+
+            if exclude:
+                available = [mirror for mirror in available if mirror is not exclude] or available
+
+            # 优先试探尚未测速的镜像，其余按 吞吐量 × 成功率 ÷ 已分配连接数 打分，将连接分摊到多个镜像
+            mirror = max(available, key = lambda mirror: self.score(mirror))
+            mirror.active += 1
+
+            return mirror
+
+    def update_urls(self, url_list: list[str]):
+        # 链接过期后替换为新解析的链接，同一主机的测速结果与 Range 支持情况继续沿用
+        with self.lock:
+            old_mirrors = {mirror.host: mirror for mirror in self.mirrors}
+            self.mirrors = []
+
+            for url in dict.fromkeys(url_list):
+                if not url:
+                    continue
+
+                mirror = Mirror(url, urlparse(url).netloc)
+
+                if old := old_mirrors.get(mirror.host):
+                    mirror.speed = old.speed
+                    mirror.range_limit = old.range_limit
+                    mirror.range_supported = old.range_supported
+
+                self.mirrors.append(mirror)
+
+    def release(self, mirror: Mirror):
+        with self.lock:
+            mirror.active -= 1
+
+    def score(self, mirror: Mirror):
+        if mirror.speed is None:
+            return float("inf") if mirror.active == 0 else 0
+
+        return mirror.speed * (1 - mirror.error_rate) / (mirror.active + 1)
+
+    def record(self, mirror: Mirror, size: int, elapsed: float):
+        if elapsed <= 0:
+            return
+
+        speed = size / elapsed
+
+        with self.lock:
+            mirror.speed = ewma(mirror.speed, speed, self.alpha)
+            mirror.error_rate *= 1 - self.alpha
+            mirror.failures = 0
+
+    def record_error(self, mirror: Mirror):
+        with self.lock:
+            mirror.error_rate = ewma(mirror.error_rate, 1, self.alpha)
+            mirror.failures += 1
+
+            if mirror.failures >= self.max_failures:
+                mirror.disabled_until = time.monotonic() + self.cooldown
+                mirror.failures = 0
+
+    def limit_range(self, mirror: Mirror, size: int):
+        # 只会收紧，多个连接同时发现限制时以最小值为准
+        with self.lock:
+            if mirror.range_limit == 0 or size < mirror.range_limit:
+                mirror.range_limit = max(size, 1)
+
+    def disable_range(self, mirror: Mirror):
+        with self.lock:
+            mirror.range_supported = False
+
+    def stats(self):
+        with self.lock:
+            return [
+                {
+                    "host": mirror.host,
+                    "speed": int(mirror.speed or 0),
+                    "error_rate": round(mirror.error_rate, 3),
+                    "active": mirror.active,
+                    "range_limit": mirror.range_limit,
+                    "range_supported": mirror.range_supported,
+                    "disabled": mirror.disabled_until > time.monotonic()
+                } for mirror in self.mirrors
+            ]
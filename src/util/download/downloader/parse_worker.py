@@ -5,7 +5,7 @@ from util.download.parse.audio_info import AudioInfoParser
 from util.common.enum import DownloadType, MediaType
 from util.parse.episode.tree import Attribute
 from util.parse.parser.base import ParserBase
-from util.network import SyncNetWorkRequest
+from util.network import SyncNetWorkRequest, response_cache
 from util.common import config, Translator
 
 from ..task.info import TaskInfo
@@ -28,10 +28,7 @@ class ParseWorker(QRunnable, ParserBase):
 
     def run(self):
         try:
-            self.get_info()
-
-            if not self.error:
-                download_info = self.parse_download_info()
+            if download_info := self.resolve():
                 download_info_json = json.dumps(download_info, ensure_ascii = False)
 
                 QMetaObject.invokeMethod(
@@ -46,6 +43,13 @@ class ParseWorker(QRunnable, ParserBase):
 
             self.on_parse_error(Translator.ERROR_MESSAGES("PARSE_FAILED"))
 
+    def resolve(self):
+        # 请求 playurl 并解析出各文件的下载链接，失败时返回 None
+        self.get_info()
+
+        if not self.error:
+            return self.parse_download_info()
+
     def get_info(self):
         if self.task_info.Episode.attribute & Attribute.VIDEO_BIT:
             self.get_video_info()
@@ -195,4 +199,30 @@ class ParseWorker(QRunnable, ParserBase):
         filtered_download_list = {key: entry for key, entry in download_list.items() if key in self.task_info.Download.queue}
 
         return filtered_download_list
-    
\ No newline at end of file
+    
+class UrlRefreshWorker(ParseWorker):
+    """下载链接过期后按任务已选定的清晰度和编码重新获取链接，不影响任务状态"""
+    def run(self):
+        download_info_json = ""
+
+        try:
+            # 旧链接已过期，不能再使用缓存的 playurl
+            with response_cache.bypass():
+                download_info = self.resolve()
+
+            if download_info:
+                download_info_json = json.dumps(download_info, ensure_ascii = False)
+
+        except:
+            logger.exception("刷新下载链接失败")
+
+        # 失败时传递空字符串，下载器据此结束本次刷新
+        QMetaObject.invokeMethod(
+            self.parent,
+            "on_urls_refreshed",
+            Qt.ConnectionType.QueuedConnection,
+            Q_ARG(str, download_info_json)
+        )
+
+    def on_parse_error(self, error_message: str):
+        self.error = True
@@ -0,0 +1,148 @@
+from PySide6.QtCore import QObject, Signal
+
+from util.ffmpeg import FFmpegCommand
+from util.common import config
+
+from ..task.info import TaskInfo
+
+from threading import Thread, Lock
+from pathlib import Path
+from queue import Queue
+import subprocess
+import tempfile
+import logging
+import shutil
+import os
+
+logger = logging.getLogger(__name__)
+
+class PartConcat(QObject):
+    """旧版分段视频边下载边合并：开头的分段下载完成后即转为 TS 流，按顺序送入常驻的 FFmpeg 进程"""
+    finished = Signal(bool)
+
+    # 由合并线程发出，在主线程中更新结果，避免与 Merger 的检查产生竞争
+    _run_finished = Signal(bool)
+
+    def __init__(self, task_info: TaskInfo, parent = None):
+        super().__init__(parent)
+
+        self.task_info = task_info
+        self.parts_count = task_info.Download.video_parts_count
+
+        self.lock = Lock()
+        self.queue: Queue[Path | None] = Queue()
+        self.finished_parts: set[int] = set()
+        self.next_index = 0
+
+        self.process: subprocess.Popen = None
+        self.aborted = False
+
+        # 只在主线程中更新，None 表示尚未结束
+        self.success: bool = None
+
+        self._run_finished.connect(self.on_run_finished)
+
+    @staticmethod
+    def is_supported(task_info: TaskInfo):
+        # 需要嵌入封面时仍由合并步骤统一处理
+        if task_info.Download.video_parts_count < 2 or task_info.Download.merge_video_audio:
+            return False
+
+        if config.get(config.attach_cover) or config.no_ffmpeg_available:
+            return False
+
+        return True
+
+    def start(self):
+        Thread(target = self.run, daemon = True).start()
+
+    def add_part(self, index: int):
+        # 分段可能乱序完成，只按顺序送入已就绪的前缀
+        with self.lock:
+            self.finished_parts.add(index)
+
+            while self.next_index in self.finished_parts:
+                self.queue.put(self.get_part_path(self.next_index))
+                self.next_index += 1
+
+                if self.next_index == self.parts_count:
+                    self.queue.put(None)
+
+    def abort(self):
+        self.aborted = True
+        self.queue.put(None)
+
+        if self.process and self.process.poll() is None:
+            self.process.kill()
+
+    def run(self):
+        cwd = self.get_cwd()
+        kwargs = {}
+
+        if os.name == "nt":
+            kwargs["creationflags"] = getattr(subprocess, "CREATE_NO_WINDOW", 0x08000000)
+
+        try:
+            with tempfile.TemporaryFile() as stderr:
+                self.process = subprocess.Popen(FFmpegCommand.concat_mpegts_stream(self.temp_output_file_name).build(), stdin = subprocess.PIPE, stdout = subprocess.DEVNULL, stderr = stderr, cwd = cwd, **kwargs)
+
+                while (path := self.queue.get()) is not None and not self.aborted:
+                    self.feed(path, cwd, kwargs)
+
+                self.process.stdin.close()
+                return_code = self.process.wait()
+
+                if return_code != 0 and not self.aborted:
+                    stderr.seek(0)
+                    logger.warning("分段边下载边合并失败，将在下载完成后重新合并：%s", stderr.read().decode("utf-8", errors = "replace"))
+
+                success = return_code == 0 and not self.aborted
+
+        except Exception:
+            logger.exception("分段边下载边合并失败")
+
+            success = False
+
+            if self.process and self.process.poll() is None:
+                self.process.kill()
+
+        if not success:
+            Path(cwd, self.temp_output_file_name).unlink(missing_ok = True)
+
+        self._run_finished.emit(success)
+
+    def on_run_finished(self, success: bool):
+        self.success = success
+
+        self.finished.emit(success)
+
+    def feed(self, path: Path, cwd: Path, kwargs: dict):
+        # 转封装的输出直接写入合并进程的标准输入，不产生中间文件
+        remux = subprocess.Popen(FFmpegCommand.remux_to_mpegts(path.name).build(), stdout = subprocess.PIPE, stderr = subprocess.DEVNULL, cwd = cwd, **kwargs)
+
+        try:
+            shutil.copyfileobj(remux.stdout, self.process.stdin, 1024 * 1024)
+
+        finally:
+            remux.stdout.close()
+
+            if remux.wait() != 0:
+                raise RuntimeError(f"FFmpeg remux failed: {path.name}")
+
+    def get_cwd(self):
+        return Path(self.task_info.File.download_path, self.task_info.File.folder)
+
+    def get_part_path(self, index: int):
+        # 与 Merger.create_lists_file 使用相同的分段文件名
+        return Path(self.get_cwd(), "video_{task_id}_{index}.{ext}".format(
+            task_id = self.task_info.Basic.task_id,
+            index = index,
+            ext = self.task_info.File.video_file_ext
+        ))
+
+    @property
+    def temp_output_file_name(self):
+        return "output_{task_id}.{file_ext}".format(
+            task_id = self.task_info.Basic.task_id,
+            file_ext = self.task_info.File.merge_file_ext
+        )
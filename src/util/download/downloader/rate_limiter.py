@@ -0,0 +1,150 @@
+from util.common import config
+
+from .token_bucket import TokenBucket
+
+from threading import Event, Lock
+from datetime import datetime
+import asyncio
+import time
+
+class RateLimiter:
+    """进程级的分层限速器：全局、单个任务、单个主机各有一个令牌桶，下载的每块数据需同时满足三者"""
+    def __init__(self, refresh_interval: float = 1.0, idle_timeout: float = 60.0):
+        """
+        :param refresh_interval: 重新读取配置与时间段的间隔（秒），修改设置后无需重启下载即可生效
+        :param idle_timeout: 主机的令牌桶超过该时长（秒）未使用时移除
+        """
+        self.refresh_interval = refresh_interval
+        self.last_refresh = 0
+        self.idle_timeout = idle_timeout
+
+        self.global_bucket = TokenBucket(rate = 0)
+        self.task_buckets: dict[str, TokenBucket] = {}
+        self.host_buckets: dict[str, TokenBucket] = {}
+
+        # 主机令牌桶最后一次使用的时间。不限速时 TokenBucket 不会更新 last_update，不能据此判断是否闲置
+        self.host_last_used: dict[str, float] = {}
+
+        self.task_rate = 0
+        self.host_rate = 0
+
+        self.lock = Lock()
+
+    def reserve(self, amount: int, task_id: str, host: str):
+        # 从各层令牌桶中扣除，返回需要等待的时长，取其中最长者
+        self.refresh()
+
+        with self.lock:
+            buckets = [self.global_bucket, self.get_bucket(self.task_buckets, task_id, self.task_rate), self.get_bucket(self.host_buckets, host, self.host_rate)]
+
+            self.host_last_used[host] = time.monotonic()
+
+        return max(bucket.reserve(amount) for bucket in buckets)
+
+    def consume(self, amount: int, task_id: str, host: str, stop_event: Event):
+        # 等待期间任务被暂停时立即返回
+        if (sleep_time := self.reserve(amount, task_id, host)) > 0:
+            stop_event.wait(sleep_time)
+
+    async def consume_async(self, amount: int, task_id: str, host: str, stop_event: Event):
+        if (sleep_time := self.reserve(amount, task_id, host)) > 0 and not stop_event.is_set():
+            await asyncio.sleep(sleep_time)
+
+    def get_bucket(self, buckets: dict[str, TokenBucket], key: str, rate: float):
+        if key not in buckets:
+            buckets[key] = TokenBucket(rate = rate)
+
+        return buckets[key]
+
+    def remove_task(self, task_id: str):
+        with self.lock:
+            self.task_buckets.pop(task_id, None)
+
+    def refresh(self, force: bool = False):
+        # 定期按当前配置与时间段更新各层速率，速率未变化的令牌桶保持原状
+        now = time.monotonic()
+
+        if not force and now - self.last_refresh < self.refresh_interval:
+            return
+
+        self.last_refresh = now
+
+        global_rate, task_rate, host_rate = self.get_rates()
+
+        with self.lock:
+            if global_rate != self.global_bucket.rate:
+                self.global_bucket.set_rate(global_rate)
+
+            if task_rate != self.task_rate or host_rate != self.host_rate:
+                self.task_rate = task_rate
+                self.host_rate = host_rate
+
+                for bucket in self.task_buckets.values():
+                    bucket.set_rate(task_rate)
+
+                for bucket in self.host_buckets.values():
+                    bucket.set_rate(host_rate)
+
+            self.prune_host_buckets()
+
+    def prune_host_buckets(self):
+        # 镜像主机随链接刷新不断变化，闲置的令牌桶早已攒满令牌（或不限速），移除后重新创建的效果相同
+        now = time.monotonic()
+
+        for host in [host for host in self.host_buckets if now - self.host_last_used.get(host, 0) > self.idle_timeout]:
+            del self.host_buckets[host]
+            self.host_last_used.pop(host, None)
+
+    def reconfigure(self):
+        # 修改限速设置后立即生效
+        self.refresh(force = True)
+
+    def get_rates(self):
+        # 返回 (全局, 单任务, 单主机) 速率，单位为字节/秒，0 表示不限速
+        if not config.get(config.speed_limit_enabled):
+            return 0, 0, 0
+
+        global_rate = config.get(config.speed_limit_rate)
+
+        # 命中时间段时以时间段的速率代替全局速率
+        if (window_rate := self.get_window_rate(config.get(config.speed_limit_schedule), datetime.now())) is not None:
+            global_rate = window_rate
+
+        return tuple(int(rate * 1024 * 1024) for rate in [global_rate, config.get(config.speed_limit_task_rate), config.get(config.speed_limit_host_rate)])
+
+    @staticmethod
+    def parse_schedule(schedule: str):
+        # 解析时间段设置，如 "09:00-18:00=5, 23:00-07:00=0"，速率单位为 MB/s，0 表示不限速，格式错误的项会被忽略
+        windows = []
+
+        for item in schedule.replace("，", ",").split(","):
+            try:
+                period, rate = item.split("=")
+                start, end = period.split("-")
+
+                windows.append((RateLimiter.parse_time(start), RateLimiter.parse_time(end), float(rate)))
+
+            except ValueError:
+                continue
+
+        return windows
+
+    @staticmethod
+    def parse_time(value: str):
+        # "HH:MM" 转换为当天的分钟数
+        hour, minute = value.strip().split(":")
+
+        return int(hour) * 60 + int(minute)
+
+    @staticmethod
+    def get_window_rate(schedule: str, now: datetime):
+        minutes = now.hour * 60 + now.minute
+
+        for start, end, rate in RateLimiter.parse_schedule(schedule):
+            # 结束时间早于开始时间表示跨越午夜
+            if (start <= minutes < end) if start <= end else (minutes >= start or minutes < end):
+                return rate
+
+        return None
+
+rate_limiter = RateLimiter()
@@ -0,0 +1,255 @@
+from util.common import config
+
+from .host_tuner import host_tuner
+
+from threading import Condition, Event
+from collections import defaultdict
+from dataclasses import dataclass
+import asyncio
+
+@dataclass
+class TaskSlot:
+    task_id: str = ""
+    weight: float = 1.0
+    demand: int = 1                 # 任务最多需要的连接数
+    share: int = 1                  # 按加权公平分配得到的连接数
+    active: int = 0
+    queued: int = 0
+    yielding: int = 0               # 已被要求让出、尚未释放的连接数
+    registered: bool = True
+
+class ConnectionScheduler:
+    """进程级连接调度器，限制总连接数与单个主机的连接数，并在各下载任务间按权重公平分配"""
+    def __init__(self):
+        self.condition = Condition()
+
+        self.tasks: dict[str, TaskSlot] = {}
+        self.hosts: dict[str, int] = defaultdict(int)
+        self.host_yielding: dict[str, int] = defaultdict(int)
+
+        # 等待连接的协程，按主机分组，释放连接时由 release 唤醒
+        self.async_waiters: dict[str, list[tuple[str, asyncio.AbstractEventLoop, asyncio.Future]]] = defaultdict(list)
+
+    @property
+    def max_connections(self):
+        return config.get(config.max_connections)
+
+    @property
+    def max_host_connections(self):
+        return config.get(config.max_host_connections)
+
+    def host_limit(self, host: str):
+        # 开启自动调整时，单个主机的连接数上限由 host_tuner 根据实测结果决定
+        if host_tuner.enabled:
+            return host_tuner.get_limit(host)
+
+        return self.max_host_connections
+
+    def register(self, task_id: str, demand: int, weight: float = 1.0):
+        with self.condition:
+            slot = self.tasks.setdefault(task_id, TaskSlot(task_id = task_id))
+            slot.registered = True
+            slot.demand = demand
+            slot.weight = weight
+
+            self.rebalance()
+
+    def unregister(self, task_id: str):
+        with self.condition:
+            if slot := self.tasks.pop(task_id, None):
+                # 仍在运行的连接持有旧的 TaskSlot，释放时不会影响重新注册后的计数
+                slot.registered = False
+
+                self.rebalance()
+
+    def rebalance(self):
+        # 加权的最大最小公平分配：需求小于公平份额的任务先满足，剩余连接再按权重分给其他任务
+        budget = self.max_connections
+        pending = dict(self.tasks)
+
+        while pending:
+            total_weight = sum(slot.weight for slot in pending.values())
+            satisfied = {task_id: slot for task_id, slot in pending.items() if slot.demand <= budget * slot.weight / total_weight}
+
+            if not satisfied:
+                for slot in pending.values():
+                    # 每个任务至少保留一个连接，避免被饿死
+                    slot.share = max(1, int(budget * slot.weight / total_weight))
+                break
+
+            for task_id, slot in satisfied.items():
+                slot.share = slot.demand
+                budget -= slot.demand
+                pending.pop(task_id)
+
+        self.condition.notify_all()
+
+        # 份额变化后所有等待中的协程都需要重新检查
+        self.wake_async_waiters()
+
+    def try_acquire(self, task_id: str, host: str):
+        with self.condition:
+            return self._try_acquire(task_id, host)
+
+    def _try_acquire(self, task_id: str, host: str):
+        # 成功时返回任务的 TaskSlot，释放连接时需传回
+        slot = self.tasks.get(task_id)
+
+        if slot is None:
+            return None
+
+        if slot.active >= slot.share or self.active >= self.max_connections or self.hosts.get(host, 0) >= self.host_limit(host):
+            return None
+
+        slot.active += 1
+        self.hosts[host] += 1
+
+        host_tuner.update_active(host, self.hosts[host])
+
+        return slot
+
+    def acquire(self, task_id: str, host: str, stop_event: Event):
+        # 阻塞直到获得连接，期间定期检查停止信号
+        with self.condition:
+            self._update_queued(task_id, 1)
+
+            try:
+                while not stop_event.is_set():
+                    if slot := self._try_acquire(task_id, host):
+                        return slot
+
+                    self.condition.wait(0.1)
+
+                return None
+
+            finally:
+                self._update_queued(task_id, -1)
+
+    async def acquire_async(self, task_id: str, host: str, stop_event: Event):
+        # 等待 release 唤醒，超时只用于检查停止信号和主机上限的调整
+        loop = asyncio.get_running_loop()
+
+        with self.condition:
+            self._update_queued(task_id, 1)
+
+        try:
+            while not stop_event.is_set():
+                with self.condition:
+                    if slot := self._try_acquire(task_id, host):
+                        return slot
+
+                    waiter = loop.create_future()
+                    self.async_waiters[host].append((task_id, loop, waiter))
+
+                try:
+                    await asyncio.wait_for(waiter, 0.5)
+
+                except asyncio.TimeoutError:
+                    pass
+
+                finally:
+                    # 被唤醒时已从列表中移除，超时或协程被取消时在这里移除
+                    with self.condition:
+                        self.remove_async_waiter(host, waiter)
+
+            return None
+
+        finally:
+            with self.condition:
+                self._update_queued(task_id, -1)
+
+    def wake_async_waiters(self, host: str = None, task_id: str = None):
+        # 需在持有 condition 时调用。不指定主机时唤醒全部；否则唤醒同一主机或同一任务的等待者
+        for waiter_host in list(self.async_waiters):
+            waiters = self.async_waiters[waiter_host]
+
+            if host is None or waiter_host == host:
+                woken, remaining = waiters, []
+            else:
+                woken = [entry for entry in waiters if entry[0] == task_id]
+                remaining = [entry for entry in waiters if entry[0] != task_id]
+
+            for _, loop, waiter in woken:
+                loop.call_soon_threadsafe(self.set_waiter, waiter)
+
+            if remaining:
+                self.async_waiters[waiter_host] = remaining
+            else:
+                self.async_waiters.pop(waiter_host)
+
+    def remove_async_waiter(self, host: str, waiter: asyncio.Future):
+        if waiters := self.async_waiters.get(host):
+            waiters[:] = [entry for entry in waiters if entry[2] is not waiter]
+
+            if not waiters:
+                self.async_waiters.pop(host)
+
+    @staticmethod
+    def set_waiter(waiter: asyncio.Future):
+        # 协程可能已超时或被取消
+        if not waiter.done():
+            waiter.set_result(None)
+
+    def _update_queued(self, task_id: str, delta: int):
+        if slot := self.tasks.get(task_id):
+            slot.queued = max(slot.queued + delta, 0)
+
+    def release(self, slot: TaskSlot, host: str, yielded: bool = False):
+        """
+        :param yielded: 该连接是按 over_share 的要求让出的
+        """
+        with self.condition:
+            # 总连接数已满时，释放的连接可以给任意主机使用
+            was_full = self.active >= self.max_connections
+
+            slot.active -= 1
+
+            self.hosts[host] -= 1
+
+            if self.hosts[host] <= 0:
+                self.hosts.pop(host, None)
+
+            if yielded:
+                slot.yielding = max(slot.yielding - 1, 0)
+                self.host_yielding[host] -= 1
+
+                if self.host_yielding[host] <= 0:
+                    self.host_yielding.pop(host, None)
+
+            self.condition.notify_all()
+
+            if was_full:
+                self.wake_async_waiters()
+            else:
+                self.wake_async_waiters(host, slot.task_id)
+
+    def over_share(self, slot: TaskSlot, host: str):
+        # 重新分配后超出份额，或主机连接数上限被调低时，只有超出的那部分连接需要让出，已被要求让出的连接不再重复计算
+        with self.condition:
+            if slot.registered and slot.active - slot.yielding <= slot.share and self.hosts.get(host, 0) - self.host_yielding.get(host, 0) <= self.host_limit(host):
+                return False
+
+            slot.yielding += 1
+            self.host_yielding[host] += 1
+
+            return True
+
+    def is_host_available(self, host: str):
+        with self.condition:
+            return self.hosts.get(host, 0) < self.host_limit(host)
+
+    @property
+    def active(self):
+        return sum(self.hosts.values())
+
+    def stats(self):
+        with self.condition:
+            return {
+                "active": self.active,
+                "queued": sum(slot.queued for slot in self.tasks.values()),
+                "hosts": dict(self.hosts),
+                "host_limits": host_tuner.stats(),
+                "tasks": {task_id: {"share": slot.share, "active": slot.active, "queued": slot.queued} for task_id, slot in self.tasks.items()}
+            }
+
+connection_scheduler = ConnectionScheduler()
@@ -0,0 +1,298 @@
+from dataclasses import dataclass
+from threading import Lock
+
+# 旧版任务固定按 4MB 切片，迁移历史任务时使用
+LEGACY_CHUNK_SIZE = 4 * 1024 * 1024
+
+@dataclass(eq = False)
+class Segment:
+    start: int
+    end: int
+    pos: int = 0                    # 已接收到的末尾位置
+    written: int = 0                # 已由写入线程落盘的末尾位置，断点续传以此为准
+    owned: bool = False
+
+    group: "HedgeGroup" = None      # 发起对冲请求后，原区间与对冲区间共用同一个 HedgeGroup
+    cancelled: bool = False         # 对冲的另一方已先完成，当前请求应尽快停止
+
+    def __post_init__(self):
+        if self.pos < self.start:
+            self.pos = self.start
+
+        if self.written < self.start:
+            self.written = self.start
+
+    def commit(self, end: int):
+        # 同一区间的数据按顺序写入，只需记录最新的末尾位置
+        if end > self.written:
+            self.written = end
+
+    @property
+    def remaining(self):
+        return max(self.end - self.pos, 0)
+
+@dataclass(eq = False)
+class HedgeGroup:
+    """慢速区间与其对冲请求，两者下载相同的字节，先完成的一方生效"""
+    primary: Segment
+    hedge: Segment
+    frontier: int                   # 两者中已接收到的最远位置，之前的字节已计入下载进度
+    finished: bool = False
+    dissolved: bool = False         # 对冲请求失败后解散，原区间恢复为普通区间
+
+    def __post_init__(self):
+        self.lock = Lock()
+
+    def advance(self, pos: int, size: int):
+        # 返回新增的字节数，两个请求重复下载的部分只计一次
+        with self.lock:
+            if self.dissolved:
+                return size
+
+            gained = max(pos - self.frontier, 0)
+            self.frontier = max(pos, self.frontier)
+
+            return gained
+
+    def dissolve(self):
+        # 返回对冲请求超出原区间进度的字节数，这部分之后由原连接重新下载并计入进度
+        with self.lock:
+            self.dissolved = True
+
+            return max(self.frontier - self.primary.pos, 0)
+
+class SegmentTable:
+    """单个文件的区间表，实现工作窃取式的动态切分"""
+    def __init__(self, file_size: int, segments: list | None, parts: int, min_split_size: int):
+        """
+        :param segments: 未完成的区间 [[pos, end], ...]，pos 为已写入的末尾位置，为 None 时按 parts 均分整个文件
+        :param min_split_size: 剩余字节不足该值两倍的区间不再切分
+        """
+        self.file_size = file_size
+        self.min_split_size = min_split_size
+        self.lock = Lock()
+
+        if segments is None:
+            segments = self.split(file_size, parts, min_split_size)
+
+        # 以区间起点为键，完成时可直接移除
+        self.segments: dict[int, Segment] = {start: Segment(start, end) for start, end in segments}
+
+        self.hedge_stats = {"started": 0, "hedge_won": 0, "primary_won": 0}
+
+    @staticmethod
+    def split(file_size: int, parts: int, min_split_size: int):
+        # 初始时每个连接分得一个区间，文件过小时减少区间数量
+        parts = max(1, min(parts, file_size // max(min_split_size, 1)))
+        size = file_size // parts
+
+        segments = []
+
+        for i in range(parts):
+            start = i * size
+            end = file_size if i == parts - 1 else start + size
+
+            segments.append([start, end])
+
+        return segments
+
+    @staticmethod
+    def load(file_info: dict):
+        # 读取持久化的区间，兼容旧版 chunks_list 记录与未压缩的区间列表
+        if "chunks_list" in file_info:
+            return SegmentTable.migrate_chunks_list(file_info)
+
+        segments = file_info.get("segments")
+
+        if isinstance(segments, str):
+            return SegmentTable.decode(segments)
+
+        return segments
+
+    @staticmethod
+    def encode(segments: list):
+        # 按起点排序后记录与上一区间末尾的间隔和区间长度，以 36 进制表示，如 "0.2s,1e.5k"
+        result = []
+        last_end = 0
+
+        for start, end in sorted(segments):
+            result.append(f"{SegmentTable.to_base36(start - last_end)}.{SegmentTable.to_base36(end - start)}")
+            last_end = end
+
+        return ",".join(result)
+
+    @staticmethod
+    def decode(value: str):
+        segments = []
+        last_end = 0
+
+        for item in filter(None, value.split(",")):
+            gap, length = item.split(".")
+
+            start = last_end + int(gap, 36)
+            last_end = start + int(length, 36)
+
+            segments.append([start, last_end])
+
+        return segments
+
+    @staticmethod
+    def to_base36(value: int):
+        digits = "0123456789abcdefghijklmnopqrstuvwxyz"
+        result = ""
+
+        while True:
+            value, remainder = divmod(value, 36)
+            result = digits[remainder] + result
+
+            if value == 0:
+                return result
+
+    @staticmethod
+    def pending_size(segments: list):
+        # 未完成区间的总字节数，文件大小减去该值即为已下载的字节数
+        return sum(end - start for start, end in segments)
+
+    @staticmethod
+    def migrate_chunks_list(file_info: dict):
+        total_chunks = file_info.pop("total_chunks", 0)
+        chunks_list = sorted(file_info.pop("chunks_list", []))
+        file_info.pop("finished_chunks", None)
+
+        file_size = file_info.get("file_size", 0)
+
+        if total_chunks == 0:
+            # 尚未开始下载
+            file_info["segments"] = None
+            return None
+
+        # 将连续的未完成切片合并为一个区间
+        segments = []
+
+        for index in chunks_list:
+            start = index * LEGACY_CHUNK_SIZE
+            end = min(start + LEGACY_CHUNK_SIZE, file_size)
+
+            if segments and segments[-1][1] == start:
+                segments[-1][1] = end
+            else:
+                segments.append([start, end])
+
+        file_info["segments"] = SegmentTable.encode(segments)
+
+        return segments
+
+    def acquire(self, steal: bool = True):
+        # 优先领取无人负责的区间，否则从剩余最多的在途区间中窃取后半段
+        with self.lock:
+            for segment in self.segments.values():
+                if not segment.owned:
+                    segment.owned = True
+                    return segment
+
+            return self.steal() if steal else None
+
+    def steal(self):
+        # 已发起对冲的区间两个请求的终点必须一致，不再参与切分
+        candidates = [segment for segment in self.segments.values() if segment.remaining >= self.min_split_size * 2 and segment.group is None]
+
+        if not candidates:
+            return None
+
+        victim = max(candidates, key = lambda segment: segment.remaining)
+
+        # 切分点距离原连接当前写入位置至少 min_split_size，原连接逐块检查 end 即可无锁停在切分点
+        mid = victim.pos + victim.remaining // 2
+
+        segment = Segment(mid, victim.end, owned = True)
+        victim.end = mid
+
+        self.segments[mid] = segment
+
+        return segment
+
+    def hedge(self, segment: Segment):
+        # 为在途区间的剩余部分创建对冲区间，对冲区间不进入区间表，由单独的连接下载
+        with self.lock:
+            if segment.group is not None or self.segments.get(segment.start) is not segment or segment.remaining == 0:
+                return None
+
+            # 从已落盘的位置开始，原连接缓冲区中尚未写入的数据在对冲获胜时不会缺失
+            hedge = Segment(segment.written, segment.end, owned = True)
+            segment.group = hedge.group = HedgeGroup(segment, hedge, segment.pos)
+
+            self.hedge_stats["started"] += 1
+
+            return hedge
+
+    def finish(self, segment: Segment):
+        # 返回 False 表示该区间已由对冲的另一方完成
+        with self.lock:
+            if group := segment.group:
+                if group.finished:
+                    return False
+
+                group.finished = True
+
+                if segment is group.hedge:
+                    loser = group.primary
+                    self.hedge_stats["hedge_won"] += 1
+                else:
+                    loser = group.hedge
+                    self.hedge_stats["primary_won"] += 1
+
+                # 先标记取消再解除关联，失败的一方不会再计入下载进度
+                loser.cancelled = True
+                loser.group = None
+
+                segment = group.primary
+
+            if self.segments.get(segment.start) is segment:
+                del self.segments[segment.start]
+                return True
+
+            return False
+
+    def release(self, segment: Segment):
+        # 返回需要从对冲连接的下载进度中扣除的字节数
+        with self.lock:
+            # 对冲请求失败时直接放弃，原区间恢复为普通区间，之后可再次被窃取或对冲
+            if (group := segment.group) and segment is group.hedge:
+                segment.cancelled = True
+                segment.group = None
+
+                if group.finished:
+                    return 0
+
+                group.finished = True
+                group.primary.group = None
+
+                return group.dissolve()
+
+            segment.owned = False
+
+            return 0
+
+    def to_list(self):
+        # 只记录尚未落盘的部分，恢复时从 written 处继续下载
+        with self.lock:
+            return [[segment.written, segment.end] for segment in self.segments.values() if segment.written < segment.end]
+
+    def dump(self):
+        # 持久化到任务记录中的压缩编码
+        return self.encode(self.to_list())
+
+    @property
+    def remaining_size(self):
+        with self.lock:
+            return sum(segment.remaining for segment in self.segments.values())
+
+    @property
+    def owned_count(self):
+        with self.lock:
+            return sum(1 for segment in self.segments.values() if segment.owned)
+
+    @property
+    def is_finished(self):
+        with self.lock:
+            return not self.segments
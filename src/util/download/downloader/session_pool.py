@@ -0,0 +1,105 @@
+from util.network import Proxy, get_cookies
+from util.common import config
+
+from .engine import download_engine
+
+from dataclasses import dataclass
+from threading import Lock
+import hashlib
+import httpx
+import json
+
+@dataclass(eq = False)
+class PooledSession:
+    key: tuple
+    client: httpx.Client | httpx.AsyncClient
+    borrowers: int = 0
+
+class SessionPool:
+    """
+    下载引擎共用的会话池，按 (代理, User-Agent, Cookie, 连接数上限, 引擎) 复用 httpx.Client 或 httpx.AsyncClient，保持的连接可跨任务复用；
+    异步引擎的会话只在共享的事件循环中使用，关闭时也交由事件循环执行
+    """
+    def __init__(self):
+        self.lock = Lock()
+
+        self.sessions: dict[tuple, PooledSession] = {}
+
+    @staticmethod
+    def get_cookies_generation(cookies: dict):
+        # 以 Cookie 内容的摘要作为代次，登录、退出或刷新 Cookie 后自动换用新的会话
+        return hashlib.sha1(json.dumps(cookies, sort_keys = True).encode("utf-8")).hexdigest()
+
+    def get_key(self, proxies: dict | None, cookies: dict, is_async: bool = False):
+        proxy_url = (proxies or {}).get("https")
+
+        return (proxy_url, config.get(config.user_agent), self.get_cookies_generation(cookies), config.get(config.max_connections), is_async)
+
+    def acquire(self, is_async: bool = False):
+        """
+        :param is_async: 为 True 时返回供异步引擎使用的 httpx.AsyncClient
+        """
+        proxies = Proxy().get_proxies()
+        cookies = get_cookies()
+        key = self.get_key(proxies, cookies, is_async)
+
+        with self.lock:
+            # 设置变化后，没有任务在用的旧会话直接关闭
+            for stale in [session for session in self.sessions.values() if session.key[:-1] != key[:-1] and session.borrowers == 0]:
+                self.close(stale)
+
+            if (session := self.sessions.get(key)) is None:
+                session = self.sessions[key] = PooledSession(key, self.create_client(proxies, cookies, is_async))
+
+            session.borrowers += 1
+
+            return session.client
+
+    def release(self, client: httpx.Client | httpx.AsyncClient):
+        with self.lock:
+            session = next((session for session in self.sessions.values() if session.client is client), None)
+
+            if session is None:
+                return
+
+            session.borrowers -= 1
+
+            # 仍是当前设置的会话保留在池中，其保持的连接留给之后的任务
+            if session.borrowers <= 0 and session.key[:-1] != self.get_key(Proxy().get_proxies(), get_cookies())[:-1]:
+                self.close(session)
+
+    def close(self, session: PooledSession):
+        self.sessions.pop(session.key, None)
+
+        if isinstance(session.client, httpx.AsyncClient):
+            # 事件循环未运行时没有进行中的连接，直接丢弃
+            if download_engine.loop and download_engine.loop.is_running():
+                download_engine.run_coroutine(session.client.aclose())
+        else:
+            session.client.close()
+
+    def create_client(self, proxies: dict | None, cookies: dict, is_async: bool = False):
+        # 实际并发由连接调度器控制，连接池只需容纳全局连接上限
+        max_connections = config.get(config.max_connections)
+        limits = httpx.Limits(max_keepalive_connections = max_connections, max_connections = max_connections)
+
+        client_class, transport_class = (httpx.AsyncClient, httpx.AsyncHTTPTransport) if is_async else (httpx.Client, httpx.HTTPTransport)
+
+        # 自定义 transport 时 limits 需要传给 transport 才会生效
+        if proxy_url := (proxies or {}).get("https"):
+            client = client_class(mounts = {
+                "http://": transport_class(proxy = proxy_url, limits = limits),
+                "https://": transport_class(proxy = proxy_url, limits = limits)
+            })
+        else:
+            client = client_class(limits = limits)
+
+        # Referer 随任务不同，由各连接在请求时附带
+        client.headers["User-Agent"] = config.get(config.user_agent)
+
+        for key, value in cookies.items():
+            client.cookies.set(name = key, value = value, domain = ".bilibili.com", path = "/")
+
+        return client
+
+session_pool = SessionPool()
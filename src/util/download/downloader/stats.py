@@ -0,0 +1,52 @@
+import time
+
+def ewma(previous: float | None, sample: float, alpha: float):
+    # 指数滑动平均，尚无历史值时直接采用本次测量值
+    if previous is None:
+        return sample
+
+    return previous * (1 - alpha) + sample * alpha
+
+class SpeedMeter:
+    """按累计字节数定期采样的测速器，速度取指数滑动平均，避免每秒的字节差值剧烈跳动"""
+    def __init__(self, alpha: float = 0.3):
+        """
+        :param alpha: 滑动平均的权重，越大越偏向最近的采样
+        """
+        self.alpha = alpha
+
+        self.speed: float = None
+        self.last_size: int = None
+        self.last_time: float = None
+
+    def update(self, total_size: int, now: float = None):
+        # 传入当前累计的字节数，返回平滑后的速度（字节/秒）
+        now = time.monotonic() if now is None else now
+
+        if self.last_size is not None and now > self.last_time:
+            # 丢弃未落盘的数据后累计字节数会减少，负的采样抵消之前多计的部分
+            sample = (total_size - self.last_size) / (now - self.last_time)
+
+            self.speed = max(ewma(self.speed, sample, self.alpha), 0)
+
+        self.last_size = total_size
+        self.last_time = now
+
+        return self.value
+
+    def reset(self, total_size: int = None):
+        self.speed = None
+        self.last_size = total_size
+        self.last_time = time.monotonic() if total_size is not None else None
+
+    @property
+    def value(self):
+        return self.speed or 0
+
+    @staticmethod
+    def eta(remaining_size: int, speed: float):
+        # 剩余时间（秒），速度未知时返回 -1
+        if speed <= 0:
+            return -1
+
+        return int(remaining_size / speed)
@@ -0,0 +1,240 @@
+from PySide6.QtCore import QObject, Signal
+
+from util.common import appdata_path, Database, get_timestamp
+from util.thread import GlobalThreadPoolTask
+
+from ..task.info import TaskInfo
+
+from threading import Lock
+from pathlib import Path
+import logging
+import hashlib
+import shutil
+import sys
+import os
+
+logger = logging.getLogger(__name__)
+
+class StreamIndexDatabase(Database):
+    def __init__(self):
+        self.path = Path(appdata_path) / "Bili23 Downloader" / "stream_index.db"
+
+        self.check_and_create_table()
+
+    def check_and_create_table(self):
+        self.execute_script("""
+            PRAGMA journal_mode = WAL;
+            CREATE TABLE IF NOT EXISTS "stream" (
+                "id"	INTEGER UNIQUE,
+                "key"	TEXT,
+                "path"	TEXT,
+                "file_size"	INTEGER,
+                "mtime"	INTEGER,
+                "hash"	TEXT,
+                "created_time"	INTEGER,
+                PRIMARY KEY("id" AUTOINCREMENT),
+                UNIQUE("key", "path")
+            );""")
+
+class StreamIndex(QObject):
+    """已下载完成的音视频流索引，相同的流直接从本地链接或复制，正在下载的相同流由一个任务下载后共享"""
+    stream_completed = Signal(str)
+    stream_released = Signal(str)
+
+    def __init__(self, max_store_size: int = 4 * 1024 * 1024 * 1024):
+        """
+        :param max_store_size: 合并后保留的原始流的总大小上限，超出时删除最早保留的流
+        """
+        super().__init__()
+
+        self.db = StreamIndexDatabase()
+        self.lock = Lock()
+
+        # 合并后不再保留的原始流移入此目录，之后相同的流仍可复用
+        self.store_path = Path(appdata_path) / "Bili23 Downloader" / "streams"
+        self.max_store_size = max_store_size
+
+        # 正在下载的流与负责下载的任务
+        self.claims: dict[str, str] = {}
+
+    @staticmethod
+    def make_key(task_info: TaskInfo, file_key: str):
+        # 以 (cid, 画质, 编码, 音质) 标识一个流，音频流与画质和编码无关，对应的维度记为 0
+        download = task_info.Download
+
+        if file_key.startswith("audio"):
+            video_quality_id, video_codec_id, audio_quality_id = 0, 0, download.audio_quality_id
+        else:
+            video_quality_id, video_codec_id, audio_quality_id = download.video_quality_id, download.video_codec_id, 0
+
+        return f"{task_info.Episode.cid}/{video_quality_id}/{video_codec_id}/{audio_quality_id}/{int(download.media_type)}/{file_key}"
+
+    def lookup(self, key: str, file_size: int):
+        # 返回内容未被改动的本地副本，已删除或被修改的记录直接移除
+        for path, size, mtime in self.db.query("""
+            SELECT path, file_size, mtime FROM stream WHERE key = ?
+        """, (key, )):
+            try:
+                stat = os.stat(path)
+
+                if size == file_size and stat.st_size == size and stat.st_mtime_ns == mtime:
+                    return Path(path)
+
+            except OSError:
+                pass
+
+            self.db.execute("""
+                DELETE FROM stream WHERE key = ? AND path = ?
+            """, (key, path))
+
+        return None
+
+    def register(self, key: str, path: Path):
+        # 文件下载完成后登记，等待该流的任务随即开始链接或复制，哈希值在后台计算
+        try:
+            stat = os.stat(path)
+
+        except OSError:
+            return
+
+        self.db.execute("""
+            INSERT OR REPLACE INTO stream (key, path, file_size, mtime, hash, created_time) VALUES (?, ?, ?, ?, NULL, ?)
+        """, (key, str(path), stat.st_size, stat.st_mtime_ns, get_timestamp()))
+
+        with self.lock:
+            self.claims.pop(key, None)
+
+        self.stream_completed.emit(key)
+
+        GlobalThreadPoolTask.run_func(self.update_hash, key, path)
+
+    @staticmethod
+    def get_hash(path: Path):
+        sha256 = hashlib.sha256()
+
+        with open(path, "rb") as f:
+            while chunk := f.read(1024 * 1024):
+                sha256.update(chunk)
+
+        return sha256.hexdigest()
+
+    def update_hash(self, key: str, path: Path):
+        try:
+            self.db.execute("""
+                UPDATE stream SET hash = ? WHERE key = ? AND path = ?
+            """, (self.get_hash(path), key, str(path)))
+
+        except Exception:
+            logger.warning("计算文件哈希失败：%s", path, exc_info = True)
+
+    def verify(self, key: str, path: Path):
+        # 复用前核对大小与哈希值，内容不一致的记录直接移除；刚完成下载、哈希尚未算出的流只核对大小
+        result = self.db.query("""
+            SELECT file_size, hash FROM stream WHERE key = ? AND path = ?
+        """, (key, str(path)))
+
+        try:
+            if result and os.path.getsize(path) == result[0][0] and result[0][1] in (None, self.get_hash(path)):
+                return True
+
+        except OSError:
+            pass
+
+        logger.warning("本地副本与记录不一致，改为重新下载：%s", path)
+
+        self.forget(path)
+
+        return False
+
+    def move(self, old_path: Path, new_path: Path):
+        # 保留原始文件时临时文件会被重命名，索引随之更新
+        self.db.execute("""
+            UPDATE OR REPLACE stream SET path = ? WHERE path = ?
+        """, (str(new_path), str(old_path)))
+
+    def forget(self, path: Path):
+        self.db.execute("""
+            DELETE FROM stream WHERE path = ?
+        """, (str(path), ))
+
+    def retain(self, path: Path):
+        # 合并完成后删除原始文件前调用：已登记的流移入本地目录继续供复用，不在同一分区无法直接移动时删除
+        if not self.db.query("SELECT 1 FROM stream WHERE path = ?", (str(path), )):
+            return
+
+        target = self.store_path / f"{hashlib.sha1(str(path).encode('utf-8')).hexdigest()}{path.suffix}"
+
+        try:
+            self.store_path.mkdir(parents = True, exist_ok = True)
+
+            # 重命名不改变修改时间，记录无需重新计算
+            os.replace(path, target)
+
+        except OSError:
+            self.forget(path)
+            return
+
+        self.move(path, target)
+        self.evict()
+
+    def evict(self):
+        # 保留的流超出容量时从最早登记的开始删除
+        records = self.db.query("""
+            SELECT path, file_size FROM stream WHERE path LIKE ? ORDER BY created_time
+        """, (str(self.store_path / "%"), ))
+
+        total = sum(size for _, size in records)
+
+        for path, size in records:
+            if total <= self.max_store_size:
+                break
+
+            Path(path).unlink(missing_ok = True)
+            self.forget(Path(path))
+
+            total -= size
+
+    def claim(self, key: str, task_id: str):
+        # 返回 False 表示该流正由其他任务下载
+        with self.lock:
+            return self.claims.setdefault(key, task_id) == task_id
+
+    def release(self, task_id: str):
+        # 任务暂停或删除时放弃其负责的流，等待中的任务接手下载
+        with self.lock:
+            keys = [key for key, owner in self.claims.items() if owner == task_id]
+
+            for key in keys:
+                del self.claims[key]
+
+        for key in keys:
+            self.stream_released.emit(key)
+
+    @staticmethod
+    def link_or_copy(source: Path, target: Path):
+        # 优先创建硬链接，其次尝试写时复制，都不支持时完整复制
+        target.unlink(missing_ok = True)
+
+        try:
+            os.link(source, target)
+            return
+
+        except OSError:
+            pass
+
+        if sys.platform == "linux":
+            try:
+                import fcntl
+
+                with open(source, "rb") as src, open(target, "wb") as dst:
+                    # FICLONE
+                    fcntl.ioctl(dst.fileno(), 0x40049409, src.fileno())
+
+                return
+
+            except OSError:
+                target.unlink(missing_ok = True)
+
+        shutil.copyfile(source, target)
+
+stream_index = StreamIndex()
@@ -0,0 +1,40 @@
+from threading import Lock
+import time
+
+class TokenBucket:
+    """线程安全的令牌桶，用于平滑限制下载速度"""
+    def __init__(self, rate: float):
+        """
+        :param rate: 令牌产生速率（字节/秒），若为0则不限速
+        """
+        self.rate = rate
+        self.tokens = rate
+        self.last_update = time.monotonic()
+        self.lock = Lock()
+
+    def reserve(self, amount: int):
+        # 扣除令牌并返回需要等待的时长（秒）
+        if self.rate <= 0:
+            return 0
+
+        sleep_time = 0
+        with self.lock:
+            now = time.monotonic()
+            elapsed = now - self.last_update
+            self.last_update = now
+
+            self.tokens += elapsed * self.rate
+            if self.tokens > self.rate:
+                self.tokens = self.rate
+
+            self.tokens -= amount
+            if self.tokens < 0:
+                sleep_time = -self.tokens / self.rate
+
+        return sleep_time
+
+    def set_rate(self, rate: float):
+        with self.lock:
+            self.rate = rate
+            self.tokens = rate
+            self.last_update = time.monotonic()
@@ -0,0 +1,160 @@
+from threading import Thread, Lock, Condition
+from collections import deque
+from pathlib import Path
+import asyncio
+import os
+
+class BufferPool:
+    """可复用的写入缓冲区，避免为每块数据分配新的 bytes 对象"""
+    def __init__(self, buffer_size: int, max_buffers: int):
+        self.buffer_size = buffer_size
+        self.max_buffers = max_buffers
+
+        self.buffers: list[bytearray] = []
+        self.lock = Lock()
+
+    def get(self):
+        with self.lock:
+            if self.buffers:
+                return self.buffers.pop()
+
+        return bytearray(self.buffer_size)
+
+    def put(self, buffer: bytearray):
+        with self.lock:
+            if len(self.buffers) < self.max_buffers:
+                self.buffers.append(buffer)
+
+buffer_pool = BufferPool(buffer_size = 1024 * 1024, max_buffers = 64)
+
+class WriterClosedError(RuntimeError):
+    """写入线程关闭后仍有数据提交，调用方需丢弃缓冲区并回退区间"""
+    pass
+
+class FileWriter:
+    """单个文件的写入线程，各连接将填满的缓冲区交给它按偏移量写入，整个下载过程只打开一次文件"""
+    def __init__(self, path: Path, max_pending: int = 16):
+        """
+        :param max_pending: 等待写入的缓冲区上限，队列满时下载连接会被阻塞，形成背压
+        """
+        self.path = path
+        self.fd = os.open(path, os.O_RDWR | getattr(os, "O_BINARY", 0))
+
+        self.max_pending = max_pending
+        self.pending = deque()
+        self.condition = Condition()
+
+        self.async_waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+        self.error: Exception = None
+        self.closed = False
+
+        self.thread = Thread(target = self._run, name = f"FileWriter-{Path(path).name}", daemon = True)
+        self.thread.start()
+
+    def submit(self, offset: int, buffer: bytearray, length: int, callback = None):
+        """
+        :param callback: 写入完成后在写入线程中调用
+        """
+        self.check_error()
+
+        with self.condition:
+            while len(self.pending) >= self.max_pending and not self.closed:
+                self.condition.wait()
+
+            self.append(offset, buffer, length, callback)
+
+    async def submit_async(self, offset: int, buffer: bytearray, length: int, callback = None):
+        # 队列已满时挂起当前协程，由写入线程取出数据后唤醒，不阻塞整个异步引擎
+        self.check_error()
+
+        while True:
+            with self.condition:
+                if self.closed or len(self.pending) < self.max_pending:
+                    self.append(offset, buffer, length, callback)
+                    return
+
+                loop = asyncio.get_running_loop()
+                waiter = loop.create_future()
+
+                self.async_waiters.append((loop, waiter))
+
+            await waiter
+
+    def append(self, offset: int, buffer: bytearray, length: int, callback = None):
+        # 需在持有 condition 时调用。关闭后拒绝写入，不再重新打开文件，缓冲区仍归调用方所有
+        if self.closed:
+            raise WriterClosedError(f"File writer for {self.path} is closed")
+
+        self.pending.append((offset, buffer, length, callback))
+        self.condition.notify_all()
+
+    def wake_async_waiters(self):
+        # 需在持有 condition 时调用，唤醒所有等待空位的协程，由它们重新检查队列
+        for loop, waiter in self.async_waiters:
+            loop.call_soon_threadsafe(self.set_waiter, waiter)
+
+        self.async_waiters.clear()
+
+    @staticmethod
+    def set_waiter(waiter: asyncio.Future):
+        # 协程可能已被取消
+        if not waiter.done():
+            waiter.set_result(None)
+
+    def check_error(self):
+        if self.error:
+            raise self.error
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.pending and not self.closed:
+                    self.condition.wait()
+
+                # 关闭后仍会先写完队列中剩余的数据
+                if not self.pending:
+                    break
+
+                offset, buffer, length, callback = self.pending.popleft()
+                self.condition.notify_all()
+                self.wake_async_waiters()
+
+            try:
+                # 出错后丢弃之后的数据，也不再执行完成回调，区间已落盘的位置不会越过写入失败的部分
+                if self.error is None:
+                    self.write(self.fd, offset, buffer, length)
+
+                    if callback:
+                        callback()
+
+            except Exception as e:
+                # 写入失败（如磁盘已满）时记录错误，由下载连接在下次提交时抛出
+                self.error = e
+
+            finally:
+                buffer_pool.put(buffer)
+
+        os.close(self.fd)
+
+    @staticmethod
+    def write(fd: int, offset: int, buffer: bytearray, length: int):
+        view = memoryview(buffer)[:length]
+
+        while view:
+            if hasattr(os, "pwrite"):
+                written = os.pwrite(fd, view, offset)
+            else:
+                # Windows 不支持 pwrite，写入线程独占文件描述符，先定位再写入同样安全
+                os.lseek(fd, offset, os.SEEK_SET)
+                written = os.write(fd, view)
+
+            view = view[written:]
+            offset += written
+
+    def close(self):
+        with self.condition:
+            # 已提交的数据仍会写完，之后的提交会被拒绝
+            self.closed = True
+            self.condition.notify_all()
+            self.wake_async_waiters()
@@ -1,4 +1,6 @@
-from util.network import RequestType, ResponseType, SyncNetWorkRequest, CDN
+from util.network import RequestType, ResponseType, SyncNetWorkRequest, CDN, api_retry_policy
+
+from concurrent.futures import ThreadPoolExecutor, wait
 
 class QueryWorker:
     def __init__(self, media_info: dict):
@@ -6,6 +8,9 @@ class QueryWorker:
 
         self.break_flag = False
 
+        # 备用镜像的探测总时长上限，超时未响应的镜像直接舍弃
+        self.mirror_probe_timeout = 2
+
     def query_dash_url(self):
         download_urls = self.get_download_urls(self.media_info)
 
@@ -25,48 +30,66 @@ class QueryWorker:
         return url_list
 
     def get_file_size(self, download_urls: list):
-        _file_size = 0
-        resolved_url = ""
         download_urls = CDN.get_url_list(download_urls)
 
-        for url in download_urls:                
-            # 发起 HEAD 请求获取文件大小
+        # 按优先级依次验证，第一个可用的链接即为主链接，只有首选链接按重试策略重试
+        for index, resolved_url in enumerate(download_urls):
+            if _file_size := self.query_file_size(resolved_url, retry = index == 0):
+                break
+        else:
+            raise Exception("无法获取有效的下载链接")
+
+        return {
+            "url": resolved_url,
+            "url_list": [resolved_url, *self.probe_mirrors(download_urls[index + 1:], _file_size)],
+            "file_size": _file_size
+        }
+
+    def probe_mirrors(self, download_urls: list, file_size: int):
+        # 其余镜像并发探测一次，不重试，下载时再按实际速度排序；丢弃大小不一致的镜像，避免拼接出错误的文件
+        if not download_urls:
+            return []
 
-            try:
-                request = SyncNetWorkRequest(url, request_type = RequestType.HEAD, response_type = ResponseType.HEADERS, raise_for_status = True)
-                response = request.run()
+        executor = ThreadPoolExecutor(max_workers = min(len(download_urls), 8))
+        futures = {executor.submit(self.query_file_size, url, False, self.mirror_probe_timeout): url for url in download_urls}
 
-            except Exception:
-                # 请求失败，继续尝试下一个链接 (例如 403, 404 等会被精确捕捉)
-                continue
+        done, _ = wait(futures, timeout = self.mirror_probe_timeout)
 
-            content_length = response.get("Content-Length")
-            content_type = response.get("Content-Type")
+        # 不等待未响应的镜像
+        executor.shutdown(wait = False, cancel_futures = True)
 
-            if content_type is None or "text" in content_type:
-                # 链接不可用
-                continue
-            
-            if content_length is None or not str(content_length).isdigit():
-                # 无法获取有效的文件大小
-                continue
+        return [url for future, url in futures.items() if future in done and future.result() == file_size]
 
-            _file_size = int(content_length)
+    def query_file_size(self, url: str, retry: bool = True, timeout: float = None):
+        # 发起 HEAD 请求获取文件大小，链接不可用时返回 0
+        try:
+            request = SyncNetWorkRequest(url, request_type = RequestType.HEAD, response_type = ResponseType.HEADERS, raise_for_status = True)
+            request.timeout = timeout
 
-            if _file_size <= 10240:
-                # 如果文件极小（例如某些 CDN 拦截时返回的 1KB 左右错误文本），视为无效链接跳过
-                continue
+            response = api_retry_policy.call("query_file_size", request.run) if retry else request.run()
 
-            resolved_url = url
-            break
+        except Exception:
+            # 超时、断开等错误（首选链接按重试策略重试后）仍失败，403、404 等直接视为链接不可用
+            return 0
+
+        content_length = response.get("Content-Length")
+        content_type = response.get("Content-Type")
+
+        if content_type is None or "text" in content_type:
+            # 链接不可用
+            return 0
         
-        if _file_size == 0:
-            raise Exception("无法获取有效的下载链接")
+        if content_length is None or not str(content_length).isdigit():
+            # 无法获取有效的文件大小
+            return 0
 
-        return {
-            "url": resolved_url,
-            "file_size": _file_size
-        }
+        _file_size = int(content_length)
+
+        if _file_size <= 10240:
+            # 如果文件极小（例如某些 CDN 拦截时返回的 1KB 左右错误文本），视为无效链接跳过
+            return 0
+
+        return _file_size
 
     def get_download_urls(self, media_info: dict):
         download_urls = []
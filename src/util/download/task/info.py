@@ -3,12 +3,22 @@ from dataclasses import dataclass, field, fields, asdict
 @dataclass
 class InfoBase:
     def from_dict(self, data: dict) -> None:
-        field_names = {f.name for f in fields(self)}
+        field_names = {f.name for f in fields(self) if not f.metadata.get("transient")}
 
         for k, v in data.items():
             if k in field_names:
                 setattr(self, k, v)
 
+    def to_dict(self) -> dict:
+        data = asdict(self)
+
+        # 每秒刷新的临时状态不写入数据库
+        for f in fields(self):
+            if f.metadata.get("transient"):
+                data.pop(f.name)
+
+        return data
+
 @dataclass
 class BasicInfo(InfoBase):
     task_id: str = ""
@@ -91,6 +101,7 @@ class DownloadInfo(InfoBase):
 
     # 进度相关
     speed: int = 0
+    eta: int = field(default = -1, metadata = {"transient": True})      # 剩余时间（秒），-1 表示未知
     progress: int = 0
     total_size: int = 0
     downloaded_size: int = 0
@@ -104,6 +115,9 @@ class DownloadInfo(InfoBase):
     queue: list[str] = field(default_factory = list)
     files: dict = field(default_factory = dict)
 
+    # 各文件的下载速度与剩余时间，如 {"video": {"speed": 0, "eta": -1, "remaining": 0}}
+    file_stats: dict = field(default_factory = dict, metadata = {"transient": True})
+
     # 合并相关
     merge_video_audio: bool = False
     keep_original_files: bool = False
@@ -122,7 +136,12 @@ class TaskInfo:
     Download: DownloadInfo = field(default_factory = DownloadInfo)
 
     def to_dict(self):
-        return asdict(self)
+        return {
+            "Basic": self.Basic.to_dict(),
+            "File": self.File.to_dict(),
+            "Episode": self.Episode.to_dict(),
+            "Download": self.Download.to_dict()
+        }
     
     def from_dict(self, data: dict):
         basic_data = data.get("Basic", {})
@@ -91,6 +91,31 @@ class FFmpegCommand:
                 .add_output(output_path)
             )
 
+    @classmethod
+    def remux_to_mpegts(cls, input_path: str):
+        # 将分段转为 MPEG-TS 输出到标准输出，TS 流可以直接首尾相接
+        return (
+            cls()
+            .add_input(input_path)
+            .add_param("-v", "error")
+            .add_param("-c", "copy")
+            .add_param("-f", "mpegts")
+            .add_output("pipe:1")
+        )
+
+    @classmethod
+    def concat_mpegts_stream(cls, output_path: str):
+        # 从标准输入持续读取按顺序拼接的 TS 流，写入最终的容器
+        return (
+            cls()
+            .add_param("-v", "error")
+            .add_param("-f", "mpegts")
+            .add_param("-i", "pipe:0")
+            .add_param("-c", "copy")
+            .add_param("-bsf:a", "aac_adtstoasc")
+            .add_output(output_path)
+        )
+
     @classmethod
     def convert_m4a_to_mp3(cls, input_path: str, output_path: str):
         return (
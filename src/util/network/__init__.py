@@ -1,3 +1,6 @@
-from util.network.request import NetworkRequestWorker, SyncNetWorkRequest, RequestType, ResponseType, client, update_cookies, get_cookies
+from util.network.request import NetworkRequestWorker, SyncNetWorkRequest, RequestType, ResponseType, client, update_cookies, get_cookies, single_flight
 from util.network.proxy import Proxy
-from util.network.cdn import CDN
\ No newline at end of file
+from util.network.cdn import CDN
+from util.network.retry import RetryPolicy, RetryState, retry_metrics, api_retry_policy, download_retry_policy
+from util.network.cache import response_cache
+from util.network.async_request import async_request_engine
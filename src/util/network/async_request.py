@@ -0,0 +1,92 @@
+from util.thread import EventLoopThread
+
+from .request import SyncNetWorkRequest, RequestType, client, single_flight
+from .cache import response_cache
+from .proxy import Proxy
+
+import asyncio
+import httpx
+
+class AsyncRequestEngine(EventLoopThread):
+    """接口请求共用的异步客户端，在单独的线程中运行事件循环；解析器可借助 gather 并发获取互不依赖的数据，同一主机同时进行的请求数受 max_per_host 限制"""
+    def __init__(self, max_per_host: int = 4):
+        super().__init__()
+
+        self.max_per_host = max_per_host
+
+        # 只在事件循环线程中访问
+        self.semaphores: dict[str, asyncio.Semaphore] = {}
+
+    def create_client(self):
+        # 与同步的 client 使用相同的超时、重试与代理设置，Cookie 随请求传递
+        if proxies := Proxy().get_proxies():
+            proxy_url = proxies.get("http") or proxies.get("https")
+
+            mounts = {
+                "http://": httpx.AsyncHTTPTransport(proxy = proxy_url, retries = 5),
+                "https://": httpx.AsyncHTTPTransport(proxy = proxy_url, retries = 5)
+            }
+        else:
+            mounts = None
+
+        return httpx.AsyncClient(
+            limits = httpx.Limits(max_connections = 10, max_keepalive_connections = 10),
+            timeout = 5,
+            mounts = mounts,
+            transport = httpx.AsyncHTTPTransport(retries = 3),
+            follow_redirects = True
+        )
+
+    def get_semaphore(self, host: str):
+        if (semaphore := self.semaphores.get(host)) is None:
+            semaphore = self.semaphores[host] = asyncio.Semaphore(self.max_per_host)
+
+        return semaphore
+
+    async def request(self, request: SyncNetWorkRequest, bypass_cache: bool = False):
+        # 指定代理的请求仍走同步的代理连接池
+        if request.proxies:
+            return await asyncio.to_thread(request.run)
+
+        async def send(extra_headers: dict = None):
+            headers = request.get_headers()
+
+            if extra_headers:
+                headers.update(extra_headers)
+
+            async with self.get_semaphore(httpx.URL(request.url).host):
+                return await self.client.request(
+                    method = request.request_type.name,
+                    url = request.url,
+                    params = request.params,
+                    json = request.json_data,
+                    headers = headers,
+                    cookies = client.cookies,
+                    data = request.data
+                )
+
+        if request.request_type == RequestType.GET:
+            # 与同步请求一样合并同时发起的相同请求
+            key = single_flight.get_key(request.request_type.name, request.url, request.params, bypass_cache)
+
+            response = await single_flight.do_async(key, lambda: response_cache.fetch_async(request.url, request.params, send, bypass_cache))
+        else:
+            response = await send()
+
+        return request.parse_response(response)
+
+    def gather(self, *requests: SyncNetWorkRequest, return_exceptions: bool = False):
+        """
+        同步接口：在共享的事件循环中并发执行多个请求，按传入顺序返回结果，供解析线程直接调用
+
+        :param return_exceptions: 为 True 时失败的请求以异常对象代替结果，否则抛出第一个异常
+        """
+        # 跳过缓存的标记保存在发起请求的线程中
+        bypass_cache = response_cache.bypassed
+
+        async def run():
+            return await asyncio.gather(*(self.request(request, bypass_cache) for request in requests), return_exceptions = return_exceptions)
+
+        return self.run_coroutine(run()).result()
+
+async_request_engine = AsyncRequestEngine()
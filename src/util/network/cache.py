@@ -0,0 +1,289 @@
+from util.common import appdata_path, config, Database, get_timestamp
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+from threading import Lock, local
+from pathlib import Path
+import logging
+import httpx
+import json
+import re
+
+logger = logging.getLogger(__name__)
+
+# WBI 签名参数随时间变化，不影响请求内容
+IGNORED_PARAMS = ("wts", "w_rid")
+
+def normalize_url(url: str, params: dict = None):
+    # 去除签名参数并按参数名排序，内容相同的请求得到相同的地址
+    url = httpx.URL(url)
+
+    if params:
+        url = url.copy_merge_params(params)
+
+    query = sorted((key, value) for key, value in url.params.multi_items() if key not in IGNORED_PARAMS)
+
+    return str(url.copy_with(query = None).copy_merge_params(query))
+
+class ResponseCacheDatabase(Database):
+    def __init__(self):
+        self.path = Path(appdata_path) / "Bili23 Downloader" / "response_cache.db"
+
+        self.check_and_create_table()
+
+    def check_and_create_table(self):
+        self.execute_script("""
+            PRAGMA journal_mode = WAL;
+            CREATE TABLE IF NOT EXISTS "response" (
+                "id"	INTEGER UNIQUE,
+                "key"	TEXT UNIQUE,
+                "url"	TEXT,
+                "headers"	TEXT,
+                "body"	BLOB,
+                "etag"	TEXT,
+                "last_modified"	TEXT,
+                "expires"	INTEGER,
+                "last_access"	INTEGER,
+                "size"	INTEGER,
+                PRIMARY KEY("id" AUTOINCREMENT)
+            );
+            CREATE INDEX IF NOT EXISTS "response_last_access" ON "response" ("last_access");""")
+
+@dataclass
+class CacheEntry:
+    url: str
+    headers: dict
+    body: bytes
+    etag: str
+    last_modified: str
+    expires: int
+
+    @property
+    def is_fresh(self):
+        return get_timestamp() < self.expires
+
+    @property
+    def validators(self):
+        # 条件请求头，服务端未提供 ETag 和 Last-Modified 时为空
+        headers = {}
+
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+
+        return headers
+
+    def to_response(self):
+        return httpx.Response(200, headers = self.headers, content = self.body, request = httpx.Request("GET", self.url))
+
+@dataclass
+class CacheLookup:
+    key: str = None
+    ttl: int = None                     # None 表示该接口不缓存
+    entry: CacheEntry = None
+    response: httpx.Response = None     # 缓存命中时直接使用的响应
+    bypass: bool = False
+
+    @property
+    def validators(self):
+        if self.entry and not self.bypass:
+            return self.entry.validators
+
+        return None
+
+class ResponseCache:
+    """元数据接口的本地响应缓存：按接口设定有效期，过期后尽量条件请求重新验证，超出容量时淘汰最久未用的记录"""
+    # (接口路径, 有效期秒数)，按顺序匹配，未匹配的接口不缓存
+    ttl_rules = [
+        (re.compile(r"/x/web-interface/(wbi/)?view(/detail/tag)?$"), 12 * 3600),
+        (re.compile(r"/(pgc|pugv)/view/web/season(/v2)?$"), 12 * 3600),
+        (re.compile(r"/x/web-interface/card$"), 12 * 3600),
+        (re.compile(r"/(x/player/wbi|pgc/player/web|pugv/player/web)/playurl$"), 5 * 60),
+    ]
+
+    def __init__(self, max_size: int = 50 * 1024 * 1024):
+        self.max_size = max_size
+
+        self.db = ResponseCacheDatabase()
+        self.lock = Lock()
+        self.local = local()
+
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+
+    @property
+    def bypassed(self):
+        return getattr(self.local, "bypass", False)
+
+    @contextmanager
+    def bypass(self, enabled: bool = True):
+        # 重新解析等需要最新数据的场合，当前线程内的请求跳过缓存，但仍会更新缓存
+        previous = self.bypassed
+        self.local.bypass = enabled
+
+        try:
+            yield
+
+        finally:
+            self.local.bypass = previous
+
+    def get_ttl(self, url: httpx.URL):
+        if url.host != "api.bilibili.com":
+            return None
+
+        for pattern, ttl in self.ttl_rules:
+            if pattern.search(url.path):
+                return ttl
+
+        return None
+
+    def get_key(self, url: str):
+        # 不同账号的解析结果不同（如会员清晰度），按登录的账号区分
+        user = config.get(config.DedeUserID) if config.get(config.is_login) else ""
+
+        return f"{user}|{url}"
+
+    def fetch(self, url: str, params: dict, send):
+        """
+        :param send: 发送请求的函数，参数为附加的请求头
+        """
+        lookup = self.lookup(url, params, self.bypassed)
+
+        if lookup.response:
+            return lookup.response
+
+        return self.store(lookup, send(lookup.validators))
+
+    async def fetch_async(self, url: str, params: dict, send, bypass: bool):
+        # 异步请求在事件循环线程中执行，是否跳过缓存由发起请求的线程传入
+        lookup = self.lookup(url, params, bypass)
+
+        if lookup.response:
+            return lookup.response
+
+        return self.store(lookup, await send(lookup.validators))
+
+    def lookup(self, url: str, params: dict, bypass: bool):
+        url = normalize_url(url, params)
+        ttl = self.get_ttl(httpx.URL(url))
+
+        if ttl is None:
+            return CacheLookup()
+
+        key = self.get_key(url)
+        entry = self.get(key)
+
+        if entry and entry.is_fresh and not bypass:
+            with self.lock:
+                self.hits += 1
+
+            return CacheLookup(key, ttl, entry, entry.to_response(), bypass)
+
+        with self.lock:
+            self.misses += 1
+
+        return CacheLookup(key, ttl, entry, bypass = bypass)
+
+    def store(self, lookup: CacheLookup, response: httpx.Response):
+        if lookup.ttl is None:
+            return response
+
+        if response.status_code == 304 and lookup.entry:
+            with self.lock:
+                self.revalidated += 1
+
+            self.db.execute("""
+                UPDATE response SET expires = ?, last_access = ? WHERE key = ?
+            """, (get_timestamp() + lookup.ttl, get_timestamp(), lookup.key))
+
+            return lookup.entry.to_response()
+
+        if self.is_cacheable(response):
+            self.put(lookup.key, response, lookup.ttl)
+
+        return response
+
+    def get(self, key: str):
+        try:
+            result = self.db.query("""
+                SELECT url, headers, body, etag, last_modified, expires FROM response WHERE key = ?
+            """, (key, ))
+
+            if not result:
+                return None
+
+            url, headers, body, etag, last_modified, expires = result[0]
+
+            self.db.execute("""
+                UPDATE response SET last_access = ? WHERE key = ?
+            """, (get_timestamp(), key))
+
+            return CacheEntry(url, json.loads(headers), body, etag, last_modified, expires)
+
+        except Exception:
+            logger.warning("读取响应缓存失败", exc_info = True)
+
+            return None
+
+    def put(self, key: str, response: httpx.Response, ttl: int):
+        # 只保留内容相关的头部，缓存的响应已解压
+        headers = {name: value for name, value in response.headers.items() if name.lower() in ("content-type", "etag", "last-modified")}
+        body = response.content
+
+        try:
+            self.db.execute("""
+                INSERT OR REPLACE INTO response (key, url, headers, body, etag, last_modified, expires, last_access, size) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (key, str(response.url), json.dumps(headers), body, response.headers.get("ETag"), response.headers.get("Last-Modified"), get_timestamp() + ttl, get_timestamp(), len(body)))
+
+            self.evict()
+
+        except Exception:
+            logger.warning("写入响应缓存失败", exc_info = True)
+
+    def evict(self):
+        # 超出容量时从最久未使用的记录开始删除
+        total = self.db.query("SELECT COALESCE(SUM(size), 0) FROM response")[0][0]
+
+        if total <= self.max_size:
+            return
+
+        removed = []
+
+        for key, size in self.db.query("SELECT key, size FROM response ORDER BY last_access"):
+            if total <= self.max_size * 0.8:
+                break
+
+            removed.append((key, ))
+            total -= size
+
+        self.db.executemany("DELETE FROM response WHERE key = ?", removed)
+
+    @staticmethod
+    def is_cacheable(response: httpx.Response):
+        # 接口返回错误（如风控、需要登录）时不缓存
+        if response.status_code != 200:
+            return False
+
+        try:
+            data = response.json()
+
+        except ValueError:
+            return False
+
+        return not isinstance(data, dict) or data.get("code", 0) == 0
+
+    def clear(self):
+        self.db.execute("DELETE FROM response")
+
+    def stats(self):
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidated": self.revalidated
+            }
+
+response_cache = ResponseCache()
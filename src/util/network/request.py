@@ -2,28 +2,36 @@ from PySide6.QtCore import Signal, QObject, Slot
 
 from util.common import config
 
+from .cache import normalize_url, response_cache
 from .proxy import Proxy
 
+from dataclasses import dataclass, field
+from contextlib import contextmanager
+from threading import Event, Lock, Timer
 from enum import Enum
 
+import asyncio
 import httpx
 import logging
+import time
 
 logging.getLogger("httpx").setLevel(logging.WARNING)
 
+limits = httpx.Limits(max_connections = 10, max_keepalive_connections = 10)
+
 def get_mounts(proxies = None):
+    # 使用 mounts 或 transport 时 httpx.Client 的 limits 参数不会生效，需传给各个 transport
     if proxies:
         proxy_url = proxies.get("http") or proxies.get("https")
 
         return {
-            "http://": httpx.HTTPTransport(proxy = proxy_url, retries = 5),
-            "https://": httpx.HTTPTransport(proxy = proxy_url, retries = 5)
+            "http://": httpx.HTTPTransport(proxy = proxy_url, retries = 5, limits = limits),
+            "https://": httpx.HTTPTransport(proxy = proxy_url, retries = 5, limits = limits)
         }
     else:
         return None
 
-limits = httpx.Limits(max_connections = 10, max_keepalive_connections = 10)
-transport = httpx.HTTPTransport(retries = 3)
+transport = httpx.HTTPTransport(retries = 3, limits = limits)
 
 client = httpx.Client(
     limits = limits,
@@ -33,6 +41,189 @@ client = httpx.Client(
     follow_redirects = True
 )
 
+@dataclass(eq = False)
+class PooledProxyClient:
+    client: httpx.Client
+    last_used: float
+    active: int = 0
+
+class ProxyClientPool:
+    """指定代理的请求共用长连接的 httpx.Client，按代理地址区分，空闲超过 idle_timeout 秒后由定时器关闭"""
+    def __init__(self, idle_timeout: float = 120):
+        self.idle_timeout = idle_timeout
+
+        self.lock = Lock()
+        self.clients: dict[str, PooledProxyClient] = {}
+
+        self.timer: Timer = None
+
+    @contextmanager
+    def get(self, proxies: dict):
+        proxy_url = proxies.get("http") or proxies.get("https")
+
+        with self.lock:
+            if (entry := self.clients.get(proxy_url)) is None:
+                entry = self.clients[proxy_url] = PooledProxyClient(httpx.Client(mounts = get_mounts(proxies), follow_redirects = True), time.monotonic())
+
+            entry.active += 1
+
+        try:
+            yield entry.client
+
+        finally:
+            with self.lock:
+                entry.active -= 1
+                entry.last_used = time.monotonic()
+
+                self.schedule_eviction()
+
+    def schedule_eviction(self):
+        # 需在持有 lock 时调用，已有定时器时不重复创建
+        if self.timer is None and self.clients:
+            self.timer = Timer(self.idle_timeout, self.evict_idle)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def evict_idle(self):
+        now = time.monotonic()
+        evicted = []
+
+        with self.lock:
+            self.timer = None
+
+            for proxy_url, entry in list(self.clients.items()):
+                if not entry.active and now - entry.last_used >= self.idle_timeout:
+                    evicted.append(self.clients.pop(proxy_url).client)
+
+            # 仍有客户端时继续定时检查
+            self.schedule_eviction()
+
+        for client in evicted:
+            client.close()
+
+proxy_client_pool = ProxyClientPool()
+
+# Cookie 代次，每次更新 Cookie 后加一，Cookie 不同的请求不能共享结果
+cookies_generation = 0
+
+@dataclass(eq = False)
+class Flight:
+    done: Event = field(default_factory = Event)
+    response: httpx.Response = None
+    error: Exception = None
+
+class SingleFlight:
+    """相同的 GET 请求同时发起时只实际请求一次，其余调用等待并共享同一个响应"""
+    def __init__(self):
+        self.lock = Lock()
+
+        self.flights: dict[tuple, Flight] = {}
+
+        self.calls = 0          # 经过该层的请求数
+        self.joins = 0          # 加入进行中请求的次数
+        self.hits = 0           # 加入后成功取得共享响应的次数
+
+    def get_key(self, method: str, url: str, params: dict = None, bypass: bool = None):
+        """
+        :param bypass: 是否跳过缓存，为 None 时取当前线程的设置；在事件循环中需由发起请求的线程传入
+        """
+        if bypass is None:
+            bypass = response_cache.bypassed
+
+        # 跳过缓存的请求需要最新数据，不与读取缓存的请求共享结果
+        return (method, normalize_url(url, params), cookies_generation, bypass)
+
+    @staticmethod
+    def copy_error(error: Exception):
+        # 每个等待方抛出各自的异常对象，多个线程同时抛出同一对象会互相覆盖 __traceback__ 与 __context__；
+        # 部分异常（如 httpx.HTTPStatusError）的构造参数不全在 args 中，不能直接 copy
+        copied = type(error).__new__(type(error), *error.args)
+        copied.__dict__.update(error.__dict__)
+
+        return copied
+
+    def begin(self, key: tuple):
+        # 返回 (flight, 是否加入了进行中的请求)
+        with self.lock:
+            self.calls += 1
+
+            if joined := key in self.flights:
+                flight = self.flights[key]
+
+                self.joins += 1
+            else:
+                flight = self.flights[key] = Flight()
+
+        return flight, joined
+
+    def get_result(self, flight: Flight):
+        if flight.error:
+            raise self.copy_error(flight.error) from flight.error
+
+        with self.lock:
+            self.hits += 1
+
+        return flight.response
+
+    def end(self, key: tuple, flight: Flight):
+        with self.lock:
+            del self.flights[key]
+
+        flight.done.set()
+
+    def do(self, key: tuple, func):
+        flight, joined = self.begin(key)
+
+        if joined:
+            flight.done.wait()
+
+            return self.get_result(flight)
+
+        try:
+            flight.response = func()
+
+        except Exception as e:
+            flight.error = e
+            raise
+
+        finally:
+            self.end(key, flight)
+
+        return flight.response
+
+    async def do_async(self, key: tuple, func):
+        # 同步与异步请求共用同一组 flight；等待同步线程发起的请求时在线程池中等待，不阻塞事件循环
+        flight, joined = self.begin(key)
+
+        if joined:
+            await asyncio.to_thread(flight.done.wait)
+
+            return self.get_result(flight)
+
+        try:
+            flight.response = await func()
+
+        except BaseException as e:
+            # 协程被取消时等待方同样收到异常，而不是空的响应
+            flight.error = e
+            raise
+
+        finally:
+            self.end(key, flight)
+
+        return flight.response
+
+    def stats(self):
+        with self.lock:
+            return {
+                "calls": self.calls,
+                "joins": self.joins,
+                "hits": self.hits,
+                "in_flight": len(self.flights)
+            }
+
+single_flight = SingleFlight()
+
 class RequestType(Enum):
     GET = 0
     POST = 1
@@ -59,31 +250,34 @@ class SyncNetWorkRequest:
 
         self.proxies = None
 
-    def run(self):
-        self.update_headers()
+        # 为 None 时使用 client 的默认超时
+        self.timeout = None
 
+    def run(self):
         if self.proxies:
-            with httpx.Client(mounts = get_mounts(self.proxies), follow_redirects = True) as temp_client:
-                response = temp_client.request(
+            # 代理测试等指定代理的请求复用同一代理的连接，避免每次重新握手
+            with proxy_client_pool.get(self.proxies) as proxy_client:
+                response = proxy_client.request(
                     method = self.request_type.name,
                     url = self.url,
                     params = self.params,
                     json = self.json_data,
-                    headers = client.headers,
+                    headers = self.get_headers(),
                     cookies = client.cookies,
-                    data = self.data
+                    data = self.data,
+                    timeout = self.get_timeout()
                 )
+        elif self.request_type == RequestType.GET:
+            # 同时发起的相同 GET 请求共享一次请求的响应，各自解析，互不影响；元数据接口优先使用本地缓存
+            response = single_flight.do(single_flight.get_key(self.request_type.name, self.url, self.params), lambda: response_cache.fetch(self.url, self.params, self.send))
+
         else:
-            response = client.request(
-                method = self.request_type.name,
-                url = self.url,
-                params = self.params,
-                json = self.json_data,
-                headers = client.headers,
-                cookies = client.cookies,
-                data = self.data
-            )
+            response = self.send()
+
+        return self.parse_response(response)
 
+    def parse_response(self, response: httpx.Response):
+        # 按 response_type 转换响应，同步和异步请求共用
         if self.raise_for_status:
             response.raise_for_status()
 
@@ -106,21 +300,37 @@ class SyncNetWorkRequest:
             case ResponseType.RESPONSE:
                 return response
     
-    def update_headers(self):
-        client.headers.update(
-            {
-                "Referer": "https://www.bilibili.com/",
-                "User-Agent": config.get(config.user_agent)
-            }
+    def send(self, extra_headers: dict = None):
+        headers = self.get_headers()
+
+        if extra_headers:
+            headers.update(extra_headers)
+
+        return client.request(
+            method = self.request_type.name,
+            url = self.url,
+            params = self.params,
+            json = self.json_data,
+            headers = headers,
+            cookies = client.cookies,
+            data = self.data,
+            timeout = self.get_timeout()
         )
 
+    def get_timeout(self):
+        return httpx.USE_CLIENT_DEFAULT if self.timeout is None else self.timeout
+
+    def get_headers(self):
+        # 请求头随请求传递，不修改共享的 client，多个线程可以同时发起请求
+        headers = {
+            "Referer": "https://www.bilibili.com/",
+            "User-Agent": config.get(config.user_agent)
+        }
+
         if self.content_type:
-            client.headers["Content-Type"] = self.content_type
+            headers["Content-Type"] = self.content_type
 
-        else:
-            # 如果没有指定 content_type，则移除可能存在的 Content-Type 头部，避免影响某些请求
-            if "Content-Type" in client.headers:
-                client.headers.pop("Content-Type", None)
+        return headers
 
 class NetworkRequestWorker(SyncNetWorkRequest, QObject):
     success = Signal(object)
@@ -172,7 +382,10 @@ def get_cookies():
     return cookies
 
 def update_cookies():
+    global cookies_generation
+
     cookies = get_cookies()
+    cookies_generation += 1
 
     for key, value in cookies.items():
         client.cookies.set(
@@ -0,0 +1,153 @@
+from util.common.enum import RetryErrorType
+
+from dataclasses import dataclass, field
+from threading import Event, Lock
+import asyncio
+import random
+import httpx
+import time
+
+class RetryMetrics:
+    """按调用位置与错误类型统计重试次数，供诊断接口使用"""
+    def __init__(self):
+        self.lock = Lock()
+
+        self.retries: dict[str, dict[str, int]] = {}
+        self.give_ups: dict[str, dict[str, int]] = {}
+
+    def record(self, name: str, error_type: RetryErrorType, retry: bool):
+        counter = self.retries if retry else self.give_ups
+
+        with self.lock:
+            entry = counter.setdefault(name, {})
+            entry[error_type.value] = entry.get(error_type.value, 0) + 1
+
+    def stats(self):
+        with self.lock:
+            return {
+                "retries": {name: entry.copy() for name, entry in self.retries.items()},
+                "give_ups": {name: entry.copy() for name, entry in self.give_ups.items()}
+            }
+
+@dataclass
+class RetryPolicy:
+    """重试策略：指数退避加随机抖动，按错误类型决定是否重试，次数与总时长均可限制"""
+    max_attempts: int = 3           # 最多尝试次数，0 表示不限
+    deadline: float = 0             # 从首次尝试起的最长重试时长（秒），0 表示不限
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+    jitter: float = 0.5             # 每次等待随机缩短的最大比例，避免多个连接同时重试
+    retry_on: frozenset = frozenset({RetryErrorType.TIMEOUT, RetryErrorType.RESET, RetryErrorType.RISK_CONTROL, RetryErrorType.SERVER_ERROR})
+    retry_status_codes: frozenset = frozenset()     # 所属错误类型不重试时仍需重试的状态码
+
+    # 风控需要等待更久才能恢复，该类错误的等待时间不低于此值
+    min_delays: dict = field(default_factory = lambda: {RetryErrorType.RISK_CONTROL: 5.0})
+
+    @staticmethod
+    def classify(error: Exception):
+        if isinstance(error, httpx.TimeoutException):
+            return RetryErrorType.TIMEOUT
+
+        if isinstance(error, httpx.HTTPStatusError):
+            status_code = error.response.status_code
+
+            if status_code in (412, 429):
+                return RetryErrorType.RISK_CONTROL
+
+            if status_code >= 500:
+                return RetryErrorType.SERVER_ERROR
+
+            if status_code >= 400:
+                return RetryErrorType.CLIENT_ERROR
+
+        if isinstance(error, (httpx.TransportError, ConnectionError)):
+            return RetryErrorType.RESET
+
+        return RetryErrorType.OTHER
+
+    def is_retry_status(self, error: Exception):
+        return isinstance(error, httpx.HTTPStatusError) and error.response.status_code in self.retry_status_codes
+
+    def get_delay(self, attempt: int, error_type: RetryErrorType):
+        delay = min(self.base_delay * 2 ** (attempt - 1), self.max_delay)
+        delay *= 1 - random.random() * self.jitter
+
+        return max(delay, self.min_delays.get(error_type, 0))
+
+    def begin(self, name: str):
+        return RetryState(self, name)
+
+    def call(self, name: str, func, *args, stop_event: Event = None, **kwargs):
+        # 同步调用 func，失败时按策略等待后重试，放弃时抛出最后一次的异常
+        state = self.begin(name)
+
+        while True:
+            try:
+                return func(*args, **kwargs)
+
+            except Exception as e:
+                if (delay := state.next_delay(e)) is None:
+                    raise
+
+                if stop_event:
+                    if stop_event.wait(delay):
+                        raise
+                else:
+                    time.sleep(delay)
+
+    async def call_async(self, name: str, func, *args, **kwargs):
+        state = self.begin(name)
+
+        while True:
+            try:
+                return await func(*args, **kwargs)
+
+            except asyncio.CancelledError:
+                raise
+
+            except Exception as e:
+                if (delay := state.next_delay(e)) is None:
+                    raise
+
+                await asyncio.sleep(delay)
+
+class RetryState:
+    """单次操作的重试进度，用于自行管理循环的调用方"""
+    def __init__(self, policy: RetryPolicy, name: str):
+        self.policy = policy
+        self.name = name
+
+        self.reset()
+
+    def reset(self):
+        # 取得进展（如收到数据）后重新计算退避
+        self.attempt = 0
+        self.start_time = time.monotonic()
+
+    def next_delay(self, error: Exception):
+        # 返回下次重试前的等待时长，返回 None 表示放弃
+        error_type = self.policy.classify(error)
+        self.attempt += 1
+
+        give_up = error_type not in self.policy.retry_on and not self.policy.is_retry_status(error)
+
+        if self.policy.max_attempts and self.attempt >= self.policy.max_attempts:
+            give_up = True
+
+        delay = self.policy.get_delay(self.attempt, error_type)
+
+        if self.policy.deadline and time.monotonic() - self.start_time + delay > self.policy.deadline:
+            give_up = True
+
+        retry_metrics.record(self.name, error_type, not give_up)
+
+        return None if give_up else delay
+
+retry_metrics = RetryMetrics()
+
+# 接口请求、封面等小文件：少量重试，4xx 直接失败
+api_retry_policy = RetryPolicy(max_attempts = 3, base_delay = 0.5, max_delay = 4.0)
+
+# 下载连接：收到数据后重新计数，连续失败 10 次或超过 10 分钟后放弃该区间；
+# 链接过期（403、404、410）由下载器刷新后重试，其他 4xx 与未知错误直接放弃
+download_retry_policy = RetryPolicy(max_attempts = 10, deadline = 600, base_delay = 1.0, max_delay = 30.0, retry_status_codes = frozenset({403, 404, 410}))
@@ -1,11 +1,9 @@
-from util.network import SyncNetWorkRequest, ResponseType
+from util.network import SyncNetWorkRequest, ResponseType, api_retry_policy
 from util.parse.additional import AdditionalParserBase
 from util.common import config
 
 from ...download.task.info import TaskInfo
 
-import httpx
-
 class CoverParser(AdditionalParserBase):
     def __init__(self, task_info: TaskInfo):
         super().__init__(task_info)
@@ -13,16 +11,7 @@ class CoverParser(AdditionalParserBase):
     def parse(self):
         suffix = config.get(config.cover_type).value
 
-        for i in range(3):
-            try:
-                contents = self._get_cover_contents(suffix)
-                break
-            except httpx.HTTPError:
-                if i == 2:
-                    raise
-
-        else:
-            return
+        contents = api_retry_policy.call("cover", self._get_cover_contents, suffix)
 
         self._write(contents, suffix = suffix, name = self.task_info.File.name)
 
@@ -1,4 +1,4 @@
-from util.network import SyncNetWorkRequest
+from util.network import SyncNetWorkRequest, async_request_engine
 
 from ..episode.list import ListEpisodeParser
 from .base import ParserBase
@@ -47,14 +47,12 @@ class ListParser(ParserBase):
                 case "series":
                     self.series_id = self.get_series_id()
 
-                    self.get_series_archives_list()
-                    self.get_series_meta_info()
+                    self.get_series_info()
 
         elif "sid=" in self.url:
             self.series_id = self.get_sid()
 
-            self.get_series_archives_list()
-            self.get_series_meta_info()
+            self.get_series_info()
 
         else:
             raise ValueError("无效的链接")
@@ -83,7 +81,22 @@ class ListParser(ParserBase):
 
         self.info_data = response
 
-    def get_series_archives_list(self):
+    def get_series_info(self):
+        # 系列的视频列表与 meta 信息互不依赖，同时请求
+        response, meta_response = async_request_engine.gather(
+            SyncNetWorkRequest(self.get_series_archives_url()),
+            SyncNetWorkRequest(self.get_series_meta_url())
+        )
+
+        self.check_response(response)
+        self.check_response(meta_response)
+
+        self.info_data = response
+
+        # 由于系列的接口不含 meta 信息，还需要额外获取
+        self.info_data["data"]["meta"] = meta_response["data"]["meta"].copy()
+
+    def get_series_archives_url(self):
         # 系列，以 series_id 区分
         # 形如 https://space.bilibili.com/{mid}/lists/{series_id}?type=series
         params = {
@@ -96,30 +109,15 @@ class ListParser(ParserBase):
             "web_location": "333.1387",
         }
 
-        url = f"https://api.bilibili.com/x/series/archives?{urlencode(params)}"
+        return f"https://api.bilibili.com/x/series/archives?{urlencode(params)}"
 
-        request = SyncNetWorkRequest(url)
-        response = request.run()
-
-        self.check_response(response)
-
-        self.info_data = response
-
-    def get_series_meta_info(self):
-        # 由于系列的接口不含 meta 信息，还需要额外获取
+    def get_series_meta_url(self):
         params = {
             "series_id": self.series_id,
             "web_location": "333.1387"
         }
 
-        url = f"https://api.bilibili.com/x/series/series?{urlencode(params)}"
-
-        request = SyncNetWorkRequest(url)
-        response = request.run()
-
-        self.check_response(response)
-
-        self.info_data["data"]["meta"] = response["data"]["meta"].copy()
+        return f"https://api.bilibili.com/x/series/series?{urlencode(params)}"
 
     def get_category_name(self):
         # 合集列表
@@ -1,4 +1,4 @@
-from util.network import SyncNetWorkRequest
+from util.network import SyncNetWorkRequest, async_request_engine
 
 from ..episode.space import SpaceEpisodeParser
 from .base import ParserBase
@@ -25,13 +25,32 @@ class SpaceParser(ParserBase):
 
         self.mid = self.get_mid()
 
-        self.get_search_arc_info()
-        self.get_uname()
+        self.get_space_info()
 
         episode_parser = SpaceEpisodeParser(self.info_data.copy(), self.get_category_name())
         episode_parser.parse()
 
-    def get_search_arc_info(self):
+    def get_space_info(self):
+        # 投稿列表与 UP 主信息互不依赖，同时请求；翻页时 UP 主信息已缓存，不再请求
+        requests = [SyncNetWorkRequest(self.get_search_arc_url())]
+
+        if self.mid not in Data.uname_map:
+            requests.append(SyncNetWorkRequest(f"https://api.bilibili.com/x/web-interface/card?mid={self.mid}"))
+
+        response, *card_response = async_request_engine.gather(*requests)
+
+        self.check_response(response)
+
+        self.info_data = response
+
+        if card_response:
+            self.check_response(card_response[0])
+
+            Data.uname_map[self.mid] = card_response[0]["data"]["card"]["name"]
+
+        self.update_space_owner_info()
+
+    def get_search_arc_url(self):
         params = {
             "pn": self.pn,
             "ps": self.ps,
@@ -50,29 +69,7 @@ class SpaceParser(ParserBase):
             "dm_img_inter": '{"ds":[],"wh":[3688,4546,12],"of":[119,238,119]}',
         }
 
-        url = f"https://api.bilibili.com/x/space/wbi/arc/search?{self.enc_wbi(params)}"
-
-        request = SyncNetWorkRequest(url)
-        response = request.run()
-
-        self.check_response(response)
-
-        self.info_data = response
-
-    def get_uname(self):
-        if self.mid in Data.uname_map:
-            self.update_space_owner_info()
-
-        url = f"https://api.bilibili.com/x/web-interface/card?mid={self.mid}"
-
-        request = SyncNetWorkRequest(url)
-        response = request.run()
-
-        self.check_response(response)
-
-        Data.uname_map[self.mid] = response["data"]["card"]["name"]
-
-        self.update_space_owner_info()
+        return f"https://api.bilibili.com/x/space/wbi/arc/search?{self.enc_wbi(params)}"
 
     def update_space_owner_info(self):
         self.info_data["data"]["info"] = {
@@ -6,6 +6,7 @@ from util.parse.parser import (
 )
 from util.parse.episode.tree import EpisodeData
 from util.common.data import url_patterns
+from util.network import response_cache
 
 import logging
 import re
@@ -17,11 +18,12 @@ class ParseWorker(QObject):
     error = Signal(str)
     finished = Signal()
 
-    def __init__(self, url: str, pn: int = 1):
+    def __init__(self, url: str, pn: int = 1, bypass_cache: bool = False):
         super().__init__()
 
         self.url = url
         self.pn = pn
+        self.bypass_cache = bypass_cache
         self.parser_type = ""
 
         self.init_parser()
@@ -37,7 +39,9 @@ class ParseWorker(QObject):
 
             parser: VideoParser = self.parsers.get(self.parser_type)
 
-            parser.parse(self.url, self.pn)
+            # 重新解析时跳过本地缓存，获取最新的数据
+            with response_cache.bypass(self.bypass_cache):
+                parser.parse(self.url, self.pn)
 
             self.success.emit(parser.get_category_name(), parser.get_extra_data())
 
@@ -1,3 +1,4 @@
 from .pool import GlobalThreadPoolTask
 from .worker_base import WorkerBase
-from .async_ import AsyncTask
\ No newline at end of file
+from .async_ import AsyncTask
+from .event_loop import EventLoopThread
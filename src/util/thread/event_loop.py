@@ -0,0 +1,55 @@
+from threading import Event, Lock, Thread
+import asyncio
+import httpx
+
+class EventLoopThread:
+    """在单独的线程中运行 asyncio 事件循环及其共用的 httpx.AsyncClient，客户端由子类的 create_client 创建，不需要时返回 None"""
+    def __init__(self):
+        self.loop: asyncio.AbstractEventLoop = None
+        self.client: httpx.AsyncClient = None
+        self.thread: Thread = None
+
+        self.lock = Lock()
+        self.ready_event = Event()
+
+    def start(self):
+        with self.lock:
+            if self.thread and self.thread.is_alive():
+                return
+
+            self.ready_event.clear()
+
+            self.thread = Thread(target = self._run, name = type(self).__name__, daemon = True)
+            self.thread.start()
+
+        self.ready_event.wait()
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+        self.client = self.create_client()
+        self.ready_event.set()
+
+        try:
+            self.loop.run_forever()
+
+        finally:
+            if self.client is not None:
+                self.loop.run_until_complete(self.client.aclose())
+
+            self.loop.close()
+
+    def create_client(self) -> httpx.AsyncClient | None:
+        return None
+
+    def run_coroutine(self, coroutine):
+        # 可在任意线程调用，返回 concurrent.futures.Future
+        self.start()
+
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def stop(self):
+        with self.lock:
+            if self.loop and self.loop.is_running():
+                self.loop.call_soon_threadsafe(self.loop.stop)
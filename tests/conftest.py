@@ -0,0 +1,160 @@
+import http.server
+import threading
+import shutil
+import time
+import sys
+import os
+import re
+
+from pathlib import Path
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from PySide6.QtCore import QStandardPaths
+from PySide6.QtWidgets import QApplication
+
+# 配置、数据库等写入测试专用的应用数据目录，不影响本机的配置
+QStandardPaths.setTestModeEnabled(True)
+
+app = QApplication.instance() or QApplication([])
+
+os.makedirs(Path(QStandardPaths.writableLocation(QStandardPaths.StandardLocation.AppDataLocation), "Bili23 Downloader"), exist_ok = True)
+
+DATA = os.urandom(4 * 1024 * 1024)
+
+# 路径含 largerange 时服务端忽略超过该大小的范围请求
+LARGE_RANGE_SIZE = 512 * 1024
+
+class RangeHandler(http.server.BaseHTTPRequestHandler):
+    """支持 Range 请求的文件服务，路径中含 slow 时限速，含 hang 时长时间不响应，含 missing 时返回 404；
+    含 norange 时忽略 Range 返回整个文件，含 largerange 时只忽略超过 LARGE_RANGE_SIZE 的范围，含 expired 时模拟链接过期返回 403"""
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        self.server.paths.append(self.path)
+
+        if "hang" in self.path:
+            time.sleep(10)
+
+        self.send_response(404 if "missing" in self.path else 200)
+        self.send_header("Content-Length", str(len(DATA)))
+        self.send_header("Content-Type", "video/mp4")
+        self.end_headers()
+
+    def do_GET(self):
+        self.server.paths.append(self.path)
+
+        if "expired" in self.path:
+            self.send_response(403)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        if match := re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range", "")):
+            start, end = int(match.group(1)), int(match.group(2) or len(DATA) - 1)
+        else:
+            start, end = 0, len(DATA) - 1
+
+        if match and ("norange" in self.path or ("largerange" in self.path and end + 1 - start > LARGE_RANGE_SIZE)):
+            match, start, end = None, 0, len(DATA) - 1
+
+        body = DATA[start:end + 1]
+
+        self.send_response(206 if match else 200)
+        self.send_header("Content-Length", str(len(body)))
+
+        if match:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(DATA)}")
+
+        self.end_headers()
+
+        try:
+            for i in range(0, len(body), 65536):
+                self.wfile.write(body[i:i + 65536])
+
+                if "slow" in self.path:
+                    time.sleep(0.01)
+
+        except OSError:
+            pass
+
+@pytest.fixture
+def range_server():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+    server.paths = []
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    threading.Thread(target = server.serve_forever, daemon = True).start()
+
+    yield server
+
+    server.shutdown()
+
+def wait_until(condition, timeout: float = 20):
+    # 处理 Qt 事件的同时等待条件成立，返回最终结果
+    deadline = time.monotonic() + timeout
+
+    while not condition() and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.01)
+
+    app.processEvents()
+
+    return condition()
+
+@pytest.fixture
+def make_downloader(tmp_path, range_server):
+    from util.common.enum import DownloadStatus
+    from util.download.downloader.downloader import Downloader
+    from util.download.downloader.stream_index import stream_index
+    from util.download.task.info import TaskInfo
+
+    # 上次运行登记的流会被直接复用
+    stream_index.db.execute("DELETE FROM stream")
+
+    downloaders = []
+
+    def make(task_id: str, files: dict[str, str], cid: int = 1):
+        """
+        :param files: {file_key: 链接路径}
+        """
+        directory = tmp_path / task_id
+        shutil.rmtree(directory, ignore_errors = True)
+        directory.mkdir()
+
+        task_info = TaskInfo()
+        task_info.Basic.task_id = task_id
+        task_info.File.download_path = str(directory)
+        task_info.File.folder = ""
+        task_info.Episode.cid = cid
+        task_info.Download.status = DownloadStatus.DOWNLOADING
+        task_info.Download.total_size = len(DATA) * len(files)
+        task_info.Download.queue = list(files)
+        task_info.Download.files = {file_key: {"segments": None, "file_size": len(DATA)} for file_key in files}
+
+        downloader = Downloader(task_info)
+        downloader.download_list = {
+            file_key: {"file_name": f"{file_key}.m4s", "file_size": len(DATA), "url": range_server.base_url + path, "url_list": [range_server.base_url + path]}
+            for file_key, path in files.items()
+        }
+
+        # 只验证下载阶段，不进入附加内容与合并流程
+        downloader.completed = []
+        downloader.on_download_completed = lambda: downloader.completed.append(True)
+
+        downloaders.append(downloader)
+
+        return downloader
+
+    yield make
+
+    for downloader in downloaders:
+        if downloader.task_info is not None:
+            downloader.pause()
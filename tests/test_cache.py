@@ -0,0 +1,83 @@
+from util.network.cache import ResponseCache
+import util.network.cache as cache
+
+import pytest
+import httpx
+import json
+
+URL = "https://api.bilibili.com/x/web-interface/view"
+
+class Clock:
+    def __init__(self):
+        self.now = 1000
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache, "get_timestamp", clock)
+
+    return clock
+
+@pytest.fixture
+def response_cache():
+    response_cache = ResponseCache()
+    response_cache.clear()
+
+    yield response_cache
+
+    response_cache.clear()
+
+def make_response(bvid: str, status_code: int = 200, size: int = 0):
+    content = json.dumps({"code": 0, "data": {"bvid": bvid, "padding": "x" * size}}).encode()
+
+    return httpx.Response(status_code, headers = {"ETag": f'"{bvid}"'}, content = content if status_code == 200 else b"", request = httpx.Request("GET", f"{URL}?bvid={bvid}"))
+
+class Sender:
+    def __init__(self, response: httpx.Response):
+        self.response = response
+        self.calls: list[dict] = []
+
+    def __call__(self, validators: dict):
+        self.calls.append(validators)
+
+        return self.response
+
+def test_ttl_boundary_and_304_refresh(response_cache, clock):
+    send = Sender(make_response("BV1"))
+    response_cache.fetch(URL, {"bvid": "BV1"}, send)
+
+    # 有效期 12 小时，到期前一秒仍直接命中
+    clock.now += 12 * 3600 - 1
+    assert response_cache.fetch(URL, {"bvid": "BV1"}, send).json()["data"]["bvid"] == "BV1"
+    assert len(send.calls) == 1
+
+    # 到期时携带 ETag 重新验证，304 时沿用缓存的内容并顺延有效期
+    clock.now += 1
+    send.response = make_response("BV1", status_code = 304)
+
+    assert response_cache.fetch(URL, {"bvid": "BV1"}, send).json()["data"]["bvid"] == "BV1"
+    assert send.calls[-1] == {"If-None-Match": '"BV1"'}
+    assert response_cache.revalidated == 1
+
+    clock.now += 12 * 3600 - 1
+    response_cache.fetch(URL, {"bvid": "BV1"}, send)
+    assert len(send.calls) == 2
+
+def test_evicts_least_recently_used(response_cache, clock):
+    response_cache.max_size = 3000
+
+    for bvid in ["BV1", "BV2", "BV3"]:
+        response_cache.fetch(URL, {"bvid": bvid}, Sender(make_response(bvid, size = 900)))
+        clock.now += 1
+
+    # 最早写入的 BV1 刚被读取过，超出容量时按最久未使用依次淘汰 BV2、BV3，直到降到容量的 80%
+    response_cache.fetch(URL, {"bvid": "BV1"}, Sender(None))
+    clock.now += 1
+
+    response_cache.fetch(URL, {"bvid": "BV4"}, Sender(make_response("BV4", size = 900)))
+
+    keys = [row[0].rsplit("=", 1)[1] for row in response_cache.db.query("SELECT key FROM response ORDER BY last_access")]
+    assert keys == ["BV1", "BV4"]
@@ -0,0 +1,35 @@
+from util.download.downloader.disk_space import DiskSpaceReserver
+from util.common.io.file import File
+
+from collections import namedtuple
+import shutil
+import os
+
+MB = 1024 * 1024
+
+def test_reservations_on_same_device_are_summed(tmp_path, monkeypatch):
+    usage = namedtuple("usage", ["total", "used", "free"])
+    monkeypatch.setattr(shutil, "disk_usage", lambda path: usage(0, 0, 1024 * MB))
+
+    reserver = DiskSpaceReserver()
+    reserver.margin = 0
+
+    assert reserver.reserve("a", tmp_path, 600 * MB)
+
+    # 单个任务放得下，但加上同一磁盘上已预留的部分就超出剩余空间
+    assert not reserver.reserve("b", tmp_path, 600 * MB)
+    assert reserver.reserve("b", tmp_path, 400 * MB)
+
+    assert reserver.get_available_size(tmp_path) == 24 * MB
+
+    reserver.release("a")
+    assert reserver.get_available_size(tmp_path) == 624 * MB
+
+def test_preallocate_reports_whether_space_is_allocated(tmp_path, monkeypatch):
+    # 没有 posix_fallocate 时（如 macOS）只创建稀疏文件，调用方需保留预留
+    monkeypatch.delattr(os, "posix_fallocate", raising = False)
+
+    path = tmp_path / "file"
+
+    assert File.preallocate_file(path, MB) == (os.name == "nt")
+    assert path.stat().st_size == MB
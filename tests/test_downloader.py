@@ -0,0 +1,154 @@
+from conftest import DATA, LARGE_RANGE_SIZE, wait_until
+
+from util.download.downloader.stream_index import StreamIndex, stream_index
+from util.download.downloader.segment import SegmentTable
+from util.download.downloader.session_pool import session_pool
+from util.common.enum import DownloadStatus, DownloadEngine
+from util.download.downloader.parse_worker import UrlRefreshWorker
+import util.download.downloader.chunk_worker as chunk_worker
+
+import pytest
+import httpx
+import errno
+import os
+
+def read(downloader, file_key: str):
+    return open(downloader.download_list[file_key]["file_path"], "rb").read()
+
+def test_waiting_stream_starts_after_release(make_downloader):
+    # 唯一的文件先等待其他任务下载，该任务放弃后应由本任务接手，而不是一直停在 0%
+    downloader = make_downloader("deferred", {"video": "/deferred/video"}, cid = 1001)
+    key = StreamIndex.make_key(downloader.task_info, "video")
+
+    assert stream_index.claim(key, "other")
+
+    downloader.start_worker()
+    downloader.start_timer()
+
+    assert key in downloader.waiting_streams
+    assert downloader.active_workers == 0
+
+    stream_index.release("other")
+
+    assert wait_until(lambda: downloader.completed)
+    assert read(downloader, "video") == DATA
+
+def fail_writes_after(monkeypatch, limit: int, error_number: int):
+    # 写到 limit 之后的数据全部失败，模拟磁盘写满
+    from util.download.downloader.writer import FileWriter
+
+    write = FileWriter.write
+
+    def failing_write(fd: int, offset: int, buffer: bytearray, length: int):
+        if offset + length > limit:
+            raise OSError(error_number, os.strerror(error_number))
+
+        write(fd, offset, buffer, length)
+
+    monkeypatch.setattr(FileWriter, "write", staticmethod(failing_write))
+
+def check_no_holes(downloader, file_key: str):
+    # 未记录为待下载的部分必须已正确落盘
+    pending = SegmentTable.load(downloader.task_info.Download.files[file_key])
+    content = read(downloader, file_key)
+    position = 0
+
+    for start, end in sorted(pending) + [[len(DATA), len(DATA)]]:
+        assert content[position:start] == DATA[position:start]
+        position = end
+
+    assert SegmentTable.pending_size(pending) > 0
+
+@pytest.mark.parametrize("error_number, status", [(errno.ENOSPC, DownloadStatus.WAITING_FOR_SPACE), (errno.EIO, DownloadStatus.FAILED)])
+def test_write_error_stops_task(make_downloader, range_server, monkeypatch, error_number, status):
+    fail_writes_after(monkeypatch, 1024 * 1024, error_number)
+
+    downloader = make_downloader(f"write_error_{error_number}", {"video": "/slow/write_error"}, cid = 1002 + error_number)
+    downloader.start_worker()
+    downloader.start_timer()
+
+    assert wait_until(lambda: downloader.task_info.Download.status == status)
+    assert wait_until(lambda: downloader.active_workers == 0)
+
+    # 连接不再反复领取区间
+    requests = len(range_server.paths)
+    wait_until(lambda: False, timeout = 0.5)
+
+    assert len(range_server.paths) == requests
+    assert not downloader.completed
+
+    check_no_holes(downloader, "video")
+
+def test_async_engine_uses_pooled_session(make_downloader):
+    # 异步引擎的连接同样从会话池借用，与线程引擎使用相同的代理与 Cookie
+    downloader = make_downloader("async_engine", {"video": "/async/video"}, cid = 1010)
+    downloader.engine = DownloadEngine.ASYNC
+
+    downloader.start_worker()
+    downloader.start_timer()
+
+    assert isinstance(downloader.session, httpx.AsyncClient)
+    assert any(session.client is downloader.session for session in session_pool.sessions.values())
+
+    assert wait_until(lambda: downloader.completed)
+    assert read(downloader, "video") == DATA
+
+def test_exited_workers_are_pruned(make_downloader):
+    downloader = make_downloader("prune_workers", {"video": "/prune/video"}, cid = 1011)
+
+    downloader.start_worker()
+    downloader.start_timer()
+
+    assert wait_until(lambda: downloader.completed)
+    assert wait_until(lambda: all(worker.exited for worker in downloader.workers))
+
+    # 已退出连接的字节数并入基数，总下载量不变
+    downloader.prune_workers()
+
+    assert not downloader.workers
+    assert downloader.get_downloaded_size() == len(DATA)
+    assert sum(downloader.base_file_downloaded_size.values()) == len(DATA)
+
+@pytest.mark.parametrize("mode, range_limit, range_supported", [("largerange", LARGE_RANGE_SIZE // 2, True), ("norange", LARGE_RANGE_SIZE // 2, False)])
+def test_range_ignored_by_server(make_downloader, range_server, monkeypatch, mode, range_limit, range_supported):
+    # 服务端忽略大范围请求时改为按块请求；按块请求仍被忽略时从整个文件中截取区间，文件内容都保持完整
+    monkeypatch.setattr(chunk_worker, "FALLBACK_RANGE_SIZE", LARGE_RANGE_SIZE // 2)
+
+    downloader = make_downloader(f"range_{mode}", {"video": f"/{mode}/video"}, cid = 1012 if range_supported else 1013)
+
+    downloader.start_worker()
+    downloader.start_timer()
+
+    # 文件下载完成后会从 file_set 中移除，先取出镜像
+    mirror = downloader.file_set.get("video").mirror_pool.mirrors[0]
+
+    assert wait_until(lambda: downloader.completed)
+    assert read(downloader, "video") == DATA
+
+    assert (mirror.range_limit, mirror.range_supported) == (range_limit, range_supported)
+
+def test_expired_url_is_refreshed(make_downloader, range_server, monkeypatch):
+    # 链接过期（403）时重新解析，新链接生效后继续下载
+    url = range_server.base_url + "/refreshed/video"
+    refreshed = []
+
+    def resolve(worker):
+        refreshed.append(True)
+
+        return {"download_list": {"video": {"file_size": len(DATA), "url": url, "url_list": [url]}}}
+
+    monkeypatch.setattr(UrlRefreshWorker, "resolve", resolve)
+
+    downloader = make_downloader("url_refresh", {"video": "/expired/video"}, cid = 1014)
+    downloader.last_url_refresh = float("-inf")
+
+    downloader.start_worker()
+    downloader.start_timer()
+
+    assert wait_until(lambda: downloader.completed)
+    assert read(downloader, "video") == DATA
+
+    # 多个连接同时遇到 403 时只刷新一次
+    assert len(refreshed) == 1 and not downloader.url_refreshing
+    assert downloader.download_list["video"]["url_list"] == [url]
+    assert "/refreshed/video" in range_server.paths
@@ -0,0 +1,52 @@
+from util.download.downloader.host_tuner import HostTuner
+from util.common import get_timestamp
+
+import json
+
+def make_tuner(tmp_path, **kwargs):
+    tuner = HostTuner(window = 0, **kwargs)
+    tuner.path = tmp_path / "host_limits.json"
+    tuner.saved_limits = {}
+
+    return tuner
+
+def change_limit(tuner: HostTuner, host: str):
+    # 连接数用满且是首个窗口时加一
+    state = tuner.get_state(host)
+    state.peak_active = state.limit
+    state.window_start -= 1
+
+    tuner.adjust(host, state)
+
+def test_saves_are_debounced(tmp_path):
+    tuner = make_tuner(tmp_path, save_interval = 3600)
+    tuner.last_save = float("inf")
+
+    change_limit(tuner, "upos-1.example.com")
+    tuner.save()
+
+    # 间隔未到时不写入文件
+    assert tuner.dirty and not tuner.path.exists()
+
+    tuner.save(force = True)
+
+    assert not tuner.dirty
+    assert json.loads(tuner.path.read_text(encoding = "utf-8"))["upos-1.example.com"]["limit"] == tuner.hosts["upos-1.example.com"].limit
+
+def test_saved_hosts_are_capped_and_expire(tmp_path):
+    tuner = make_tuner(tmp_path, max_saved_hosts = 2, saved_ttl = 100)
+    tuner.saved_limits = {"old.example.com": {"limit": 3, "time": get_timestamp() - 1000}}
+
+    for index in range(3):
+        change_limit(tuner, f"cn-{index}-mirror.example.com")
+        tuner.saved_limits[f"cn-{index}-mirror.example.com"]["time"] += index
+
+    tuner.save(force = True)
+
+    assert set(json.loads(tuner.path.read_text(encoding = "utf-8"))) == {"cn-1-mirror.example.com", "cn-2-mirror.example.com"}
+
+def test_loads_legacy_format(tmp_path):
+    tuner = make_tuner(tmp_path)
+    tuner.path.write_text(json.dumps({"upos.example.com": 5}), encoding = "utf-8")
+
+    assert tuner.load()["upos.example.com"]["limit"] == 5
@@ -0,0 +1,76 @@
+from conftest import wait_until
+
+from util.download.downloader.part_concat import PartConcat
+from util.download.downloader.merger import Merger
+from util.download.task.info import TaskInfo
+from util.common import config
+
+from types import SimpleNamespace
+import pytest
+import sys
+
+def make_task_info(tmp_path, parts_count: int = 2):
+    task_info = TaskInfo()
+    task_info.Basic.task_id = "part_concat"
+    task_info.File.download_path = str(tmp_path)
+    task_info.File.folder = ""
+    task_info.File.video_file_ext = "flv"
+    task_info.File.merge_file_ext = "mp4"
+    task_info.Download.video_parts_count = parts_count
+
+    return task_info
+
+def python_command(code: str):
+    return SimpleNamespace(build = lambda: [sys.executable, "-c", code])
+
+@pytest.fixture
+def ffmpeg_available(monkeypatch):
+    monkeypatch.setattr(config, "no_ffmpeg_available", False)
+    monkeypatch.setattr(config.attach_cover, "value", False)
+
+def test_is_supported(tmp_path, monkeypatch, ffmpeg_available):
+    task_info = make_task_info(tmp_path)
+    assert PartConcat.is_supported(task_info)
+
+    # 单个分段、现代 dash 视频、需要嵌入封面或没有 FFmpeg 时由合并步骤处理
+    assert not PartConcat.is_supported(make_task_info(tmp_path, parts_count = 1))
+
+    task_info.Download.merge_video_audio = True
+    assert not PartConcat.is_supported(task_info)
+    task_info.Download.merge_video_audio = False
+
+    monkeypatch.setattr(config.attach_cover, "value", True)
+    assert not PartConcat.is_supported(task_info)
+    monkeypatch.setattr(config.attach_cover, "value", False)
+
+    monkeypatch.setattr(config, "no_ffmpeg_available", True)
+    assert not PartConcat.is_supported(task_info)
+
+def test_falls_back_to_list_merge_when_ffmpeg_fails(tmp_path, monkeypatch, ffmpeg_available):
+    # 合并进程读完输入后以非零状态退出，并留下未完成的输出文件
+    task_info = make_task_info(tmp_path)
+    part_concat = PartConcat(task_info)
+
+    monkeypatch.setattr("util.download.downloader.part_concat.FFmpegCommand.concat_mpegts_stream", lambda output_path: python_command(f"import sys; open({output_path!r}, 'wb'); sys.stdin.buffer.read(); sys.exit(1)"))
+    monkeypatch.setattr("util.download.downloader.part_concat.FFmpegCommand.remux_to_mpegts", lambda input_path: python_command("import sys; sys.stdout.buffer.write(b'ts')"))
+
+    merger = Merger(task_info, part_concat = part_concat)
+    concatenated = []
+    monkeypatch.setattr(merger, "concat_video_parts", lambda: concatenated.append(True))
+
+    part_concat.start()
+
+    for index in range(2):
+        part_concat.get_part_path(index).write_bytes(b"flv")
+        part_concat.add_part(index)
+
+    # 边下载边合并尚未结束时等待其结果，失败后按列表重新合并
+    merger.merge_video_parts()
+
+    assert wait_until(lambda: part_concat.success is not None)
+    assert part_concat.success is False and concatenated == [True]
+    assert not (tmp_path / part_concat.temp_output_file_name).exists()
+
+    # 已失败时直接重新合并
+    merger.merge_video_parts()
+    assert concatenated == [True, True]
@@ -0,0 +1,25 @@
+from conftest import DATA
+
+from util.download.parse.query_worker import QueryWorker
+
+import time
+
+def test_dead_mirror_does_not_delay_parse(range_server):
+    # 首选链接验证通过后，无响应的备用镜像只在短时间内等待，且不重试
+    base_url = range_server.base_url
+    worker = QueryWorker({})
+
+    start = time.monotonic()
+    result = worker.get_file_size([f"{base_url}/video", f"{base_url}/hang/video", f"{base_url}/backup/video"])
+
+    assert time.monotonic() - start < worker.mirror_probe_timeout + 1
+    assert result == {"url": f"{base_url}/video", "url_list": [f"{base_url}/video", f"{base_url}/backup/video"], "file_size": len(DATA)}
+    assert range_server.paths.count("/hang/video") == 1
+
+def test_unavailable_primary_falls_back(range_server):
+    base_url = range_server.base_url
+
+    result = QueryWorker({}).get_file_size([f"{base_url}/missing/video", f"{base_url}/video"])
+
+    assert result["url"] == f"{base_url}/video"
+    assert range_server.paths.count("/missing/video") == 1
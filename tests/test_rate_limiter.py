@@ -0,0 +1,35 @@
+from util.download.downloader.rate_limiter import RateLimiter
+
+import time
+
+def test_idle_host_buckets_are_pruned(monkeypatch):
+    monkeypatch.setattr(RateLimiter, "get_rates", lambda self: (0, 0, 1024 * 1024))
+
+    rate_limiter = RateLimiter(refresh_interval = 0, idle_timeout = 0.05)
+
+    for index in range(100):
+        rate_limiter.reserve(1024, "task", f"host{index}.example.com")
+
+    assert len(rate_limiter.host_buckets) == 100
+
+    time.sleep(0.1)
+
+    # 闲置的主机全部移除，只保留仍在使用的主机
+    rate_limiter.reserve(1024, "task", "host0.example.com")
+
+    assert list(rate_limiter.host_buckets) == ["host0.example.com"]
+
+def test_unlimited_host_buckets_in_use_are_kept(monkeypatch):
+    # 不限速时令牌桶不记录更新时间，仍在使用的主机不能被当作闲置移除
+    monkeypatch.setattr(RateLimiter, "get_rates", lambda self: (0, 0, 0))
+
+    rate_limiter = RateLimiter(refresh_interval = 0, idle_timeout = 0.05)
+    rate_limiter.reserve(1024, "task", "host.example.com")
+
+    bucket = rate_limiter.host_buckets["host.example.com"]
+
+    for _ in range(10):
+        time.sleep(0.02)
+        rate_limiter.reserve(1024, "task", "host.example.com")
+
+    assert rate_limiter.host_buckets["host.example.com"] is bucket
@@ -0,0 +1,78 @@
+from conftest import DATA, wait_until
+
+from util.network.request import SingleFlight, SyncNetWorkRequest, ResponseType, ProxyClientPool, single_flight, limits
+from util.network import response_cache, async_request_engine
+
+from threading import Event, Thread
+import httpx
+import time
+
+def test_bypass_requests_do_not_share_flight():
+    single_flight = SingleFlight()
+    key = single_flight.get_key("GET", "https://api.bilibili.com/x/web-interface/view", {"bvid": "BV1"})
+
+    with response_cache.bypass():
+        assert single_flight.get_key("GET", "https://api.bilibili.com/x/web-interface/view", {"bvid": "BV1"}) != key
+
+def test_waiters_raise_their_own_error():
+    # 共享请求失败时每个等待方抛出各自的异常对象，类型与内容保持不变
+    single_flight = SingleFlight()
+    started, release = Event(), Event()
+    request = httpx.Request("GET", "https://api.bilibili.com/")
+    error = httpx.HTTPStatusError("error", request = request, response = httpx.Response(412, request = request))
+    errors = []
+
+    def leader():
+        started.set()
+        release.wait()
+
+        raise error
+
+    def call(func):
+        try:
+            single_flight.do("key", func)
+
+        except httpx.HTTPStatusError as e:
+            errors.append(e)
+
+    threads = [Thread(target = call, args = (leader, ))]
+    threads[0].start()
+    started.wait()
+
+    threads += [Thread(target = call, args = (None, )) for _ in range(2)]
+
+    for thread in threads[1:]:
+        thread.start()
+
+    while single_flight.stats()["joins"] < 2:
+        time.sleep(0.01)
+
+    release.set()
+
+    for thread in threads:
+        thread.join()
+
+    assert len(errors) == 3 and len({id(e) for e in errors}) == 3
+    assert all(e.response.status_code == 412 for e in errors)
+
+def test_async_gather_coalesces_identical_requests(range_server):
+    url = f"{range_server.base_url}/slow/gather"
+    calls, joins = single_flight.stats()["calls"], single_flight.stats()["joins"]
+
+    results = async_request_engine.gather(*(SyncNetWorkRequest(url, response_type = ResponseType.BYTES) for _ in range(3)))
+
+    assert all(result == DATA for result in results)
+    assert range_server.paths.count("/slow/gather") == 1
+    assert single_flight.stats()["calls"] - calls == 3 and single_flight.stats()["joins"] - joins == 2
+
+def test_idle_proxy_clients_are_evicted_by_timer():
+    pool = ProxyClientPool(idle_timeout = 0.05)
+
+    with pool.get({"http": "http://127.0.0.1:1", "https": "http://127.0.0.1:1"}) as client:
+        # 连接数限制需要传给代理的 transport 才会生效
+        assert all(mount._pool._max_connections == limits.max_connections for mount in client._mounts.values())
+
+    # 不需要下一次 get 也会关闭空闲的客户端
+    wait_until(lambda: not pool.clients, timeout = 2)
+
+    assert client.is_closed and pool.timer is None
@@ -0,0 +1,57 @@
+from util.network.retry import RetryPolicy, download_retry_policy
+from util.common.enum import RetryErrorType
+
+import pytest
+import httpx
+
+def status_error(status_code: int):
+    request = httpx.Request("GET", "https://upos.example.com/video.m4s")
+
+    return httpx.HTTPStatusError("error", request = request, response = httpx.Response(status_code, request = request))
+
+@pytest.mark.parametrize("error, error_type", [
+    (httpx.ReadTimeout("timeout"), RetryErrorType.TIMEOUT),
+    (httpx.ConnectError("reset"), RetryErrorType.RESET),
+    (ConnectionError("mismatch"), RetryErrorType.RESET),
+    (status_error(412), RetryErrorType.RISK_CONTROL),
+    (status_error(429), RetryErrorType.RISK_CONTROL),
+    (status_error(503), RetryErrorType.SERVER_ERROR),
+    (status_error(403), RetryErrorType.CLIENT_ERROR),
+    (ValueError("other"), RetryErrorType.OTHER)
+])
+def test_classify(error, error_type):
+    assert RetryPolicy.classify(error) == error_type
+
+def test_delay_bounds():
+    policy = RetryPolicy(base_delay = 1.0, max_delay = 8.0, jitter = 0.5)
+
+    for attempt in range(1, 10):
+        upper = min(2 ** (attempt - 1), 8.0)
+
+        # 抖动只会缩短等待时间，最多缩短 jitter 的比例
+        for _ in range(100):
+            assert upper * 0.5 <= policy.get_delay(attempt, RetryErrorType.TIMEOUT) <= upper
+
+    # 风控的等待时间不低于下限
+    assert policy.get_delay(1, RetryErrorType.RISK_CONTROL) == 5.0
+
+def test_max_attempts():
+    state = RetryPolicy(max_attempts = 3, base_delay = 0).begin("test")
+
+    assert [state.next_delay(httpx.ReadTimeout("timeout")) for _ in range(3)] == [0, 0, None]
+
+    # 取得进展后重新计数
+    state.reset()
+    assert state.next_delay(httpx.ReadTimeout("timeout")) == 0
+
+def test_download_policy_is_bounded():
+    assert download_retry_policy.max_attempts and download_retry_policy.deadline
+
+    state = download_retry_policy.begin("test")
+
+    # 链接过期时等待刷新后重试，其他 4xx 与未知错误直接放弃
+    assert state.next_delay(status_error(403)) is not None
+    assert state.next_delay(status_error(410)) is not None
+    assert state.next_delay(status_error(400)) is None
+    assert state.next_delay(status_error(416)) is None
+    assert state.next_delay(ValueError("other")) is None
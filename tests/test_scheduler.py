@@ -0,0 +1,55 @@
+from util.download.downloader.scheduler import ConnectionScheduler
+
+from threading import Event
+import asyncio
+
+def test_only_excess_connections_yield(monkeypatch):
+    # 份额从 4 调低到 2 时只让出多出的 2 个连接，而不是全部重连
+    monkeypatch.setattr(ConnectionScheduler, "max_connections", 4)
+    monkeypatch.setattr(ConnectionScheduler, "host_limit", lambda self, host: 8)
+
+    scheduler = ConnectionScheduler()
+    scheduler.register("a", demand = 4)
+
+    slots = [scheduler.try_acquire("a", "host") for _ in range(4)]
+    assert all(slots)
+
+    scheduler.register("b", demand = 4)
+
+    yielded = [scheduler.over_share(slot, "host") for slot in slots]
+    assert yielded.count(True) == 2
+
+    # 让出的连接释放后，其余连接仍保持
+    for slot, flag in zip(slots, yielded):
+        if flag:
+            scheduler.release(slot, "host", yielded = True)
+
+    assert not any(scheduler.over_share(slot, "host") for slot, flag in zip(slots, yielded) if not flag)
+    assert scheduler.tasks["a"].yielding == 0 and not scheduler.host_yielding
+
+def test_async_acquire_is_woken_by_release(monkeypatch):
+    monkeypatch.setattr(ConnectionScheduler, "max_connections", 4)
+    monkeypatch.setattr(ConnectionScheduler, "host_limit", lambda self, host: 1)
+
+    scheduler = ConnectionScheduler()
+    scheduler.register("a", demand = 4)
+
+    slot = scheduler.try_acquire("a", "host")
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        task = asyncio.ensure_future(scheduler.acquire_async("a", "host", Event()))
+
+        await asyncio.sleep(0)
+        assert not task.done() and len(scheduler.async_waiters["host"]) == 1
+
+        # 释放后立即唤醒，不需要等到超时重新检查
+        start = loop.time()
+        scheduler.release(slot, "host")
+
+        assert await asyncio.wait_for(task, 2) is not None
+        assert loop.time() - start < 0.2
+
+    asyncio.run(main())
+
+    assert not scheduler.async_waiters
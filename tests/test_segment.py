@@ -0,0 +1,94 @@
+from util.download.downloader.segment import SegmentTable, LEGACY_CHUNK_SIZE
+from util.download.downloader.chunk_worker import ChunkWorkerBase
+from util.download.downloader.file_set import FileSet
+
+from threading import Event
+from types import SimpleNamespace
+
+MB = 1024 * 1024
+
+def make_table(size: int = 8 * MB):
+    return SegmentTable(size, [[0, size]], 1, MB)
+
+def test_finish_clears_group_on_loser():
+    table = make_table()
+    primary = table.acquire()
+    primary.pos = 2 * MB
+
+    hedge = table.hedge(primary)
+
+    assert table.finish(hedge)
+    assert primary.cancelled and primary.group is None
+    assert not table.finish(primary)
+    assert table.is_finished
+
+def test_failed_hedge_restores_primary():
+    # 对冲失败后原区间可再次被窃取或对冲，对冲多算的字节从其进度中扣除
+    table = make_table()
+    primary = table.acquire()
+    primary.pos = 2 * MB
+
+    hedge = table.hedge(primary)
+    hedge.pos = 3 * MB
+
+    assert hedge.group.advance(hedge.pos, MB) == MB
+    assert table.release(hedge) == MB
+
+    assert hedge.cancelled and primary.group is None and not primary.cancelled
+    assert table.steal() is not None
+    assert table.hedge(primary) is not None
+
+def test_hedge_worker_exits_after_hedge_segment():
+    table = make_table()
+    primary = table.acquire()
+    hedge = table.hedge(primary)
+
+    file_set = FileSet()
+    worker = ChunkWorkerBase(file_set, "", None, Event(), initial_file = None, initial_segment = hedge)
+
+    assert worker.is_hedge
+    assert worker.next_segment() is hedge
+
+    # 不再领取普通区间
+    assert worker.next_segment() is None
+
+def test_discarded_bytes_are_uncounted():
+    # 未能落盘的数据之后会重新下载，丢弃时从进度中扣除，避免重复计入
+    segment = make_table().acquire()
+
+    worker = ChunkWorkerBase(FileSet(), "", None, Event())
+    worker.file = SimpleNamespace(file_key = "video")
+
+    worker.write_chunk(segment, None, bytes(1000))
+    segment.commit(400)
+    worker.discard_buffer(segment)
+
+    assert segment.pos == 400
+    assert worker.downloaded_size == worker.file_downloaded_size["video"] == worker.sample_size == 400
+
+def test_encode_decode_round_trip():
+    segments = [[0, 1], [5 * MB, 7 * MB + 123], [36 ** 3, 36 ** 3 + 35], [8 * MB, 8 * MB + 1]]
+
+    value = SegmentTable.encode(segments)
+
+    # 按起点排序后编码，解码得到排好序的区间
+    assert SegmentTable.decode(value) == sorted(segments)
+    assert SegmentTable.encode([]) == "" and SegmentTable.decode("") == []
+    assert SegmentTable.load({"segments": value}) == sorted(segments)
+
+def test_migrate_legacy_chunks_list():
+    # 旧版按 4MB 切片记录未完成的序号，连续的切片合并为一个区间，最后一片截止到文件末尾
+    file_size = 5 * LEGACY_CHUNK_SIZE + 100
+    file_info = {"file_size": file_size, "total_chunks": 6, "chunks_list": [5, 1, 2, 4], "finished_chunks": [0, 3]}
+
+    segments = SegmentTable.load(file_info)
+
+    assert segments == [[LEGACY_CHUNK_SIZE, 3 * LEGACY_CHUNK_SIZE], [4 * LEGACY_CHUNK_SIZE, file_size]]
+    assert file_info == {"file_size": file_size, "segments": SegmentTable.encode(segments)}
+    assert SegmentTable.pending_size(segments) == file_size - 2 * LEGACY_CHUNK_SIZE
+
+def test_migrate_legacy_task_not_started():
+    file_info = {"file_size": MB, "total_chunks": 0, "chunks_list": []}
+
+    assert SegmentTable.load(file_info) is None
+    assert file_info == {"file_size": MB, "segments": None}
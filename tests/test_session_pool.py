@@ -0,0 +1,29 @@
+from util.download.downloader import session_pool as session_pool_module
+from util.download.downloader.session_pool import SessionPool
+
+import httpx
+
+def test_async_sessions_follow_cookie_changes(monkeypatch):
+    # 异步引擎同样按身份复用会话，Cookie 变化后换用新会话，旧会话在归还后关闭
+    cookies = {"SESSDATA": "a"}
+    monkeypatch.setattr(session_pool_module, "get_cookies", lambda: dict(cookies))
+
+    pool = SessionPool()
+
+    client = pool.acquire(is_async = True)
+
+    assert isinstance(client, httpx.AsyncClient)
+    assert client.cookies.get("SESSDATA") == "a"
+    assert pool.acquire(is_async = True) is client
+    assert isinstance(pool.acquire(), httpx.Client)
+
+    cookies["SESSDATA"] = "b"
+
+    new_client = pool.acquire(is_async = True)
+
+    assert new_client is not client and new_client.cookies.get("SESSDATA") == "b"
+
+    pool.release(client)
+    pool.release(client)
+
+    assert all(session.client is not client for session in pool.sessions.values())
@@ -0,0 +1,54 @@
+from util.download.downloader.stream_index import stream_index
+
+import os
+
+def add_stream(key: str, path):
+    # 直接登记并计算哈希，避免后台计算与测试中的改动交错
+    path.write_bytes(os.urandom(64 * 1024))
+    stat = os.stat(path)
+
+    stream_index.db.execute("""
+        INSERT INTO stream (key, path, file_size, mtime, hash, created_time) VALUES (?, ?, ?, ?, ?, 0)
+    """, (key, str(path), stat.st_size, stat.st_mtime_ns, stream_index.get_hash(path)))
+
+def test_retain_keeps_stream_after_merge(make_downloader, tmp_path, monkeypatch):
+    # 合并后删除的原始流移入本地目录，之后仍能找到
+    monkeypatch.setattr(stream_index, "store_path", tmp_path / "streams")
+
+    path = tmp_path / "video_1.m4s"
+    add_stream("retain/video", path)
+
+    stream_index.retain(path)
+
+    assert not path.exists()
+
+    source = stream_index.lookup("retain/video", 64 * 1024)
+
+    assert source is not None and source.parent == tmp_path / "streams"
+    assert stream_index.verify("retain/video", source)
+
+def test_retain_evicts_oldest(make_downloader, tmp_path, monkeypatch):
+    monkeypatch.setattr(stream_index, "store_path", tmp_path / "streams")
+    monkeypatch.setattr(stream_index, "max_store_size", 64 * 1024)
+
+    for index in range(2):
+        add_stream(f"evict/{index}", tmp_path / f"video_{index}.m4s")
+        stream_index.db.execute("UPDATE stream SET created_time = ? WHERE key = ?", (index, f"evict/{index}"))
+
+        stream_index.retain(tmp_path / f"video_{index}.m4s")
+
+    assert stream_index.lookup("evict/0", 64 * 1024) is None
+    assert stream_index.lookup("evict/1", 64 * 1024) is not None
+
+def test_verify_rejects_modified_stream(make_downloader, tmp_path):
+    path = tmp_path / "audio_1.m4s"
+    add_stream("verify/audio", path)
+
+    # 大小与修改时间不变，只有内容被改动
+    stat = os.stat(path)
+    path.write_bytes(os.urandom(64 * 1024))
+    os.utime(path, ns = (stat.st_atime_ns, stat.st_mtime_ns))
+
+    assert stream_index.lookup("verify/audio", 64 * 1024) == path
+    assert not stream_index.verify("verify/audio", path)
+    assert stream_index.lookup("verify/audio", 64 * 1024) is None
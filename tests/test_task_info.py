@@ -0,0 +1,19 @@
+from util.download.task.info import TaskInfo
+
+def test_transient_stats_are_not_persisted():
+    # 速度统计每秒变化，不写入数据库，重启后也不会恢复过期的剩余时间
+    task_info = TaskInfo()
+    task_info.Basic.task_id = "transient"
+    task_info.Download.eta = 30
+    task_info.Download.file_stats = {"video": {"speed": 1, "eta": 30, "remaining": 1}}
+    task_info.Download.downloaded_size = 1024
+
+    data = task_info.to_dict()
+
+    assert "eta" not in data["Download"] and "file_stats" not in data["Download"]
+
+    restored = TaskInfo()
+    restored.from_dict({**data, "Download": {**data["Download"], "eta": 30}})
+
+    assert restored.Download.eta == -1 and restored.Download.file_stats == {}
+    assert restored.Download.downloaded_size == 1024 and restored.Basic.task_id == "transient"
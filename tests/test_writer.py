@@ -0,0 +1,65 @@
+from util.download.downloader.writer import FileWriter, WriterClosedError, buffer_pool
+
+from threading import Event
+import asyncio
+import pytest
+
+def make_buffer(data: bytes):
+    buffer = buffer_pool.get()
+    buffer[:len(data)] = data
+
+    return buffer
+
+def test_submit_after_close_is_rejected(tmp_path):
+    path = tmp_path / "file"
+    path.write_bytes(bytes(8))
+
+    writer = FileWriter(path)
+    writer.submit(0, make_buffer(b"abcd"), 4)
+    writer.close()
+
+    # 关闭前提交的数据仍会写完，之后的提交直接拒绝，不会重新打开文件
+    with pytest.raises(WriterClosedError):
+        writer.submit(4, make_buffer(b"efgh"), 4)
+
+    writer.thread.join()
+    assert path.read_bytes() == b"abcd" + bytes(4)
+
+def test_async_submit_wakes_on_write_completion(tmp_path, monkeypatch):
+    path = tmp_path / "file"
+    path.write_bytes(bytes(8))
+
+    release = Event()
+    write = FileWriter.write
+
+    def blocking_write(fd, offset, buffer, length):
+        release.wait(5)
+        write(fd, offset, buffer, length)
+
+    monkeypatch.setattr(FileWriter, "write", staticmethod(blocking_write))
+
+    writer = FileWriter(path, max_pending = 1)
+    written = []
+
+    async def main():
+        loop = asyncio.get_running_loop()
+
+        # 队列上限为 1，第二块入队时第一块已被写入线程取出并卡住，此后队列已满
+        for offset in range(2):
+            await writer.submit_async(offset, make_buffer(b"x"), 1, lambda offset = offset: written.append(offset))
+
+        task = asyncio.ensure_future(writer.submit_async(2, make_buffer(b"y"), 1, lambda: written.append(2)))
+        await asyncio.sleep(0)
+
+        assert not task.done() and len(writer.async_waiters) == 1
+
+        loop.call_later(0.05, release.set)
+        await asyncio.wait_for(task, 2)
+
+    asyncio.run(main())
+
+    writer.close()
+    writer.thread.join()
+
+    assert written == [0, 1, 2]
+    assert path.read_bytes() == b"xxy" + bytes(5)